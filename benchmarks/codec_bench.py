@@ -0,0 +1,53 @@
+# coding=utf-8
+"""
+    Decode throughput of the installed JSON codecs (see :py:mod:`pyosio.codec`)
+    on realistic payloads: a REST page of stored messages, single stream lines
+    and SSE event data.
+
+        python -m benchmarks.codec_bench
+"""
+import json
+import sys
+import time
+
+from pyosio import codec
+
+N_MESSAGES = 1000
+N_LINES = 20000
+
+
+def message(i):
+    reading = {'temperature': 20.0 + i % 7 * 0.25, 'humidity': 40 + i % 13, 'battery': 3.3}
+    return {'date': '2016-01-01T00:%02d:%02d.000Z' % (i // 60 % 60, i % 60),
+            'device': 'device-%d' % (i % 50),
+            'owner': 'bench',
+            'topic': '/users/bench/sensors/%d' % (i % 50),
+            'payload': {'text': json.dumps(reading)}}
+
+
+def bench(label, loads, documents, repeat):
+    size = sum(len(document) for document in documents) * repeat
+    start = time.time()
+    for _ in range(repeat):
+        for document in documents:
+            loads(document)
+    elapsed = time.time() - start
+    sys.stdout.write('%-24s %10.1f MB/s %10.0f docs/s\n'
+                     % (label, size / elapsed / 1e6, len(documents) * repeat / elapsed))
+
+
+def main():
+    page = [json.dumps({'messages': [message(i) for i in range(N_MESSAGES)],
+                        'next': '/v1/messages/topic/bench?cursor=x'}).encode('utf-8')]
+    lines = [json.dumps(message(i)).encode('utf-8') for i in range(N_LINES)]
+    events = [line.decode('utf-8') for line in lines]
+
+    for name in codec.available():
+        loads = codec.get_codec(name).loads
+        bench('%s page' % name, loads, page, 50)
+        bench('%s stream lines' % name, loads, lines, 1)
+        bench('%s SSE events' % name, loads, events, 1)
+
+
+if __name__ == '__main__':
+    main()
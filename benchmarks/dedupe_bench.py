@@ -0,0 +1,54 @@
+# coding=utf-8
+"""
+    Messages/sec and keys held when deduplicating a stream of messages, a
+    tenth of them repeated, with an unbounded set and with a DedupeIndex
+    with and without its Bloom filter pre-check.
+
+        python -m benchmarks.dedupe_bench
+"""
+import sys
+import time
+
+from pyosio.dedupe import DedupeIndex, message_key
+
+N_MESSAGES = 200000
+HORIZON = 0.5
+
+
+def messages():
+    for i in range(N_MESSAGES):
+        n = i - 5 if i % 10 == 0 else i
+        yield {'topic': '/users/bench/t', 'date': '2016-01-01T00:00:00Z', 'payload': {'text': str(n)}}
+
+
+class UnboundedSet(object):
+
+    def __init__(self):
+        self._seen = set()
+
+    def __len__(self):
+        return len(self._seen)
+
+    def filter(self, items):
+        for message in items:
+            key = message_key(message)
+            if key not in self._seen:
+                self._seen.add(key)
+                yield message
+
+
+def main():
+    for name, index in [('set', UnboundedSet()),
+                        ('index', DedupeIndex(HORIZON)),
+                        ('index+bloom', DedupeIndex(HORIZON, bloom_capacity=N_MESSAGES)),
+                        ('index/120', DedupeIndex(HORIZON, buckets=120)),
+                        ('index/120+bloom', DedupeIndex(HORIZON, buckets=120, bloom_capacity=N_MESSAGES))]:
+        start = time.time()
+        count = sum(1 for _ in index.filter(messages()))
+        elapsed = time.time() - start
+        sys.stdout.write('%-16s %10.0f msg/s %8d unique %8d keys held\n' % (
+            name, N_MESSAGES / elapsed, count, len(index)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# coding=utf-8
+"""
+    Messages/sec and MB/s written by a Parquet export of a paginated history
+    served by a local mock server.
+
+        python -m benchmarks.export_bench
+"""
+import json
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.mock_server import MockServer
+from pyosio.osio import OpenSensorsAPI
+from pyosio.export import ParquetExporter
+from pyosio.pagination import format_date
+
+N_PAGES = 100
+PAGE_SIZE = 1000
+
+
+def handler(method, path, query, body, headers):
+    offset = int(query.get('cursor', 0))
+    page = {'messages': [{'date': format_date(1451606400 + i), 'device': 'device-%d' % (i % 10),
+                          'payload': {'text': json.dumps({'temperature': 20 + i % 7, 'humidity': 0.5})}}
+                         for i in range(offset, offset + PAGE_SIZE)]}
+    if offset + PAGE_SIZE < N_PAGES * PAGE_SIZE:
+        page['next'] = '%s?cursor=%d' % (path, offset + PAGE_SIZE)
+    return 200, {}, json.dumps(page).encode('utf-8')
+
+
+def main():
+    with MockServer(handler) as server:
+        client = OpenSensorsAPI('bench', 'bench')
+        client.base_url = server.url
+        for compression in ('snappy', 'zstd'):
+            root = tempfile.mkdtemp()
+            try:
+                exporter = ParquetExporter(client, root, compression=compression)
+                start = time.time()
+                exporter.export('topic', 'bench')
+                elapsed = time.time() - start
+                stats = exporter.stats
+                sys.stdout.write('%-7s %10.0f msg/s %8.2f MB/s %6d row groups %8.2f MB\n' % (
+                    compression, stats.messages / elapsed, stats.bytes_written / elapsed / 1e6,
+                    stats.row_groups, stats.bytes_written / 1e6))
+            finally:
+                shutil.rmtree(root)
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# coding=utf-8
+"""
+    Minimal local stand-in for api.opensensors.io used by the benchmarks.
+
+    The server speaks HTTP/1.1 with keep-alive so that connection reuse in the
+    client is measurable. ``handler`` receives ``(method, path, query, body,
+    headers)`` and returns ``(status, headers, body)``.
+"""
+import json
+import threading
+
+# Handle library reorganisation Python 2 > Python 3.
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qsl
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qsl
+
+
+def default_handler(method, path, query, body, headers):
+    return 200, {}, json.dumps({"path": path, "query": query}).encode('utf-8')
+
+
+class _ThreadedHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class MockServer(object):
+
+    def __init__(self, handler=default_handler, host='127.0.0.1', port=0):
+        self.handler = handler
+        outer = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _handle(self):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                status, headers, payload = outer.handler(
+                    self.command, parsed.path, dict(parse_qsl(parsed.query)), body, self.headers)
+                self.send_response(status)
+                headers = dict(headers)
+                headers.setdefault('Content-Type', 'application/json')
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self._server = _ThreadedHTTPServer((host, port), RequestHandler)
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://%s:%d/' % (host, port)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,54 @@
+# coding=utf-8
+"""
+    Messages/sec of a paginated iteration against a local mock server with
+    simulated latency, for a consumer spending CPU time on every page, with
+    and without read-ahead.
+
+        python -m benchmarks.prefetch_bench
+"""
+import json
+import sys
+import time
+
+from benchmarks.mock_server import MockServer
+from pyosio.osio import OpenSensorsAPI
+
+N_PAGES = 20
+PAGE_SIZE = 500
+LATENCY = 0.05
+
+
+def handler(method, path, query, body, headers):
+    time.sleep(LATENCY)
+    offset = int(query.get('cursor', 0))
+    page = {'messages': [{'date': '2016-01-01T00:00:00Z', 'payload': {'text': str(i)}}
+                         for i in range(offset, offset + PAGE_SIZE)]}
+    if offset + PAGE_SIZE < N_PAGES * PAGE_SIZE:
+        page['next'] = '%s?cursor=%d' % (path, offset + PAGE_SIZE)
+    return 200, {}, json.dumps(page).encode('utf-8')
+
+
+def consume(message):
+    # Roughly as much CPU per page as the simulated network latency.
+    deadline = time.time() + LATENCY / PAGE_SIZE
+    while time.time() < deadline:
+        pass
+
+
+def main():
+    with MockServer(handler) as server:
+        client = OpenSensorsAPI('bench', 'bench')
+        client.base_url = server.url
+        for prefetch in (0, 1, 2, 4):
+            start = time.time()
+            count = 0
+            for message in client.iter_topic_msgs('bench', prefetch=prefetch):
+                consume(message)
+                count += 1
+            elapsed = time.time() - start
+            sys.stdout.write('prefetch=%d %12.0f msg/s\n' % (prefetch, count / elapsed))
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
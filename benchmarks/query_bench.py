@@ -0,0 +1,51 @@
+# coding=utf-8
+"""
+    Messages/sec filtered client-side on a payload field and a device: per
+    message dict in Python, with MessageQuery.select on the raw pages, which
+    decodes what the predicates need, and with MessageQuery.mask on pages
+    already decoded into columns, as when iterating with columns().
+
+        python -m benchmarks.query_bench
+"""
+import json
+import sys
+import time
+
+from pyosio import codec
+from pyosio.columnar import Decoder
+from pyosio.query import MessageQuery
+
+N_PAGES = 50
+PAGE_SIZE = 1000
+
+PAGES = [[{'device': 'device-%d' % (i % 20), 'date': '2016-01-01T00:00:00Z',
+           'payload': {'text': json.dumps({'temperature': i % 40, 'humidity': 0.5})}}
+          for i in range(page * PAGE_SIZE, (page + 1) * PAGE_SIZE)] for page in range(N_PAGES)]
+
+
+def per_message(messages):
+    kept = []
+    for message in messages:
+        payload = codec.loads(message['payload']['text'])
+        temperature = payload.get('temperature')
+        if temperature is not None and 20 <= temperature <= 30 and message.get('device') in ('device-1', 'device-2'):
+            kept.append(message)
+    return kept
+
+
+def main():
+    query = MessageQuery().where('temperature', 'between', (20, 30)).from_devices('device-1', 'device-2')
+    decoder = Decoder(['temperature', 'humidity'])
+    batches = [decoder.decode(page) for page in PAGES]
+    runs = [('per message', lambda: sum(len(per_message(page)) for page in PAGES)),
+            ('select', lambda: sum(len(query.select(page)) for page in PAGES)),
+            ('mask', lambda: sum(int(query.mask(batch).sum()) for batch in batches))]
+    for name, run in runs:
+        start = time.time()
+        kept = run()
+        elapsed = time.time() - start
+        sys.stdout.write('%-12s %12.0f msg/s %8d kept\n' % (name, N_PAGES * PAGE_SIZE / elapsed, kept))
+
+
+if __name__ == '__main__':
+    main()
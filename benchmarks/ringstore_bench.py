@@ -0,0 +1,54 @@
+# coding=utf-8
+"""
+    Records/sec appended to a ring file, and time to look up and read a
+    one hour range out of a full ring, from a writer and from a reader
+    mapping the same file.
+
+        python -m benchmarks.ringstore_bench
+"""
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy
+
+from pyosio.ringstore import RingFile
+
+CAPACITY = 2 * 1024 * 1024
+BATCH = 10000
+START = 1451606400
+
+
+def main():
+    root = tempfile.mkdtemp()
+    try:
+        path = root + '/bench.ring'
+        writer = RingFile(path, ['temperature', 'humidity'], CAPACITY, writable=True)
+        values = {'temperature': numpy.random.random(BATCH), 'humidity': numpy.random.random(BATCH)}
+        devices = numpy.arange(BATCH, dtype=numpy.int32) % 50
+        start = time.time()
+        total = 0
+        while total < CAPACITY * 1.5:
+            dates = (START + total + numpy.arange(BATCH)) * 1000
+            total += writer.append(dates, devices, values)
+        elapsed = time.time() - start
+        sys.stdout.write('append %12.0f records/s\n' % (total / elapsed))
+
+        reader = RingFile(path)
+        newest = START + total
+        for name, ring in (('writer', writer), ('reader', reader)):
+            start = time.time()
+            for i in range(1000):
+                rows = ring.read(newest - 7200 - i, newest - 3600 - i)
+                rows['temperature'].mean()
+            elapsed = (time.time() - start) / 1000
+            sys.stdout.write('%s one hour range %8.1f us, %d records\n' % (name, elapsed * 1e6, len(rows)))
+        reader.close()
+        writer.close()
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
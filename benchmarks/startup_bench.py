@@ -0,0 +1,46 @@
+# coding=utf-8
+"""
+    Cold start of a short-lived job: a fresh interpreter importing
+    :py:mod:`pyosio.osio` and making its first REST call against a local mock
+    server.
+
+        python -m benchmarks.startup_bench
+"""
+import os
+import subprocess
+import sys
+
+from benchmarks.mock_server import MockServer
+
+N_RUNS = 10
+
+SCRIPT = '''
+import sys, time
+start = time.time()
+from pyosio.osio import OpenSensorsAPI
+imported = time.time()
+client = OpenSensorsAPI('bench', 'bench')
+client.base_url = sys.argv[1]
+client.get_topic_meta('bench')
+sys.stdout.write('%f %f' % (imported - start, time.time() - start))
+'''
+
+
+def main():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    imports, firsts = [], []
+    with MockServer() as server:
+        for _ in range(N_RUNS):
+            output = subprocess.check_output([sys.executable, '-c', SCRIPT, server.url], env=env)
+            imported, first = output.split()
+            imports.append(float(imported))
+            firsts.append(float(first))
+    imports.sort()
+    firsts.sort()
+    sys.stdout.write('%-28s %8.1f ms\n' % ('import pyosio.osio', imports[N_RUNS // 2] * 1000))
+    sys.stdout.write('%-28s %8.1f ms\n' % ('import + first request', firsts[N_RUNS // 2] * 1000))
+
+
+if __name__ == '__main__':
+    main()
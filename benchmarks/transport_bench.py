@@ -0,0 +1,40 @@
+# coding=utf-8
+"""
+    Requests/sec for metadata calls against a local mock server, comparing a
+    fresh connection per call (module level ``requests.get``) with the pooled
+    :py:class:`pyosio.transport.Transport`.
+
+        python -m benchmarks.transport_bench
+"""
+import sys
+import time
+
+import requests
+
+from benchmarks.mock_server import MockServer
+from pyosio.osio import OpenSensorsAPI
+
+N_CALLS = 2000
+
+
+def bench(label, fn, n=N_CALLS):
+    start = time.time()
+    for _ in range(n):
+        fn()
+    elapsed = time.time() - start
+    sys.stdout.write('%-28s %8.0f req/s\n' % (label, n / elapsed))
+
+
+def main():
+    with MockServer() as server:
+        url = server.url + 'v1/topics/bench'
+        bench('requests.get (no pool)', lambda: requests.get(url).json())
+
+        client = OpenSensorsAPI('bench', 'bench')
+        client.base_url = server.url
+        bench('OpenSensorsAPI (pooled)', lambda: client.get_topic_meta('bench'))
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,917 @@
+# coding=utf-8
+"""
+    asyncio flavour of :py:class:`pyosio.osio.OpenSensorsAPI` (Python 3.6+).
+
+    Every endpoint of the blocking client is available as a coroutine with the
+    same name and arguments; the SSE endpoints are async generators. Requests go
+    through a single ``aiohttp`` connection pool so thousands of calls can be in
+    flight on one event loop.
+"""
+import asyncio
+import logging
+
+from .errors import *
+from .fanout import FanOutResult, _call
+from .retry import RetryPolicy
+from .deadline import current_deadline
+from .singleflight import SingleFlightStats, share_json
+from .transport import gzip_compress
+from .endpoints import install_async, REGISTRY
+from .pagination import Cursor, Paginator, check_page, format_date, next_cursor
+from . import codec
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Handle library reorganisation Python 2 > Python 3.
+try:
+    from urllib.parse import urljoin
+except ImportError:
+    from urlparse import urljoin
+
+
+class AsyncResponse(object):
+
+    """
+        Fully read response, exposing the subset of :py:class:`requests.Response`
+        used by the endpoint methods.
+    """
+
+    def __init__(self, status_code, headers, content, url):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        """
+                :returns: The decoded body, decoded once
+                """
+        return codec.decode_response(self)
+
+    def __bool__(self):
+        return self.status_code < 400
+
+    __nonzero__ = __bool__
+
+
+class AsyncPaginator(Paginator):
+
+    """
+        asyncio flavour of :py:class:`pyosio.pagination.Paginator`, iterated
+        with ``async for``; ``fetch`` is a coroutine function.
+    """
+
+    async def _pages(self):
+        cursor = self.cursor
+        while not cursor.done:
+            page = check_page(await self._fetch(cursor.url, cursor.params))
+            following = next_cursor(page, cursor)
+            yield cursor, page, following
+            cursor = following
+
+    async def _iter_pages(self):
+        async for cursor, page, following in self._pages():
+            messages = self._messages(page)
+            self.cursor = following
+            if messages[cursor.offset:]:
+                yield messages[cursor.offset:]
+
+    async def _iter_messages(self):
+        async for cursor, page, following in self._pages():
+            messages = self._messages(page)
+            for offset in range(cursor.offset, len(messages)):
+                if offset + 1 < len(messages):
+                    self.cursor = Cursor(cursor.url, cursor.params, offset + 1)
+                else:
+                    self.cursor = following
+                yield messages[offset]
+            self.cursor = following
+
+    def __aiter__(self):
+        return self._iter_pages() if self.pages else self._iter_messages()
+
+    async def columns(self, fields=None):
+        """
+                Iterate with ``async for`` over the pages as
+                :py:class:`pyosio.columnar.MessageBatch` objects, see
+                :py:meth:`pyosio.pagination.Paginator.columns`.
+                """
+        from .columnar import Decoder
+        decoder = Decoder(fields)
+        async for messages in self._iter_pages():
+            yield decoder.decode(messages)
+
+    def __iter__(self):
+        raise TypeError('Use "async for" to iterate over an AsyncPaginator.')
+
+
+class AsyncSingleFlight(object):
+
+    """
+        asyncio flavour of :py:class:`pyosio.singleflight.SingleFlight`: tasks
+        asking for a key already in flight await the same future.
+    """
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        self._calls = {}
+
+    async def do(self, key, factory, share=None):
+        """
+                :param key: Hashable identity of the call
+                :param factory: Coroutine function doing the work, called by the first task only
+                :param share: Callable applied to the result handed to every other task
+
+                :returns: The result of the coroutine
+                """
+        future = self._calls.get(key)
+        leader = future is None
+        if leader:
+            self.stats.calls += 1
+            future = self._calls[key] = asyncio.ensure_future(factory())
+            future.add_done_callback(lambda f: self._done(key, f))
+        else:
+            self.stats.collapsed += 1
+        # A cancelled waiter must not cancel the call the others are awaiting.
+        result = await asyncio.shield(future)
+        return share(result) if share is not None and not leader else result
+
+    def _done(self, key, future):
+        del self._calls[key]
+        if not future.cancelled():
+            future.exception()
+
+
+@install_async
+class AsyncOpenSensorsAPI(object):
+
+    """
+        Non-blocking OpenSensorsAPI client built on asyncio and aiohttp.
+
+        Use it as an async context manager, or call :py:meth:`close` when done::
+
+            async with AsyncOpenSensorsAPI(user_id, api_key) as osio_client:
+                meta = await osio_client.get_topic_meta(topic)
+
+    """
+    DEFAULT_TIMEOUT = 10
+    DEFAULT_CONNECT_TIMEOUT = 5
+    DEFAULT_STREAM_IDLE_TIMEOUT = 90
+    DEFAULT_API_BASE_URL = 'https://api.opensensors.io/'
+    DEFAULT_REALTIME_API_URL = 'https://realtime.opensensors.io/'
+    DEFAULT_VERSIONS = ['v1', 'v2']
+    DEFAULT_CONNECTION_LIMIT = 1000
+    DEFAULT_CONNECTION_LIMIT_PER_HOST = 0
+    DEFAULT_SSE_RETRY = 3000
+    DEFAULT_FAN_OUT_CONCURRENCY = 100
+
+    def __init__(self, user_id, api_key, version='v1', limit=DEFAULT_CONNECTION_LIMIT,
+                 limit_per_host=DEFAULT_CONNECTION_LIMIT_PER_HOST, session=None, retry=None,
+                 rate_limiter=None, timeout=None, stream_idle_timeout=None, coalesce=True,
+                 compress_min_bytes=None, metadata_cache=None):
+        """
+                Initialize the class with you user_id and secret_key.
+
+                :param user_id: OpenSensors user id
+                :type user_id: :py:class:`str`
+
+                :param api_key: OpenSensors secret key
+                :type api_key: :py:class:`str`
+
+                :param version: Version of Open Sensors API
+                :type version: :py:class:`str`
+
+                :param limit: Maximum number of simultaneous connections
+                :type limit: :py:class:`int`
+
+                :param limit_per_host: Maximum number of simultaneous connections per host, 0 for no limit
+                :type limit_per_host: :py:class:`int`
+
+                :param session: Session to use instead of creating one
+                :type session: :py:class:`aiohttp.ClientSession`
+
+                :param retry: Retry policy applied to every request and stream connect
+                :type retry: :py:class:`pyosio.retry.RetryPolicy`
+
+                :param rate_limiter: Client-side pacing of requests, may be shared between clients
+                :type rate_limiter: :py:class:`pyosio.ratelimit.RateLimiter`
+
+                :param timeout: Request timeout in seconds, or a (connect, read) tuple
+                :type timeout: :py:class:`float` or :py:class:`tuple`
+
+                :param stream_idle_timeout: Seconds without data after which a stream is
+                        considered stalled and reconnected
+                :type stream_idle_timeout: :py:class:`float`
+
+                :param coalesce: Share one request between identical concurrent GETs
+                :type coalesce: :py:class:`bool`
+
+                :param compress_min_bytes: Gzip JSON request bodies of at least this size
+                :type compress_min_bytes: :py:class:`int`
+
+                :param metadata_cache: TTL cache of decoded metadata results
+                :type metadata_cache: :py:class:`pyosio.cache.MetadataCache`
+
+                """
+        if aiohttp is None:
+            raise OSIOClientError('AsyncOpenSensorsAPI requires the aiohttp package.')
+
+        self.user_id = user_id
+        self.api_key = api_key
+        self.version = version
+        self.base_url = self.DEFAULT_API_BASE_URL
+        self.realtime_base_url = self.DEFAULT_REALTIME_API_URL
+        self._headers = {"Content-Type": "application/json", "Accept": "application/json",
+                         'Authorization': 'api-key ' + self.api_key,
+                         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/47.0.2526.106 Safari/537.36"}
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._session = session
+        self._retry = retry if retry is not None else RetryPolicy()
+        self._rate_limiter = rate_limiter
+        self.timeout = timeout if timeout is not None else (self.DEFAULT_CONNECT_TIMEOUT, self.DEFAULT_TIMEOUT)
+        self.stream_idle_timeout = stream_idle_timeout or self.DEFAULT_STREAM_IDLE_TIMEOUT
+        self._single_flight = AsyncSingleFlight() if coalesce else None
+        self.compress_min_bytes = compress_min_bytes
+        self._metadata_cache = metadata_cache
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    @property
+    def session(self):
+        """
+                The shared aiohttp session, created on first use inside the running loop.
+                """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._limit, limit_per_host=self._limit_per_host)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self):
+        """
+                Close the pooled connections.
+                """
+        if self._session is not None:
+            await self._session.close()
+
+    @property
+    def retry_stats(self):
+        """
+                Counters of the retry policy, see :py:attr:`pyosio.osio.OpenSensorsAPI.retry_stats`.
+                """
+        return self._retry.stats.as_dict()
+
+    @property
+    def rate_limit_stats(self):
+        """
+                Counters of the rate limiter, or None without a rate limiter.
+                """
+        return self._rate_limiter.stats.as_dict() if self._rate_limiter is not None else None
+
+    @property
+    def cache_stats(self):
+        """
+                Counters of the metadata cache, or None without a metadata cache.
+                """
+        return self._metadata_cache.stats.as_dict() if self._metadata_cache is not None else None
+
+    @property
+    def coalesce_stats(self):
+        """
+                Counters of request coalescing, or None when coalescing is off.
+                """
+        return self._single_flight.stats.as_dict() if self._single_flight is not None else None
+
+    async def _sleep(self, delay):
+        """
+                Sleep without blocking the event loop, failing fast instead of
+                sleeping past the current deadline.
+                """
+        deadline = current_deadline()
+        if deadline is not None and delay >= deadline.remaining():
+            raise TimeoutError(deadline.seconds)
+        await asyncio.sleep(delay)
+
+    async def _pace(self, url):
+        """
+                Wait for the rate limiter. Reserving may take a file lock when the
+                limiter is shared between processes, so it runs in the executor.
+                """
+        if self._rate_limiter is not None:
+            loop = asyncio.get_event_loop()
+            wait = await loop.run_in_executor(None, self._rate_limiter.reserve, url)
+            if wait > 0:
+                try:
+                    await self._sleep(wait)
+                except TimeoutError:
+                    await loop.run_in_executor(None, self._rate_limiter.refund, url, wait)
+                    raise
+
+    def _timeout(self, stream=False):
+        """
+                :returns: The aiohttp timeout of a request, clamped to the current deadline.
+                        For streams the read timeout is the idle timeout.
+                """
+        connect, read = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+        if stream:
+            read = self.stream_idle_timeout
+        total = None
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.check()
+            total = deadline.remaining()
+        return aiohttp.ClientTimeout(total=total, sock_connect=connect, sock_read=read)
+
+    # ---------------------------------------- #
+    # SETers/GETers
+    # ---------------------------------------- #
+
+    def _set_version(self, version):
+        """
+                Set the used version
+
+                :param version: Version of the API.
+                :type version: :py:class:`str`
+
+                """
+        if version in self.DEFAULT_VERSIONS:
+            self.version = version
+        else:
+            self.logger.warn('Invalid API version')
+
+    # ---------------------------------------- #
+    # CRUD Handlers: GET, POST, DELETE, PUT
+    # ---------------------------------------- #
+
+    async def _request(self, method, url, supported_versions, headers=None, params=None, data=None):
+        """
+                Send a request and read the whole body
+
+                :param method: HTTP method
+                :type method: :py:class:`str`
+
+                :param url: The url for the endpoint including path parameters
+                :type url: :py:class:`str`
+
+                :param supported_versions: list of supported versions through this API endpoint.
+                :type supported_versions: :py:class:`list`
+
+                :returns: The Reponse from the API
+                """
+        if self.version not in supported_versions:
+            raise OSIOClientApiError(
+                'Version %s is not supported. \n' % self.version)
+
+        url = urljoin(self.base_url, url)
+        body = None
+        if data is not None:
+            body = codec.dumps(data)
+            if self.compress_min_bytes is not None and len(body) >= self.compress_min_bytes:
+                body = gzip_compress(body)
+                headers = dict(headers or {}, **{'Content-Encoding': 'gzip'})
+        attempt = 0
+        while True:
+            attempt += 1
+            self._retry.stats.record(attempts=1)
+            await self._pace(url)
+            try:
+                async with self.session.request(method, url, headers=headers, params=params or None,
+                                                data=body, timeout=self._timeout()) as response:
+                    content = await response.read()
+                    result = AsyncResponse(response.status, response.headers, content, str(response.url))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = 'connect' if isinstance(e, aiohttp.ClientConnectorError) else 'read'
+                delay = self._retry.delay(method, attempt, error=error)
+                if delay is None:
+                    raise OSIOClientApiError(
+                        'Invalid API server response.\n%s' % e)
+            else:
+                delay = self._retry.delay(method, attempt, result.status_code, result.headers)
+                if delay is None:
+                    return result
+            await self._sleep(delay)
+
+    async def _shared_get(self, url, supported_versions, headers, params):
+        """
+                GET shared between identical concurrent tasks, who all receive a
+                copy of the same response and decode its JSON on their own.
+
+                :returns: The Reponse from the API
+                """
+        if self._single_flight is None:
+            return await self._request('GET', url, supported_versions, headers=headers, params=params)
+
+        key = (self.version, url, tuple(sorted((str(k), str(v)) for k, v in params.items())),
+               (headers or {}).get('Authorization'))
+        return await self._single_flight.do(
+            key, lambda: self._request('GET', url, supported_versions, headers=headers, params=params),
+            share_json)
+
+    async def _get(self, url, supported_versions, **queryparams):
+        """
+                Handle authenticated GET requests
+
+                :param url: The url for the endpoint including path parameters
+                :type url: :py:class:`str`
+
+                :param supported_versions: list of supported versions through this API endpoint.
+                :type supported_versions: :py:class:`list`
+
+                :param queryparams: The query string parameters
+                :returns: The Reponse from the API
+                """
+        return await self._shared_get(url, supported_versions, self._headers, queryparams)
+
+    async def _get_pub(self, url, supported_versions, **queryparams):
+        """
+                Handle public GET requests
+
+                :param url: The url for the endpoint including path parameters
+                :type url: :py:class:`str`
+
+                :param supported_versions: list of supported versions through this API endpoint.
+                :type supported_versions: :py:class:`list`
+
+                :param queryparams: The query string parameters
+                :returns: The Reponse from the API
+                """
+        return await self._shared_get(url, supported_versions, None, queryparams)
+
+    async def _get_history(self, url, supported_versions, **queryparams):
+        """
+                Handle authenticated GET requests for stored messages. The async
+                client has no page cache, this is :py:meth:`_get`.
+
+                :returns: The Reponse from the API
+                """
+        return await self._get(url, supported_versions, **queryparams)
+
+    async def _post(self, url, supported_versions, data=None):
+        """
+                Handle authenticated POST requests
+
+                :param url: The url for the endpoint including path parameters
+                :type url: :py:class:`str`
+
+                :param supported_versions: list of supported versions through this API endpoint.
+                :type supported_versions: :py:class:`list`
+
+                :param data: The request body parameters
+                :type data: :py:data:`none` or :py:class:`dict`
+
+                :returns: The Reponse from the API or an error message
+                """
+        return await self._request('POST', url, supported_versions, headers=self._headers, data=data)
+
+    async def _delete(self, url, supported_versions, data=None):
+        """
+                Handle authenticated DELETE requests
+
+                :param url: The url for the endpoint including path parameters
+                :type url: :py:class:`str`
+
+                :param supported_versions: list of supported versions through this API endpoint.
+                :type supported_versions: :py:class:`list`
+
+                :returns: The Reponse from the API
+                """
+        return await self._request('DELETE', url, supported_versions, headers=self._headers, data=data)
+
+    async def _patch(self, url, supported_versions, data=None):
+        """
+                Handle authenticated PATCH requests
+
+                :param url: The url for the endpoint including path parameters
+                :type url: :py:class:`str`
+
+                :param supported_versions: list of supported versions through this API endpoint.
+                :type supported_versions: :py:class:`list`
+
+                :param data: The request body parameters
+                :type data: :py:data:`none` or :py:class:`dict`
+
+                :returns: The Reponse from the API
+                """
+        return await self._request('PATCH', url, supported_versions, headers=self._headers, data=data)
+
+    async def _put(self, url, supported_versions, data=None):
+        """
+                Handle authenticated PUT requests
+
+                :param url: The url for the endpoint including path parameters
+                :type url: :py:class:`str`
+
+                :param supported_versions: list of supported versions through this API endpoint.
+                :type supported_versions: :py:class:`list`
+
+                :param data: The request body parameters
+                :type data: :py:data:`none` or :py:class:`dict`
+
+                :returns: The Reponse from the API
+                """
+        return await self._request('PUT', url, supported_versions, headers=self._headers, data=data)
+
+    def _get_json(self, response):
+        """
+                :param response: Fully read response
+
+                :returns: The json file
+                """
+        if response.status_code in [200, 204, 422, 500]:
+            return response.json()
+        else:
+            return None
+
+    async def _open_stream(self, url, headers, params, failures=0):
+        """
+                Open a stream through the rate limiter and the retry policy, like
+                :py:meth:`_request` but without reading the body
+
+                :param url: Absolute url
+                :type url: :py:class:`str`
+
+                :param failures: Failed attempts already made, e.g. by streams
+                        that were interrupted before delivering anything
+                :type failures: :py:class:`int`
+
+                :returns: The aiohttp response, to be released by the caller
+                """
+        attempt = failures
+        while True:
+            attempt += 1
+            self._retry.stats.record(attempts=1)
+            await self._pace(url)
+            try:
+                response = await self.session.get(url, headers=headers, params=params or None,
+                                                  timeout=self._timeout(stream=True))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = 'connect' if isinstance(e, aiohttp.ClientConnectorError) else 'read'
+                delay = self._retry.delay('GET', attempt, error=error)
+                if delay is None:
+                    raise OSIOClientApiError(
+                        'Invalid API server response.\n%s' % e)
+            else:
+                delay = self._retry.delay('GET', attempt, response.status, response.headers)
+                if delay is None:
+                    return response
+                response.release()
+            await self._sleep(delay)
+
+    async def _get_stream_data(self, url, supported_versions, **queryparams):
+        """
+                Handle authenticated GET requests to get streams of data
+
+                :param url: The url for the endpoint including path parameters
+                :type url: :py:class:`str`
+
+                :param supported_versions: list of supported versions through this API endpoint.
+                :type supported_versions: :py:class:`list`
+
+                :param queryparams: The query string parameters
+
+                :returns: An async generator of decoded lines
+                """
+        if self.version not in supported_versions:
+            raise OSIOClientApiError(
+                'Version %s is not supported. \n' % self.version)
+
+        url = urljoin(self.realtime_base_url, url)
+        response = await self._open_stream(url, self._headers, queryparams)
+        try:
+            async with response:
+                async for line in response.content:
+                    line = line.strip()
+                    if line:
+                        try:
+                            yield codec.loads(line)
+                        except ValueError:
+                            pass
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise OSIOClientApiError(
+                'Invalid API server response.\n%s' % e)
+
+    async def _get_stream_events(self, url, supported_versions, **queryparams):
+        """
+                Handle authenticated GET requests to get streams of Server-Sent Events.
+                The stream reconnects, sending Last-Event-ID, when the server closes it.
+                Connections that end before delivering an event count as failed
+                attempts of the retry policy, which gives up after ``max_attempts``.
+
+                :param url: The url for the endpoint including path parameters
+                :type url: :py:class:`str`
+
+                :param supported_versions: list of supported versions through this API endpoint.
+                :type supported_versions: :py:class:`list`
+
+                :param queryparams: The query string parameters
+
+                :returns: An async generator of decoded events
+                """
+        if self.version not in supported_versions:
+            raise OSIOClientApiError(
+                'Version %s is not supported. \n' % self.version)
+
+        url = urljoin(self.realtime_base_url, url)
+        # add key to parameters
+        queryparams['api-key'] = self.api_key
+        headers = {'Accept': 'text/event-stream', 'Cache-Control': 'no-cache'}
+        last_id = None
+        retry = self.DEFAULT_SSE_RETRY
+        failures = 0
+
+        while True:
+            if last_id is not None:
+                headers['Last-Event-ID'] = last_id
+            response = await self._open_stream(url, headers, queryparams, failures)
+            if response.status != 200:
+                response.release()
+                raise OSIOClientApiError(
+                    'Invalid API server response.\n%s' % response.status)
+            received = False
+            try:
+                async with response:
+                    data = []
+                    async for line in response.content:
+                        line = line.decode('utf-8').rstrip('\r\n')
+                        if not line:
+                            if data:
+                                received = True
+                                yield codec.loads('\n'.join(data))
+                                data = []
+                            continue
+                        field, _, value = line.partition(':')
+                        if value.startswith(' '):
+                            value = value[1:]
+                        if field == 'data':
+                            data.append(value)
+                        elif field == 'id':
+                            last_id = value
+                        elif field == 'retry' and value.isdigit():
+                            retry = int(value)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.logger.info('SSE stream interrupted: %s', e)
+
+            delay = retry / 1000.0
+            failures = 0 if received else failures + 1
+            if failures:
+                backoff = self._retry.delay('GET', failures, error='read')
+                if backoff is None:
+                    raise OSIOClientApiError(
+                        'SSE stream closed %d times without an event.' % failures)
+                delay = max(delay, backoff)
+            await self._sleep(delay)
+
+    # ---------------------------------------- #
+    # Batch helpers
+    # ---------------------------------------- #
+
+    async def fan_out(self, endpoint, argsets, concurrency=DEFAULT_FAN_OUT_CONCURRENCY, ordered=False):
+        """
+                Call an endpoint for many argument sets with bounded concurrency,
+                see :py:meth:`pyosio.osio.OpenSensorsAPI.fan_out`.
+
+                    async for item in osio_client.fan_out('get_topic_meta', topics):
+                        ...
+
+                :param endpoint: Name of an endpoint coroutine, or a coroutine function
+                :type endpoint: :py:class:`str`
+
+                :param argsets: Iterable of argument sets: a tuple of positional
+                        arguments, a dict of keyword arguments or a single argument
+
+                :param concurrency: Number of calls in flight
+                :type concurrency: :py:class:`int`
+
+                :param ordered: Yield results in input order
+                :type ordered: :py:class:`bool`
+
+                :returns: An async generator of :py:class:`pyosio.fanout.FanOutResult`
+                """
+        fn = endpoint if callable(endpoint) else getattr(self, endpoint)
+
+        async def run(index, args):
+            try:
+                return FanOutResult(index, args, await _call(fn, args), None)
+            except Exception as e:
+                return FanOutResult(index, args, None, e)
+
+        argsets = iter(argsets)
+        pending = set()
+        buffered = {}
+        next_index = 0
+        submitted = 0
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) + len(buffered) < concurrency:
+                    try:
+                        args = next(argsets)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.add(asyncio.ensure_future(run(submitted, args)))
+                    submitted += 1
+
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    item = task.result()
+                    if not ordered:
+                        yield item
+                    else:
+                        buffered[item.index] = item
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # ---------------------------------------- #
+    # OpenSensors REST API
+    # api.opensensors.io
+    #
+    # Endpoints are declared in pyosio.endpoints and installed on the class;
+    # only those with custom logic are written out below.
+    # ---------------------------------------- #
+
+    async def _call(self, endpoint, args, queryparams=None, data=None):
+        """
+                Call a registered endpoint, see :py:meth:`pyosio.osio.OpenSensorsAPI._call`.
+
+                :returns: The result of the endpoint
+                """
+        url = endpoint.url(self.version, args)
+        handler = getattr(self, endpoint.handler)
+        # A pyosio.query.MessageQuery with client-side filters selects the
+        # messages of the page.
+        select = queryparams.select if getattr(queryparams, 'filtered', False) else None
+        if select is not None and endpoint.handler != '_get_history':
+            raise OSIOClientError('%s does not return messages to filter.' % endpoint.name)
+
+        cache = self._metadata_cache
+        if cache is not None:
+            arguments = args + ((data,) if endpoint.body else ()) + \
+                ((queryparams,) if endpoint.query else ())
+            if endpoint.cache:
+                hit, value = cache.get(endpoint.name, arguments, self.version)
+                if hit:
+                    return value
+
+        try:
+            if endpoint.write:
+                response = await handler(url, endpoint.versions, data)
+            else:
+                response = await handler(url, endpoint.versions, **(queryparams or {}))
+        finally:
+            if cache is not None:
+                for name, n in endpoint.invalidates:
+                    cache.invalidate(name, arguments[:n])
+
+        if endpoint.result == 'ok':
+            return response.status_code in (200, 204, 422)
+        if endpoint.result == 'text':
+            return response.text if response else response
+        value = self._get_json(response)
+        if select is not None and isinstance(value, dict) and isinstance(value.get('messages'), list):
+            value = dict(value, messages=select(value['messages']))
+        # Error bodies (422, 500) are decoded too, but must not be served from the cache.
+        if cache is not None and endpoint.cache and value is not None and \
+                200 <= response.status_code < 300:
+            cache.put(endpoint.name, arguments, value, self.version)
+        return value
+
+
+    # ---------------------------------------- #
+    # [v1/v2] login : Login and retreive a JWT
+    # ---------------------------------------- #
+
+    async def who_am_i(self):
+        """
+                Returns the user id associated with the API key or JWT token
+                GET /v*/whoami
+
+                :returns: The JSON output from the API or an error message
+                """
+        url = "/{}/whoami".format(self.version)
+        response = (await self._get(url, ["v1", "v2"])).text
+
+        if self.version == "v1":
+            return {"username": response}
+        else:
+            return codec.loads(response)
+
+    async def login(self, user_id, password=None):
+        """
+                Login and retrieve a JWT token [NO-AUTH]
+                POST /v2/login
+
+                :param user_id: The unique id for the user.
+                :type user_id: :py:class:`str`
+
+                :param password: password, this will be entered through getpass package.
+                :type password: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """
+        if not password:
+            import getpass
+            password = getpass.getpass(
+                "Enter your password to login into OpenSensorIO: ")  # use getpass to get passwd without echoing it back
+
+        credentials_input = {"username": user_id, "password": password}
+        url = "/{}/login".format(self.version)
+        response = await self._post(url, ["v1", "v2"], data=credentials_input)
+        if self.version == "v1":
+            return response.json()
+        else:
+            return response.json()
+
+    # ---------------------------------------- #
+    # [v1/v2] messages : Stored messages
+    # ---------------------------------------- #
+
+    def _paginate(self, name, args, start_date, end_date, queryparams, cursor, pages):
+        """
+                :returns: A :py:class:`AsyncPaginator` over a message endpoint
+                """
+        endpoint = REGISTRY[name]
+        if isinstance(cursor, dict):
+            cursor = Cursor.from_dict(cursor)
+        if cursor is None:
+            params = dict(queryparams or {})
+            if start_date is not None:
+                params['start-date'] = format_date(start_date)
+            if end_date is not None:
+                params['end-date'] = format_date(end_date)
+            cursor = Cursor(endpoint.url(self.version, args), params)
+        handler = getattr(self, endpoint.handler)
+
+        async def fetch(url, params):
+            return await handler(url, endpoint.versions, **params)
+
+        # A pyosio.query.MessageQuery with client-side filters selects the
+        # messages of every page.
+        select = queryparams.select if getattr(queryparams, 'filtered', False) else None
+        return AsyncPaginator(fetch, cursor, pages, select=select)
+
+    def iter_device_msgs(self, client_id, start_date=None, end_date=None, queryparams=None,
+                         cursor=None, pages=False):
+        """
+                Iterate over all messages of a device with ``async for``, see
+                :py:meth:`pyosio.osio.OpenSensorsAPI.iter_device_msgs`.
+
+                :returns: An :py:class:`AsyncPaginator`
+                """
+        return self._paginate('get_device_msgs', (client_id,), start_date, end_date, queryparams,
+                              cursor, pages)
+
+    def iter_topic_msgs(self, topic, start_date=None, end_date=None, queryparams=None,
+                        cursor=None, pages=False):
+        """
+                Iterate over all messages of a topic with ``async for``, see
+                :py:meth:`pyosio.osio.OpenSensorsAPI.iter_topic_msgs`.
+
+                :returns: An :py:class:`AsyncPaginator`
+                """
+        return self._paginate('get_topic_msgs', (topic,), start_date, end_date, queryparams,
+                              cursor, pages)
+
+    def iter_user_msgs(self, user_id, start_date=None, end_date=None, queryparams=None,
+                       cursor=None, pages=False):
+        """
+                Iterate over all messages of a user with ``async for``, see
+                :py:meth:`pyosio.osio.OpenSensorsAPI.iter_user_msgs`.
+
+                :returns: An :py:class:`AsyncPaginator`
+                """
+        return self._paginate('get_user_msgs', (user_id,), start_date, end_date, queryparams,
+                              cursor, pages)
+
+    def iter_pub_dataset_msgs(self, dataset_id, start_date=None, end_date=None, queryparams=None,
+                              cursor=None, pages=False):
+        """
+                Iterate over all messages of a public dataset with ``async for``, see
+                :py:meth:`pyosio.osio.OpenSensorsAPI.iter_pub_dataset_msgs`.
+
+                :returns: An :py:class:`AsyncPaginator`
+                """
+        return self._paginate('get_pub_dataset_msgs', (dataset_id,), start_date, end_date,
+                              queryparams, cursor, pages)
@@ -0,0 +1,138 @@
+# coding=utf-8
+"""
+    Parallel download of message history.
+
+    The ``start-date``/``end-date`` range is cut into consecutive time shards
+    that are fetched concurrently, each one page after page, and handed back
+    in time order as a single stream. Shard lengths follow the observed
+    message density so that every shard holds about ``target_messages``.
+"""
+import threading
+
+from .pagination import format_date, parse_date
+
+
+def message_time(message):
+    """
+            :returns: The ``date`` of a message in seconds since the epoch, or None
+            """
+    return parse_date(message.get('date')) if isinstance(message, dict) else None
+
+
+class ShardPlanner(object):
+
+    """
+        Iterable of ``(start, end)`` shards covering ``[start, end)``, read
+        lazily: every shard is sized from the density reported so far through
+        :py:meth:`observe`, which may be called from other threads.
+    """
+    DEFAULT_TARGET_MESSAGES = 10000
+    DEFAULT_MIN_SECONDS = 60
+    DEFAULT_MAX_SECONDS = 30 * 24 * 3600
+
+    def __init__(self, start, end, seconds, target_messages=DEFAULT_TARGET_MESSAGES,
+                 min_seconds=DEFAULT_MIN_SECONDS, max_seconds=DEFAULT_MAX_SECONDS):
+        """
+                :param start: First second of the range, since the epoch
+                :type start: :py:class:`int`
+
+                :param end: End of the range (excluded), since the epoch
+                :type end: :py:class:`int`
+
+                :param seconds: Length of the first shards
+                :type seconds: :py:class:`int`
+
+                :param target_messages: Number of messages a shard should hold
+                :type target_messages: :py:class:`int`
+
+                :param min_seconds: Shortest shard
+                :type min_seconds: :py:class:`int`
+
+                :param max_seconds: Longest shard
+                :type max_seconds: :py:class:`int`
+
+                """
+        self.start = start
+        self.end = end
+        self.target_messages = target_messages
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.seconds = self._clamp(seconds)
+        self.shards = 0
+        self._density = None
+        self._lock = threading.Lock()
+
+    def _clamp(self, seconds):
+        return int(max(self.min_seconds, min(self.max_seconds, seconds)))
+
+    def observe(self, seconds, messages):
+        """
+                Report the number of messages found in a shard of ``seconds``
+                """
+        with self._lock:
+            density = float(messages) / max(seconds, 1)
+            if self._density is None:
+                self._density = density
+            else:
+                # Smooth over neighbouring shards, history is rarely uniform.
+                self._density = (self._density + density) / 2
+            if self._density > 0:
+                self.seconds = self._clamp(self.target_messages / self._density)
+            else:
+                self.seconds = self._clamp(self.seconds * 4)
+
+    def __iter__(self):
+        position = self.start
+        while position < self.end:
+            with self._lock:
+                shard = (position, min(position + self.seconds, self.end))
+                self.shards += 1
+            yield shard
+            position = shard[1]
+
+
+def backfill(fetch, planner, fan_out):
+    """
+            Fetch the shards of ``planner`` concurrently and yield their messages
+            in time order. Messages are kept in the shard whose range holds their
+            date, so a message on a shard boundary is yielded once. At most the
+            shards in flight, one fan-out window, are held in memory.
+
+            :param fetch: Callable taking (start_date, end_date) strings and
+                    returning an iterable of messages
+            :param planner: Shards to fetch
+            :type planner: :py:class:`ShardPlanner`
+
+            :param fan_out: Callable running a function over argument sets in
+                    input order, e.g. :py:meth:`pyosio.osio.OpenSensorsAPI.fan_out`
+
+            :returns: A generator of messages
+            """
+    def shard(start, end):
+        messages = []
+        for message in fetch(format_date(start), format_date(end)):
+            when = message_time(message)
+            if when is None or start <= when < end:
+                messages.append((start if when is None else when, message))
+        messages.sort(key=lambda item: item[0])
+        planner.observe(end - start, len(messages))
+        return [message for _, message in messages]
+
+    for item in fan_out(shard, planner):
+        if item.error is not None:
+            raise item.error
+        for message in item.result:
+            yield message
+
+
+def epoch(value, default=None):
+    """
+            :param value: A date accepted by :py:func:`pyosio.pagination.format_date`
+            :returns: Seconds since the epoch
+            """
+    if value is None:
+        return default
+    seconds = parse_date(format_date(value))
+    if seconds is None:
+        raise ValueError('Invalid date %r' % (value,))
+    return seconds
@@ -0,0 +1,169 @@
+# coding=utf-8
+"""
+    Chunked bulk download of public dataset messages.
+
+    ``POST /v2/public/messages/dataset/bulk`` returns the messages of several
+    public datasets in one response. :py:func:`bulk_fetch` cuts any number of
+    dataset ids into bulk requests sized by a :py:class:`ChunkPlanner`, sends
+    them concurrently and hands back the messages of every dataset as soon as
+    its request completes.
+
+    The request body is ``{"dataset-ids": [...]}`` plus the query parameters
+    (``start-date``, ``end-date``...). The response is read either as an
+    object keyed by dataset id, or as a message page whose messages name
+    their ``dataset-id``.
+"""
+import math
+import threading
+
+from . import codec
+from .errors import OSIOClientApiError
+
+IDS_FIELD = 'dataset-ids'
+_DATASET_FIELDS = ('dataset-id', 'dataset_id', 'dataset')
+
+
+def bulk_input(dataset_ids, queryparams=None):
+    """
+            :returns: The body of a bulk request for ``dataset_ids``
+            """
+    body = dict(queryparams or {})
+    body[IDS_FIELD] = list(dataset_ids)
+    return body
+
+
+def _messages(value):
+    if isinstance(value, dict):
+        value = value.get('messages')
+    return value if isinstance(value, list) else []
+
+
+def split_result(result, dataset_ids):
+    """
+            :param result: Decoded bulk response
+            :param dataset_ids: Dataset ids of the request
+            :returns: A list of ``(dataset_id, messages)`` pairs, one per dataset
+                    id, in request order
+            """
+    if isinstance(result, dict) and any(dataset_id in result for dataset_id in dataset_ids):
+        return [(dataset_id, _messages(result.get(dataset_id))) for dataset_id in dataset_ids]
+    grouped = dict((dataset_id, []) for dataset_id in dataset_ids)
+    for message in _messages(result) if isinstance(result, dict) else (result or []):
+        for field in _DATASET_FIELDS:
+            dataset_id = message.get(field) if isinstance(message, dict) else None
+            if dataset_id in grouped:
+                grouped[dataset_id].append(message)
+                break
+    return [(dataset_id, grouped[dataset_id]) for dataset_id in dataset_ids]
+
+
+class ChunkPlanner(object):
+
+    """
+        Iterable of lists of dataset ids, read lazily: every chunk is sized so
+        that its response holds about ``target_bytes``, from the response
+        sizes reported so far through :py:meth:`observe`, and kept under the
+        size of any chunk the server rejected as too large.
+    """
+    DEFAULT_CHUNK_SIZE = 100
+    DEFAULT_MAX_CHUNK_SIZE = 1000
+    DEFAULT_TARGET_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, dataset_ids, chunk_size=DEFAULT_CHUNK_SIZE, max_chunk_size=DEFAULT_MAX_CHUNK_SIZE,
+                 target_bytes=DEFAULT_TARGET_BYTES, workers=1):
+        """
+                :param dataset_ids: Dataset ids to fetch; duplicates are fetched once
+                :type dataset_ids: :py:class:`list`
+
+                :param chunk_size: Dataset ids of the first chunks
+                :type chunk_size: :py:class:`int`
+
+                :param max_chunk_size: Largest chunk
+                :type max_chunk_size: :py:class:`int`
+
+                :param target_bytes: Response size a chunk should have
+                :type target_bytes: :py:class:`int`
+
+                :param workers: Concurrent requests: the first chunks are made small
+                        enough to give every worker one
+                :type workers: :py:class:`int`
+
+                """
+        seen = set()
+        self.dataset_ids = [i for i in dataset_ids if not (i in seen or seen.add(i))]
+        self.max_chunk_size = max_chunk_size
+        self.target_bytes = target_bytes
+        spread = int(math.ceil(float(len(self.dataset_ids)) / max(1, workers)))
+        self.chunk_size = self._clamp(min(chunk_size, spread))
+        self.chunks = 0
+        self._bytes_per_dataset = None
+        self._lock = threading.Lock()
+
+    def _clamp(self, size):
+        return int(max(1, min(self.max_chunk_size, size)))
+
+    def observe(self, datasets, nbytes):
+        """
+                Report the response size of a chunk of ``datasets`` dataset ids
+                """
+        with self._lock:
+            per_dataset = float(nbytes) / max(datasets, 1)
+            if self._bytes_per_dataset is None:
+                self._bytes_per_dataset = per_dataset
+            else:
+                self._bytes_per_dataset = (self._bytes_per_dataset + per_dataset) / 2
+            if self._bytes_per_dataset > 0:
+                self.chunk_size = self._clamp(self.target_bytes / self._bytes_per_dataset)
+
+    def reject(self, datasets):
+        """
+                Report that a chunk of ``datasets`` dataset ids was too large
+                """
+        with self._lock:
+            self.max_chunk_size = max(1, min(self.max_chunk_size, datasets // 2))
+            self.chunk_size = self._clamp(self.chunk_size)
+
+    def __iter__(self):
+        position = 0
+        while position < len(self.dataset_ids):
+            with self._lock:
+                chunk = self.dataset_ids[position:position + self.chunk_size]
+                self.chunks += 1
+            yield chunk
+            position += len(chunk)
+
+
+def bulk_fetch(fetch, planner, fan_out):
+    """
+            Fetch the chunks of ``planner`` concurrently and yield the messages of
+            every dataset, in order of completion. A chunk answered with HTTP 413
+            is split in two and fetched again.
+
+            :param fetch: Callable taking a list of dataset ids and returning the
+                    response of their bulk request
+            :param planner: Chunks to fetch
+            :type planner: :py:class:`ChunkPlanner`
+
+            :param fan_out: Callable running a function over argument sets, e.g.
+                    :py:meth:`pyosio.osio.OpenSensorsAPI.fan_out`
+
+            :returns: A generator of ``(dataset_id, messages)`` pairs
+            """
+    def chunk(dataset_ids):
+        response = fetch(dataset_ids)
+        status = getattr(response, 'status_code', None)
+        if status == 413 and len(dataset_ids) > 1:
+            planner.reject(len(dataset_ids))
+            half = len(dataset_ids) // 2
+            return chunk(dataset_ids[:half]) + chunk(dataset_ids[half:])
+        if status != 200:
+            raise OSIOClientApiError(
+                'Invalid API server response.\nHTTP %s for %s' % (status, getattr(response, 'url', None)))
+        planner.observe(len(dataset_ids), len(response.content))
+        return split_result(codec.decode_response(response), dataset_ids)
+
+    for item in fan_out(chunk, ((dataset_ids,) for dataset_ids in planner)):
+        if item.error is not None:
+            raise item.error
+        for result in item.result:
+            yield result
@@ -0,0 +1,138 @@
+# coding=utf-8
+import threading
+import time
+from collections import OrderedDict
+
+
+class MetadataCacheStats(object):
+
+    """
+        Counters kept by a :py:class:`MetadataCache`.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def as_dict(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'expirations': self.expirations, 'invalidations': self.invalidations}
+
+
+def _freeze(value):
+    """
+            :returns: A hashable equivalent of an endpoint argument
+            """
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class MetadataCache(object):
+
+    """
+        In-memory cache of decoded endpoint results with per-endpoint TTLs and
+        LRU eviction.
+
+        Entries are keyed by endpoint name, arguments and API version. Write endpoints drop
+        the entries they make stale (see :py:meth:`pyosio.osio.OpenSensorsAPI._call`).
+        Cached values are shared between callers and must be treated as read-only.
+
+    """
+    DEFAULT_MAX_ENTRIES = 4096
+    DEFAULT_TTL = 60
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, default_ttl=DEFAULT_TTL, ttls=None):
+        """
+                :param max_entries: Maximum number of cached results
+                :type max_entries: :py:class:`int`
+
+                :param default_ttl: Seconds a result stays valid
+                :type default_ttl: :py:class:`float`
+
+                :param ttls: Per endpoint TTLs, e.g. {"get_org_devices": 300};
+                        a TTL of 0 disables caching for that endpoint
+                :type ttls: :py:class:`dict`
+
+                """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self.stats = MetadataCacheStats()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def ttl(self, endpoint):
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, endpoint, args, version=None):
+        """
+                :param endpoint: Endpoint name
+                :type endpoint: :py:class:`str`
+
+                :param args: Endpoint arguments, in signature order
+                :type args: :py:class:`tuple`
+
+                :param version: API version the result was fetched with
+                :type version: :py:class:`str`
+
+                :returns: A (hit, value) tuple
+                """
+        key = (endpoint, _freeze(args), version)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.stats.misses += 1
+                return False, None
+            expires, value = entry
+            if expires < time.time():
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return False, None
+            self._entries[key] = entry
+            self.stats.hits += 1
+            return True, value
+
+    def put(self, endpoint, args, value, version=None):
+        ttl = self.ttl(endpoint)
+        if not ttl:
+            return
+        key = (endpoint, _freeze(args), version)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate(self, endpoint, prefix=()):
+        """
+                Drop the entries of ``endpoint`` whose leading arguments equal ``prefix``,
+                for every API version
+
+                :param endpoint: Endpoint name
+                :type endpoint: :py:class:`str`
+
+                :param prefix: Leading arguments, empty to drop every entry of the endpoint
+                :type prefix: :py:class:`tuple`
+
+                """
+        prefix = _freeze(tuple(prefix))
+        with self._lock:
+            stale = [key for key in self._entries
+                     if key[0] == endpoint and key[1][:len(prefix)] == prefix]
+            for key in stale:
+                del self._entries[key]
+            self.stats.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
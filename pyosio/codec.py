@@ -0,0 +1,136 @@
+# coding=utf-8
+"""
+    JSON codecs used to decode every REST response, stream line and SSE event
+    and to encode request bodies.
+
+    The fastest installed library is used: ``orjson``, then ``ujson``, then the
+    standard library. Codecs decode straight from the received bytes and encode
+    to bytes. Input a native codec rejects but the standard library accepts
+    (``NaN``, ``Infinity``) is decoded with the standard library.
+"""
+import json
+
+
+class Codec(object):
+
+    """
+        A named pair of ``loads(bytes or str)`` and ``dumps(obj) -> bytes``.
+    """
+
+    def __init__(self, name, loads, dumps):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self):
+        return 'Codec(%r)' % self.name
+
+
+def _stdlib_codec():
+    def dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    return Codec('json', json.loads, dumps)
+
+
+def _orjson_codec():
+    import orjson
+
+    def loads(data):
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            return json.loads(data)
+    return Codec('orjson', loads, orjson.dumps)
+
+
+def _ujson_codec():
+    import ujson
+
+    def loads(data):
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            return json.loads(data)
+
+    def dumps(obj):
+        return ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+    return Codec('ujson', loads, dumps)
+
+
+_FACTORIES = (('orjson', _orjson_codec), ('ujson', _ujson_codec), ('json', _stdlib_codec))
+_codecs = {}
+_default = None
+
+
+def _installed():
+    """
+            Import the codec libraries on first use rather than with pyosio.
+            """
+    if not _codecs:
+        codecs = {}
+        for name, factory in _FACTORIES:
+            try:
+                codecs[name] = factory()
+            except ImportError:
+                pass
+        _codecs.update(codecs)
+    return _codecs
+
+
+def available():
+    """
+            :returns: Names of the installed codecs, fastest first
+            """
+    codecs = _installed()
+    return [name for name, _ in _FACTORIES if name in codecs]
+
+
+def get_codec(name=None):
+    """
+            :param name: Codec name, the current default when omitted
+            :type name: :py:class:`str`
+
+            :returns: A :py:class:`Codec`
+            """
+    global _default
+    if name is None:
+        if _default is None:
+            _default = _installed()[available()[0]]
+        return _default
+    try:
+        return _installed()[name]
+    except KeyError:
+        raise ValueError('JSON codec %s is not installed.' % name)
+
+
+def set_codec(name):
+    """
+            Select the codec used by :py:func:`loads` and :py:func:`dumps`.
+
+            :param name: One of :py:func:`available`
+            :type name: :py:class:`str`
+            """
+    global _default
+    _default = get_codec(name)
+
+
+def loads(data):
+    return (_default or get_codec()).loads(data)
+
+
+def dumps(obj):
+    return (_default or get_codec()).dumps(obj)
+
+
+def decode_response(response):
+    """
+            Decode the body of a response once; later calls return the same
+            object, which callers must treat as read-only.
+
+            :param response: A response exposing ``content``
+            :returns: The decoded JSON
+            """
+    try:
+        return response.__dict__['_decoded_json']
+    except KeyError:
+        return response.__dict__.setdefault('_decoded_json', loads(response.content))
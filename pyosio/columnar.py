@@ -0,0 +1,251 @@
+# coding=utf-8
+"""
+    Columnar decoding of stored messages into NumPy arrays.
+
+    A page of messages becomes a :py:class:`MessageBatch`: ``datetime64[ms]``
+    dates, ``int32`` category codes for the device, topic and owner ids, and
+    one typed array with a null mask per numeric field of the payloads.
+    Requires the ``numpy`` package (``pip install pyosio[numpy]``).
+"""
+import numbers
+import warnings
+from collections import namedtuple
+
+from . import codec
+from .errors import OSIOClientError
+from .pagination import parse_date
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CATEGORICAL = ('device', 'topic', 'owner')
+_TEXT = (str, type(u''))
+
+
+def _require_numpy():
+    if numpy is None:
+        raise OSIOClientError('Columnar decoding requires the numpy package.')
+
+
+class Categories(object):
+
+    """
+        Dictionary encoding of a repetitive string column. Codes are assigned in
+        order of first appearance and stay stable across batches; -1 stands for
+        a missing value.
+    """
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, values):
+        """
+                :returns: The ``int32`` codes of ``values``
+                """
+        code = self.code
+        return numpy.fromiter((code(value) for value in values), dtype=numpy.int32, count=len(values))
+
+
+class Column(namedtuple('Column', 'values mask')):
+
+    """
+        A typed array and its null mask, True where the value is missing.
+    """
+    __slots__ = ()
+
+    def masked(self):
+        """
+                :returns: A :py:class:`numpy.ma.MaskedArray`
+                """
+        return numpy.ma.masked_array(self.values, self.mask)
+
+
+class MessageBatch(object):
+
+    """
+        The messages of a page as columns.
+
+            batch = decode(osio_client.get_topic_msgs(topic))
+            hot = batch.date[batch['temperature'].masked() > 30]
+
+    """
+
+    def __init__(self, date, codes, categories, fields):
+        """
+                :param date: ``datetime64[ms]`` dates, NaT when missing
+                :param codes: ``int32`` code arrays of the categorical columns, by name
+                :param categories: :py:class:`Categories` of the categorical columns, by name
+                :param fields: :py:class:`Column` of every extracted payload field, by name
+                """
+        self.date = date
+        self.codes = codes
+        self.categories = categories
+        self.fields = fields
+
+    def __len__(self):
+        return len(self.date)
+
+    def __getitem__(self, name):
+        return self.fields[name]
+
+    def __contains__(self, name):
+        return name in self.fields
+
+    def labels(self, name):
+        """
+                :returns: The values of a categorical column, None where missing
+                """
+        values = numpy.array(self.categories[name].values + [None], dtype=object)
+        return values[self.codes[name]]
+
+
+def payload_of(message):
+    """
+            :returns: The decoded payload of a message as a dict, or None
+            """
+    payload = message.get('payload') if isinstance(message, dict) else None
+    if isinstance(payload, dict) and 'text' in payload:
+        payload = payload['text']
+    if isinstance(payload, (bytes,) + _TEXT):
+        try:
+            payload = codec.loads(payload)
+        except ValueError:
+            return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Number) and not isinstance(value, complex)
+
+
+def _infer_dtype(values):
+    if all(isinstance(value, bool) for value in values):
+        return numpy.bool_
+    if all(isinstance(value, numbers.Integral) for value in values):
+        return numpy.int64
+    return numpy.float64
+
+
+def _column(payloads, name, dtype):
+    index = []
+    present = []
+    for i, payload in enumerate(payloads):
+        value = payload.get(name) if payload is not None else None
+        if _is_number(value):
+            index.append(i)
+            present.append(value)
+    if dtype is None:
+        dtype = _infer_dtype(present) if present else numpy.float64
+    dtype = numpy.dtype(dtype)
+    values = numpy.full(len(payloads), numpy.nan if dtype.kind == 'f' else 0, dtype=dtype)
+    mask = numpy.ones(len(payloads), dtype=bool)
+    if present:
+        try:
+            values[index] = present
+        except OverflowError:
+            values = values.astype(numpy.float64)
+            values[index] = numpy.array(present, dtype=numpy.float64)
+        mask[index] = False
+    return Column(values, mask)
+
+
+def parse_dates(values):
+    """
+            :param values: ISO 8601 strings, None when missing
+            :returns: A ``datetime64[ms]`` array in UTC, NaT for missing or invalid dates
+            """
+    _require_numpy()
+    text = [value[:-1] if isinstance(value, _TEXT) and value.endswith('Z') else value
+            for value in values]
+    if all(isinstance(value, _TEXT) for value in text):
+        try:
+            with warnings.catch_warnings():
+                # Offsets are applied; numpy only warns that it does so.
+                warnings.simplefilter('ignore')
+                return numpy.array(text, dtype='datetime64[ms]')
+        except ValueError:
+            pass
+    nat = numpy.iinfo(numpy.int64).min
+    seconds = [parse_date(value) for value in values]
+    return numpy.array([nat if s is None else int(round(s * 1000)) for s in seconds],
+                       dtype=numpy.int64).view('datetime64[ms]')
+
+
+class Decoder(object):
+
+    """
+        Decodes pages of messages into :py:class:`MessageBatch` objects sharing
+        their category codes.
+    """
+
+    def __init__(self, fields=None, categorical=CATEGORICAL, dates=True):
+        """
+                :param fields: Payload fields to extract: a list of names, or a dict
+                        of name to NumPy dtype. By default every numeric field is
+                        extracted with an inferred dtype (bool, int64 or float64),
+                        which may differ between batches.
+                :type fields: :py:class:`list` or :py:class:`dict`
+
+                :param categorical: Categorical columns to encode
+                :type categorical: :py:class:`tuple`
+
+                :param dates: Parse the dates; otherwise they are all NaT
+                :type dates: :py:class:`bool`
+
+                """
+        _require_numpy()
+        if fields is not None and not isinstance(fields, dict):
+            fields = dict((name, numpy.float64) for name in fields)
+        self.fields = fields
+        self.dates = dates
+        self.categories = dict((name, Categories()) for name in categorical)
+
+    def decode(self, messages):
+        """
+                :param messages: A message page, as returned by the ``get_*_msgs``
+                        endpoints, or a list of messages
+                :returns: A :py:class:`MessageBatch`
+                """
+        if isinstance(messages, dict):
+            messages = messages.get('messages') or []
+        if self.dates:
+            date = parse_dates([message.get('date') for message in messages])
+        else:
+            date = numpy.full(len(messages), numpy.datetime64('NaT'), dtype='datetime64[ms]')
+        codes = dict((name, categories.encode([message.get(name) for message in messages]))
+                     for name, categories in self.categories.items())
+        payloads = [payload_of(message) for message in messages]
+
+        fields = self.fields
+        if fields is None:
+            fields = {}
+            for payload in payloads:
+                for name, value in (payload or {}).items():
+                    if name not in fields and _is_number(value):
+                        fields[name] = None
+        columns = dict((name, _column(payloads, name, dtype)) for name, dtype in fields.items())
+        return MessageBatch(date, codes, self.categories, columns)
+
+
+def decode(messages, fields=None):
+    """
+            Decode one page of messages, see :py:class:`Decoder`.
+
+            :returns: A :py:class:`MessageBatch`
+            """
+    return Decoder(fields).decode(messages)
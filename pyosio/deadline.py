@@ -0,0 +1,121 @@
+# coding=utf-8
+import threading
+import time
+
+from .errors import TimeoutError
+
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
+
+if contextvars is not None:
+    _current = contextvars.ContextVar('osio_deadline', default=None)
+
+    def current_deadline():
+        """
+                :returns: The deadline active in this thread or asyncio task, or None
+                """
+        return _current.get()
+
+    def _activate(deadline):
+        return _current.set(deadline)
+
+    def _restore(token):
+        _current.reset(token)
+
+else:
+    _local = threading.local()
+
+    def current_deadline():
+        """
+                :returns: The deadline active in this thread, or None
+                """
+        return getattr(_local, 'deadline', None)
+
+    def _activate(deadline):
+        previous = current_deadline()
+        _local.deadline = deadline
+        return previous
+
+    def _restore(token):
+        _local.deadline = token
+
+
+class Deadline(object):
+
+    """
+        Time budget shared by every request made while it is active.
+
+        Entering a deadline makes it current for the thread (or asyncio task);
+        nested deadlines never extend an enclosing, earlier one. Requests clamp
+        their timeouts to the remaining budget, retries and rate limiting give
+        up instead of sleeping past it, and helpers running work on other
+        threads (``fan_out``) carry it along.
+
+            with Deadline(30):
+                for msg in osio_client.iter_topic_msgs(topic):
+                    ...
+
+    """
+
+    def __init__(self, seconds):
+        """
+                :param seconds: Budget in seconds from now
+                :type seconds: :py:class:`float`
+
+                """
+        self.seconds = seconds
+        self.expires = time.time() + seconds
+        self._tokens = []
+
+    def remaining(self):
+        """
+                :returns: Seconds left, never negative
+                """
+        return max(0.0, self.expires - time.time())
+
+    def expired(self):
+        return time.time() >= self.expires
+
+    def check(self):
+        """
+                Raise :py:class:`pyosio.errors.TimeoutError` once the budget is spent.
+                """
+        if self.expired():
+            raise TimeoutError(self.seconds)
+
+    def clamp(self, timeout):
+        """
+                Limit a requests timeout, a number or a (connect, read) tuple, to
+                the remaining budget.
+                """
+        remaining = self.remaining()
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        return min(timeout, remaining)
+
+    def wrap(self, fn):
+        """
+                :returns: ``fn`` running under this deadline, for use on another thread
+                """
+        def run(*args, **kwargs):
+            token = _activate(self)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _restore(token)
+        return run
+
+    def __enter__(self):
+        current = current_deadline()
+        effective = self if current is None or self.expires < current.expires else current
+        self._tokens.append(_activate(effective))
+        return self
+
+    def __exit__(self, *exc):
+        _restore(self._tokens.pop())
+        return False
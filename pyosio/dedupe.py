@@ -0,0 +1,246 @@
+# coding=utf-8
+"""
+    Deduplication of messages with bounded memory.
+
+    Overlapping windows, retried pages and a stream read next to the REST
+    history all hand out the same message more than once. A
+    :py:class:`DedupeIndex` remembers the key of every message for a
+    ``horizon`` of seconds after it was first seen: keys are 64 bit digests
+    held in time buckets, and a whole bucket is dropped once it is older than
+    the horizon, so memory follows the message rate rather than the length of
+    the stream.
+"""
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import deque
+
+_IDENTITY = ('topic', 'device', 'owner', 'date', 'payload')
+
+
+def message_key(message):
+    """
+            :returns: A 64 bit digest of the ``id`` of a message, or of its topic,
+                    device, owner, date and payload when it has none
+            """
+    if isinstance(message, dict):
+        if message.get('id') is not None:
+            identity = ['id', message['id']]
+        else:
+            identity = [message.get(name) for name in _IDENTITY]
+    else:
+        identity = message
+    text = json.dumps(identity, sort_keys=True, separators=(',', ':'))
+    return int(hashlib.sha1(text.encode('utf-8')).hexdigest()[:16], 16)
+
+
+class BloomFilter(object):
+
+    """
+        A Bloom filter of 64 bit digests: membership tests may give false
+        positives, at about ``error_rate`` once ``capacity`` keys are added,
+        but never false negatives.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        """
+                :param capacity: Number of keys the filter is sized for
+                :type capacity: :py:class:`int`
+
+                :param error_rate: False positive rate at capacity
+                :type error_rate: :py:class:`float`
+
+                """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, int(round(float(self.size) / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, key):
+        """
+                :returns: The bits of a key, usable with every filter of the same size
+                """
+        # Double hashing over the two halves of the digest.
+        first, second, size = key & 0xffffffff, (key >> 32) | 1, self.size
+        return [(first + i * second) % size for i in range(self.hashes)]
+
+    def add(self, key, positions=None):
+        bits = self._bits
+        for position in positions or self.positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def contains(self, key, positions=None):
+        bits = self._bits
+        for position in positions or self.positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __contains__(self, key):
+        return self.contains(key)
+
+
+class DedupeStats(object):
+
+    """
+        Counters kept by a :py:class:`DedupeIndex`.
+    """
+
+    def __init__(self):
+        self.messages = 0
+        self.duplicates = 0
+        self.expired = 0
+        self.bloom_false_positives = 0
+
+    def as_dict(self):
+        return {'messages': self.messages, 'duplicates': self.duplicates,
+                'expired': self.expired, 'bloom_false_positives': self.bloom_false_positives}
+
+
+class DedupeIndex(object):
+
+    """
+        Thread-safe index of the messages seen within the last ``horizon``
+        seconds.
+
+            index = DedupeIndex(horizon=3600)
+            for message in index.filter(osio_client.get_topics_sd(topic)):
+                print(message)
+
+        A key is remembered between ``horizon - horizon / buckets`` and
+        ``horizon`` seconds after it was first seen; a duplicate arriving
+        later is handed out again.
+
+        With ``bloom_capacity``, a pair of Bloom filters rotated every horizon
+        is checked first: most new keys are recognised as such there without
+        probing every bucket.
+    """
+    DEFAULT_HORIZON = 3600
+    DEFAULT_BUCKETS = 12
+
+    def __init__(self, horizon=DEFAULT_HORIZON, buckets=DEFAULT_BUCKETS, bloom_capacity=None,
+                 bloom_error_rate=0.001, key=message_key):
+        """
+                :param horizon: Seconds a key is remembered
+                :type horizon: :py:class:`float`
+
+                :param buckets: Number of time buckets the horizon is split into
+                :type buckets: :py:class:`int`
+
+                :param bloom_capacity: Keys expected within one horizon, enables the
+                        Bloom filter pre-check
+                :type bloom_capacity: :py:class:`int`
+
+                :param bloom_error_rate: False positive rate of the Bloom filters at capacity
+                :type bloom_error_rate: :py:class:`float`
+
+                :param key: Callable returning the hashable key of a message
+                """
+        self.horizon = float(horizon)
+        self.buckets = buckets
+        self.bucket_seconds = self.horizon / buckets
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self.key = key
+        self.stats = DedupeStats()
+        self._lock = threading.Lock()
+        # (bucket number, keys) pairs, oldest first.
+        self._buckets = deque()
+        self._blooms = None
+        self._rotated = time.time()
+        if bloom_capacity:
+            self._blooms = deque([BloomFilter(bloom_capacity, bloom_error_rate)])
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(keys) for _, keys in self._buckets)
+
+    def _expire(self, now):
+        oldest = int(now // self.bucket_seconds) - self.buckets + 1
+        buckets = self._buckets
+        while buckets and buckets[0][0] < oldest:
+            self.stats.expired += len(buckets.popleft()[1])
+        if self._blooms is not None and now - self._rotated >= self.horizon:
+            # A key added before the last two rotations is older than the horizon.
+            self._blooms.appendleft(BloomFilter(self.bloom_capacity, self.bloom_error_rate))
+            while len(self._blooms) > 2:
+                self._blooms.pop()
+            self._rotated = now
+
+    def _seen(self, key, positions):
+        if positions is not None:
+            if not any(bloom.contains(key, positions) for bloom in self._blooms):
+                return False
+        for _, keys in reversed(self._buckets):
+            if key in keys:
+                return True
+        if positions is not None:
+            self.stats.bloom_false_positives += 1
+        return False
+
+    def add(self, message):
+        """
+                Record a message
+
+                :returns: True when the message was not seen within the horizon
+                """
+        key = self.key(message)
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            self.stats.messages += 1
+            positions = self._blooms[0].positions(key) if self._blooms is not None else None
+            if self._seen(key, positions):
+                self.stats.duplicates += 1
+                return False
+            number = int(now // self.bucket_seconds)
+            if not self._buckets or self._buckets[-1][0] != number:
+                self._buckets.append((number, set()))
+            self._buckets[-1][1].add(key)
+            if positions is not None:
+                self._blooms[0].add(key, positions)
+            return True
+
+    def __contains__(self, message):
+        key = self.key(message)
+        with self._lock:
+            self._expire(time.time())
+            positions = self._blooms[0].positions(key) if self._blooms is not None else None
+            return self._seen(key, positions)
+
+    def filter(self, items):
+        """
+                Drop the messages already seen from an iterable of messages, of
+                message pages (``{"messages": [...]}``) or of lists of messages,
+                as handed out by the ``get_*_msgs`` endpoints, the paginated
+                iterators and the stream generators. Pages are handed out with
+                their duplicates removed.
+
+                :returns: A generator
+                """
+        add = self.add
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get('messages'), list):
+                page = dict(item)
+                page['messages'] = [message for message in item['messages'] if add(message)]
+                yield page
+            elif isinstance(item, list):
+                yield [message for message in item if add(message)]
+            elif add(item):
+                yield item
+
+
+def dedupe(items, horizon=DedupeIndex.DEFAULT_HORIZON, **kwargs):
+    """
+            Drop duplicate messages from an iterable, see :py:meth:`DedupeIndex.filter`.
+
+            :param horizon: Seconds a message is remembered
+            :type horizon: :py:class:`float`
+
+            :param kwargs: Other arguments of :py:class:`DedupeIndex`
+            :returns: A generator
+            """
+    return DedupeIndex(horizon, **kwargs).filter(items)
@@ -0,0 +1,1216 @@
+# coding=utf-8
+"""
+    Declarative registry of the OpenSensors REST and Real-Time API endpoints.
+
+    Each :py:class:`Endpoint` names its path template, HTTP method, supported
+    versions, authentication, arguments, result conversion and metadata cache
+    behaviour. :py:func:`install` compiles the registry once into methods of
+    :py:class:`pyosio.osio.OpenSensorsAPI` and
+    :py:class:`pyosio.aio.AsyncOpenSensorsAPI`, which all go through the
+    client ``_call`` method, so every client feature applies to every endpoint.
+"""
+import re
+
+_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+RESULTS = ('json', 'ok', 'text', 'events')
+
+
+class Endpoint(object):
+
+    """
+        Declaration of one API endpoint.
+    """
+
+    __slots__ = ('name', 'method', 'path', 'versions', 'auth', 'history', 'query', 'body',
+                 'result', 'cache', 'invalidates', 'doc', 'args', 'arguments', 'handler',
+                 'write', '_template')
+
+    def __init__(self, name, method, path, versions, auth=True, history=False, query=False,
+                 body=None, result='json', cache=False, invalidates=(), doc=None):
+        """
+                :param name: Method name
+                :type name: :py:class:`str`
+
+                :param method: HTTP method
+                :type method: :py:class:`str`
+
+                :param path: Path template starting with ``/{version}``; the other
+                        placeholders are the positional arguments of the method
+                :type path: :py:class:`str`
+
+                :param versions: Supported API versions
+                :type versions: :py:class:`tuple`
+
+                :param auth: Send the API key
+                :type auth: :py:class:`bool`
+
+                :param history: Stored messages, served through the page cache
+                :type history: :py:class:`bool`
+
+                :param query: Accept a ``queryparams`` dict
+                :type query: :py:class:`bool`
+
+                :param body: Name of the argument sent as JSON request body
+                :type body: :py:class:`str`
+
+                :param result: ``json`` (decoded body), ``ok`` (success flag), ``text``
+                        (raw body) or ``events`` (SSE generator)
+                :type result: :py:class:`str`
+
+                :param cache: Results may be kept in the metadata cache
+                :type cache: :py:class:`bool`
+
+                :param invalidates: ``(endpoint, n)`` rules of the cached results made
+                        stale by this endpoint: entries whose first ``n`` arguments equal
+                        those of the call are dropped by
+                        :py:meth:`pyosio.osio.OpenSensorsAPI._call`, ``n = 0`` drops them all
+                :type invalidates: :py:class:`tuple`
+
+                """
+        placeholders = _PLACEHOLDER.findall(path)
+        if not placeholders or placeholders[0] != 'version':
+            raise ValueError('Path of %s must start with /{version}.' % name)
+        if result not in RESULTS:
+            raise ValueError('Unknown result %s of %s.' % (result, name))
+        self.name = name
+        self.method = method
+        self.path = path
+        self.versions = tuple(versions)
+        self.auth = auth
+        self.history = history
+        self.query = query
+        self.body = body
+        self.result = result
+        self.cache = cache
+        self.invalidates = tuple(invalidates)
+        self.doc = doc
+        self.args = tuple(placeholders[1:])
+        self.arguments = self.args + ((body,) if body else ()) + (('queryparams',) if query else ())
+        self.write = method in ('POST', 'PUT', 'PATCH', 'DELETE')
+        if result == 'events':
+            self.handler = '_get_stream_events'
+        elif history:
+            self.handler = '_get_history'
+        elif method == 'GET':
+            self.handler = '_get' if auth else '_get_pub'
+        else:
+            self.handler = '_' + method.lower()
+        self._template = _PLACEHOLDER.sub('%s', path)
+
+    def url(self, version, args):
+        """
+                :returns: The path of a call, e.g. ``/v1/topics/x``
+                """
+        return self._template % ((version,) + args)
+
+    def __repr__(self):
+        return 'Endpoint(%r, %r, %r)' % (self.name, self.method, self.path)
+
+
+def _source(endpoint, asynchronous):
+    """
+            :returns: Python source of the client method of ``endpoint``
+            """
+    params = ('self',) + endpoint.args + ((endpoint.body,) if endpoint.body else ())
+    if endpoint.query:
+        params += ('queryparams={}',)
+    args = '(%s)' % ''.join(arg + ', ' for arg in endpoint.args)
+    if endpoint.result == 'events':
+        # Streams are generators, returned without going through _call.
+        call = 'self.%s(_%s.url(self.version, %s), _%s.versions)' % (
+            endpoint.handler, endpoint.name, args, endpoint.name)
+    else:
+        call = 'self._call(_%s, %s, %s, %s)' % (
+            endpoint.name, args, 'queryparams' if endpoint.query else 'None', endpoint.body or 'None')
+    if asynchronous and endpoint.result != 'events':
+        return 'async def %s(%s):\n    return await %s\n' % (endpoint.name, ', '.join(params), call)
+    return 'def %s(%s):\n    return %s\n' % (endpoint.name, ', '.join(params), call)
+
+
+def install(cls, asynchronous=False):
+    """
+            Define a method on ``cls`` for every registered endpoint the class does
+            not define itself. All methods are compiled in one go.
+
+            :param cls: Client class implementing ``_call``
+            :param asynchronous: Define coroutines (SSE endpoints stay plain
+                    methods returning async generators)
+            :type asynchronous: :py:class:`bool`
+
+            :returns: ``cls``
+            """
+    endpoints = [endpoint for endpoint in ENDPOINTS if endpoint.name not in cls.__dict__]
+    source = '\n'.join(_source(endpoint, asynchronous) for endpoint in endpoints)
+    namespace = dict(('_' + endpoint.name, endpoint) for endpoint in endpoints)
+    exec(compile(source, '<pyosio.endpoints>', 'exec'), namespace)
+    for endpoint in endpoints:
+        method = namespace[endpoint.name]
+        method.__doc__ = endpoint.doc
+        method.__module__ = cls.__module__
+        setattr(cls, endpoint.name, method)
+    return cls
+
+
+def install_async(cls):
+    return install(cls, asynchronous=True)
+
+
+ENDPOINTS = [
+    # ---------------------------------------- #
+    # [v2] datasets : Datasets operations
+    # ---------------------------------------- #
+    Endpoint('get_dataset_meta', 'GET', '/{version}/datasets/{dataset_id}', ('v2',),
+             cache=True, doc="""
+                Get dataset metadata
+                GET /v2/datasets/{dataset-id}
+
+                :param dataset_id: The unique id for the dataset.
+                :type dataset_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_pub_dataset_meta', 'GET', '/{version}/datasets/{dataset_id}', ('v2',),
+             cache=True, doc="""
+                Get public dataset information [NO-AUTH]
+                GET /v2/public/datasets/{dataset-id}
+
+                :param dataset_id: The unique id for the dataset.
+                :type dataset_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+
+    # ---------------------------------------- #
+    # [v1/v2] messages : Stored messages
+    # ---------------------------------------- #
+    Endpoint('get_device_msgs', 'GET', '/{version}/messages/device/{client_id}', ('v1',),
+             history=True, query=True, doc="""
+                Get messages for a given device
+                GET /v1/messages/device/{client-id}
+
+                :param client_id: The unique id for the device.
+                :type client_id: :py:class:`str`
+
+                :param queryparams: The query string parameters
+                queryparams = { user-id: string,
+                                                radius: long,
+                                                postcode: string,
+                                                tags: string,
+                                                end-date: string,
+                                                zip: string,
+                                                lat: double,
+                                                start-date: string,
+                                                elevation: double,
+                                                lon: double,
+                                                dur: double }
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_topic_msgs', 'GET', '/{version}/messages/topic/{topic}', ('v1',),
+             history=True, query=True, doc="""
+                Get messages for a given topic
+                GET /v1/messages/topic/{topic}
+
+                :param topic: The unique id for the interest topic.
+                :type topic: :py:class:`str`
+
+                :param queryparams: The query string parameters
+                queryparams = { user-id: string,
+                                                radius: long,
+                                                postcode: string,
+                                                tags: string,
+                                                end-date: string,
+                                                zip: string,
+                                                lat: double,
+                                                start-date: string,
+                                                elevation: double,
+                                                lon: double,
+                                                dur: double }
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_msgs', 'GET', '/{version}/messages/user/{user_id}', ('v1',),
+             history=True, query=True, doc="""
+                Get messages for a given user
+                GET /v1/messages/user/{user-id}
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :param queryparams: The query string parameters
+                queryparams = { user-id: string,
+                                                radius: long,
+                                                postcode: string,
+                                                tags: string,
+                                                end-date: string,
+                                                zip: string,
+                                                lat: double,
+                                                start-date: string,
+                                                elevation: double,
+                                                lon: double,
+                                                dur: double }
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_pub_dataset_msgs', 'GET', '/{version}/messages/dataset/{dataset_id}', ('v1', 'v2'),
+             query=True, doc="""
+                Get messages for a given public dataset [NO-AUTH]
+                GET /v2/public/messages/dataset/{dataset-id}
+
+                :param dataset_id: The unique id for the dataset.
+                :type dataset_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_bulk_pub_dataset_msgs', 'POST', '/{version}/public/messages/dataset/bulk', ('v2',),
+             body='dataset_msgs_bulk_input', doc="""
+                Get messages for several public datasets [NO-AUTH]
+                POST /v2/public/messages/dataset/bulk
+
+                :param dataset_msgs_bulk_input: bulk input
+                :type dataset_msgs_bulk_input: :py:class:`dict`
+
+                :returns: The JSON output from the API or an error message
+                """),
+
+    # ---------------------------------------- #
+    # [v1/v2] users : User operations
+    # ---------------------------------------- #
+    Endpoint('get_pub_user_meta', 'GET', '/{version}/public/users/{user_id}', ('v1',),
+             auth=False, cache=True, doc="""
+                Get public user metadata including topics [NO-AUTH]
+                GET /v1/public/users/{user-id}
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('update_user_meta', 'PUT', '/{version}/users/{user_id}', ('v1',),
+             body='data', result='ok',
+             invalidates=(('get_user_meta', 1), ('get_pub_user_meta', 1)), doc="""
+                Update user metadata
+                PUT /v1/users/{user-id}
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                param data: metadata
+                :type data: :py:class:`dict`
+                data = {
+                          "name": "string*",
+                          "email": "string*",
+                          "password": "string*"
+                        }
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_meta', 'GET', '/{version}/users/{user_id}', ('v1',),
+             cache=True, doc="""
+                Get user metadata
+                GET /v1/users/{user-id}
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_api_key', 'GET', '/{version}/users/{user_id}/api-key', ('v1',),
+             result='text', doc="""
+                Get API key
+                GET /v1/users/{user-id}/api-key
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('generate_api_key', 'POST', '/{version}/users/{user_id}/api-key', ('v1',),
+             result='text', doc="""
+                Generate a new API key
+                POST /v1/users/{user-id}/api-key
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('bookmark_topic', 'PUT', '/{version}/users/{user_id}/bookmark/{topic}', ('v1',),
+             result='ok', invalidates=(('get_user_bookmarks', 1),), doc="""
+                Create a bookmark for a given user and topic
+                PUT /v1/users/{user-id}/bookmark/{topic}
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :param topic: The unique id for the interest topic.
+                :type topic: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('delete_bookmarked_topic', 'DELETE', '/{version}/users/{user_id}/bookmark/{topic}', ('v1',),
+             result='ok', invalidates=(('get_user_bookmarks', 1),), doc="""
+                Delete a bookmark for a given user and topic
+                DELETE /v1/users/{user-id}/bookmark/{topic}
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :param topic: The unique id for the interest topic.
+                :type topic: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_bookmarks', 'GET', '/{version}/users/{user_id}/bookmarks', ('v1',),
+             cache=True, doc="""
+                Get bookmarks associated with a user
+                GET /v1/users/{user-id}/bookmarks
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_bookmarks_followers', 'GET', '/{version}/users/{user_id}/bookmarks/followers', ('v1',),
+             cache=True, doc="""
+                Get users that bookmarked any of a given users topics
+                GET /v1/users/{user-id}/bookmarks/followers
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('link_device_user', 'PUT', '/{version}/users/{user_id}/claim-device/{client_id}', ('v1',),
+             result='ok', invalidates=(('get_user_devices', 1),), doc="""
+                Associate a device with a user, user joins the device creator s organisation
+                PUT /v1/users/{user-id}/claim-device/{client-id}
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :param client_id: The unique id for the device.
+                :type client_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_device_errors', 'GET', '/{version}/users/{user_id}/device-errors', ('v1',),
+             doc="""
+                Retrieve device errors for a given user
+                GET /v1/users/{user-id}/device-errors
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('set_device', 'POST', '/{version}/users/{user_id}/devices', ('v1',),
+             body='create_device_input', invalidates=(('get_user_devices', 1),), doc="""
+                Create a new device for a user
+                POST /v1/users/{user-id}/devices
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                param create_device_input: device metadata
+                :type create_device_input: :py:class:`dict`
+
+                create_device_input = {
+                        "description": "string",
+                        "tags": [
+                                "string"
+                        ],
+                        "locked-password": true,
+                        "client-id": "string",
+                        "password": "string",
+                        "name": "string",
+                        "org-id": "string",
+                        "batch": "string",
+                        "device-type": "string",
+                        "location": {
+                                "lat": 0,
+                                "lon": 0,
+                                "elevation": 0,
+                                "zip": "string",
+                                "postcode": "string"
+                        }
+                }
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_devices', 'GET', '/{version}/users/{user_id}/devices', ('v1', 'v2'),
+             cache=True, doc="""
+                Get devices associated with a user
+                GET /v1/users/{user-id}/devices
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_device_meta', 'GET', '/{version}/users/{user_id}/devices/{client_id}', ('v1',),
+             query=True, cache=True, doc="""
+                Get device metadata
+                GET /v1/users/{user-id}/devices/{client-id}
+
+                :param client_id: The unique id for the device.
+                :type client_id: :py:class:`str`
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :param queryparams: The query string parameters
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('delete_device', 'DELETE', '/{version}/users/{user_id}/devices/{client_id}', ('v1',),
+             result='ok', invalidates=(('get_device_meta', 2), ('get_user_devices', 1)), doc="""
+                Delete a device
+                DELETE /v1/users/{user-id}/devices/{client-id}
+
+                :param client_id: The unique id for the device.
+                :type client_id: :py:class:`str`
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('update_device_meta', 'PUT', '/{version}/users/{user_id}/devices/{client_id}', ('v1',),
+             body='update_device_input', result='ok',
+             invalidates=(('get_device_meta', 2), ('get_user_devices', 1)), doc="""
+                Update device metadata
+                PUT /v1/users/{user-id}/devices/{client-id}
+
+                :param client_id: The unique id for the device.
+                :type client_id: :py:class:`str`
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                param update_device_input: device metadata
+                :type update_device_input: :py:class:`dict`
+
+                update_device_input = {
+                        "name": "string",
+                        "description": "string",
+                        "batch": "string",
+                        "device-type": "string",
+                        "location": {
+                                "lat": 0,
+                                "lon": 0,
+                                "elevation": 0,
+                                "zip": "string",
+                                "postcode": "string"
+                        },
+                        "tags": [
+                                "string"
+                        ]
+                }
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('reset_device_passw', 'POST', '/{version}/users/{user_id}/devices/{client_id}/reset-password', ('v1',),
+             invalidates=(('get_device_meta', 2), ('get_user_devices', 1)), doc="""
+                Generate a new password for a device
+                POST /v1/users/{user-id}/devices/{client-id}/reset-password
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :param client_id: The unique id for the device.
+                :type client_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_devices_info', 'GET', '/{version}/users/{user_id}/devices/bulk', ('v1',),
+             query=True, doc="""
+                Get information about the values of multiple devices with one call
+                GET /v1/users/{user-id}/devices/bulk
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :param queryparams: The query string parameters
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('delete_user_devices', 'DELETE', '/{version}/users/{user_id}/devices/bulk', ('v1',),
+             body='device_del', result='ok',
+             invalidates=(('get_device_meta', 1), ('get_user_devices', 1)), doc="""
+                Delete devices in bulk (all in one transaction)
+                DELETE /v1/users/{user-id}/devices/bulk
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                param device: device meta
+                :type device: :py:class:`dict`
+
+
+                device = [
+                  {
+                        "client-id": "string"
+                  }
+                ]
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('update_user_bulk_devices', 'PUT', '/{version}/users/{user_id}/devices/bulk', ('v1',),
+             body='bulk_update_params_input', result='ok',
+             invalidates=(('get_device_meta', 1), ('get_user_devices', 1)), doc="""
+                Update the description, tags and location of multiple devices with one call]
+                PUT /v1/users/{user-id}/devices/bulk
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                param bulk_update_params_input: metadata
+                :type bulk_update_params_input: :py:class:`dict`
+
+                bulk_update_params_input = {
+                  "all-devices": true,
+                  "devices": [
+                        "string"
+                  ],
+                  "values": {
+                        "description": "string",
+                        "description-various": true,
+                        "tags": [
+                          "string"
+                        ],
+                        "tags-various": true,
+                        "location": {
+                          "lat": 0,
+                          "lon": 0
+                        },
+                        "location-various": true
+                  }
+                }
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('set_user_bulk_devices', 'POST', '/{version}/users/{user_id}/devices/bulk', ('v1',),
+             body='new_device',
+             invalidates=(('get_device_meta', 1),
+                          ('get_user_devices', 1)), doc="""
+                Create new devices in bulk (all in one transaction)
+                POST /v1/users/{user-id}/devices/bulk
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                param new_device: metadata
+                :type new_device: :py:class:`dict`
+
+                new_device = [
+                        {
+                                "description": "string",
+                                "tags": [
+                                  "string"
+                                ],
+                                "locked-password": true,
+                                "client-id": "string",
+                                "password": "string",
+                                "name": "string",
+                                "org-id": "string",
+                                "batch": "string",
+                                "device-type": "string",
+                                "location": {
+                                  "lat": 0,
+                                  "lon": 0,
+                                  "elevation": 0,
+                                  "zip": "string",
+                                  "postcode": "string"
+                                }
+                        }
+                ]
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_org_invits', 'GET', '/{version}/users/{user_id}/invitations', ('v1',),
+             cache=True, doc="""
+                Get pending org invitations for a user
+                GET /v1/users/{user-id}/invitations
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_orgs', 'GET', '/{version}/users/{user_id}/orgs', ('v1',),
+             cache=True, doc=""""
+                Get organisations a user is member of
+                GET /v1/users/{user-id}/orgs
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('delete_user_org', 'DELETE', '/{version}/users/{user_id}/orgs/{org_id}', ('v1',),
+             result='ok',
+             invalidates=(('get_user_orgs', 1),
+                          ('get_user_owned_orgs', 1),
+                          ('get_org_members', 0)), doc="""
+                Leave an organisation (stop being a member)
+                DELETE /v1/users/{user-id}/orgs/{org-id}
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_owned_orgs', 'GET', '/{version}/users/{user_id}/owned-orgs', ('v1',),
+             cache=True, doc="""
+                Get organisations a user owns
+                GET /v1/users/{user-id}/owned-orgs
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_topics', 'GET', '/{version}/users/{user_id}/topics', ('v1', 'v2'),
+             cache=True, doc="""
+                Get topics associated with a user
+                GET /v1/users/{user-id}/topics
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_stats', 'GET', '/{version}/users/{user_id}/usage-stats', ('v1',),
+             doc="""
+                Retrieve usage stats for a given user
+                GET /v1/users/{user-id}/usage-stats
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_datasets', 'GET', '/{version}/users/{user_id}/datasets', ('v2',),
+             cache=True, doc="""
+                Get datasets associated with a user
+                GET /v2/users/{user-id}/datasets
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('delete_user_bulk_topics', 'DELETE', '/{version}/users/{user_id}/topics/bulk', ('v2',),
+             invalidates=(('get_user_topics', 1), ('get_org_topics', 0)), doc="""
+                Bulk delete topics by ids
+                DELETE /v2/users/{user-id}/topics/bulk
+
+                :param user_id: User id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+
+    # ---------------------------------------- #
+    # [v1/v2] topics : Topic operations
+    # ---------------------------------------- #
+    Endpoint('get_pub_topic_info', 'GET', '/{version}/public/topics/{topic}', ('v1',),
+             cache=True, doc="""
+                Get public topic information [NO-AUTH]
+                GET /v1/public/topics/{topic}
+
+                :param topic: The unique id for the interest topic.
+                :type topic: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('search_pub_topic_info', 'GET', '/{version}/search/topics/{topic}', ('v1',),
+             doc="""
+                Search for public topics [NO-AUTH]
+                GET /v1/search/topics/{term}
+
+                :param topic: The unique id for the interest topic.
+                :type topic: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('set_topic', 'POST', '/{version}/topics', ('v1',),
+             body='new_topic_input',
+             invalidates=(('get_user_topics', 0),
+                          ('get_org_topics', 0)), doc="""
+                Create a topic
+                POST /v*/topics
+
+                create_topic_input {
+                  "topic": "string",
+                  "name": "string",
+                  "description": "string",
+                  "public": true,
+                  "topic-info": {
+                        "format": "string"
+                  },
+                  "schema-id": 0,
+                  "rollups-enabled": true
+                }
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('delete_topic', 'DELETE', '/{version}/topics/{topic}', ('v1',),
+             result='ok',
+             invalidates=(('get_topic_meta', 1),
+                          ('get_pub_topic_info', 1),
+                          ('get_user_topics', 0),
+                          ('get_org_topics', 0)), doc="""
+                Delete a topic
+                DELETE /v1/topics/{topic}
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_topic_meta', 'GET', '/{version}/topics/{topic}', ('v1',),
+             cache=True, doc="""
+                Get topic metadata
+                GET /v1/topics/{topic}
+
+                :param topic: The unique id for the interest topic.
+                :type topic: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('update_topic_meta', 'PUT', '/{version}/topics/{topic}', ('v1', 'v2'),
+             body='topic_input', result='ok',
+             invalidates=(('get_topic_meta', 1), ('get_pub_topic_info', 1)), doc="""
+                Update topic metadata
+                PUT /v*/topics/{topic}
+
+                :param topic: The unique id for the interest topic.
+                :type topic: :py:class:`str`
+
+                {
+                  "name": "string",
+                  "topic-info": {
+                        "format": "string"
+                  },
+                  "description": "string",
+                  "public": true,
+                  "rollups-enabled": true,
+                  "schema-id": 0
+                }
+
+                :returns: The JSON output from the API or an error message
+                """),
+
+    # ---------------------------------------- #
+    # [v1/v2] orgs : Organisation operations
+    # ---------------------------------------- #
+    Endpoint('create_org', 'POST', '/{version}/orgs', ('v1', 'v2'),
+             body='create_org_input',
+             invalidates=(('get_user_orgs', 0), ('get_user_owned_orgs', 0)), doc="""
+                Create an organisation
+                POST /v1/orgs
+
+                {
+                  "id": "string",
+                  "name": "string",
+                  "website": "string",
+                  "description": "string",
+                  "email": "string"
+                }
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('update_org', 'PUT', '/{version}/orgs/{org_id}', ('v1', 'v2'),
+             body='update_org_input', result='ok',
+             invalidates=(('get_org_meta', 1), ('get_pub_org_meta', 1), ('get_schemas', 1)), doc="""
+                Update organisation metadata
+                PUT /v1/orgs/{org-id}
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :param update_org_input: Organisation metadata
+                :type update_org_input: :py:class:`dict`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('delete_org', 'DELETE', '/{version}/orgs/{org_id}', ('v1', 'v2'),
+             result='ok',
+             invalidates=(('get_org_meta', 1),
+                          ('get_pub_org_meta', 1),
+                          ('get_schemas', 1),
+                          ('get_org_devices', 1),
+                          ('get_filtered_org_devices', 1),
+                          ('get_org_device_meta', 1),
+                          ('get_org_members', 1),
+                          ('get_org_topics', 1),
+                          ('get_user_orgs', 0),
+                          ('get_user_owned_orgs', 0)), doc="""
+                Delete an organisation. Be careful! This is will also delete devices and topics
+                DELETE /v1/orgs/{org-id}
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_org_meta', 'GET', '/{version}/orgs/{org_id}', ('v1', 'v2'),
+             cache=True, doc="""
+                Get organisation metadata
+                GET /v1/orgs/{org-id}
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('accept_org_invit', 'GET', '/{version}/orgs/{org_id}/confirm-membership/{tokens}', ('v1', 'v2'),
+             invalidates=(('get_org_members', 1),
+                          ('get_org_pending_invits', 1),
+                          ('get_invit_status', 1),
+                          ('get_user_orgs', 0),
+                          ('get_user_org_invits', 0)), doc="""
+                Accept an organisation invitation
+                PUT /v1/orgs/{org-id}/confirm-membership/{token}
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_org_devices', 'GET', '/{version}/orgs/{org_id}/devices', ('v1', 'v2'),
+             cache=True, doc="""
+                Get devices associated with an organisation
+                GET /v1/orgs/{org-id}/devices
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_filtered_org_devices', 'GET', '/{version}/orgs/{org_id}/devices/{d_batch}/{d_type}', ('v1', 'v2'),
+             cache=True, doc="""
+                Get a device s associated organisation with a given batch and type
+                GET /v1/orgs/{org-id}/devices/{batch}/{type}
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_org_device_meta', 'GET', '/{version}/orgs/{org_id}/devices/{client_id}', ('v1', 'v2'),
+             cache=True, doc="""
+                Get device metadata
+                GET /v1/orgs/{org-id}/devices/{client-id}
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :param client_id: The unique id for the device.
+                :type client_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('delete_org_device', 'DELETE', '/{version}/orgs/{org_id}/devices/{client_id}', ('v1', 'v2'),
+             result='ok',
+             invalidates=(('get_org_devices', 1),
+                          ('get_filtered_org_devices', 1),
+                          ('get_org_device_meta', 2)), doc="""
+                Delete a device
+                DELETE /v1/orgs/{org-id}/devices/{client-id}
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :param client_id: The unique id for the device.
+                :type client_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('update_org_device', 'PUT', '/{version}/orgs/{org_id}/devices/{client_id}', ('v1', 'v2'),
+             body='update_device_input', result='ok',
+             invalidates=(('get_org_devices', 1),
+                          ('get_filtered_org_devices', 1),
+                          ('get_org_device_meta', 2)), doc="""
+                Update device metadata
+                PUT /v1/orgs/{org-id}/devices/{client-id}
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :param client_id: The unique id for the device.
+                :type client_id: :py:class:`str`
+
+                update_device_input = {
+                  "name": "string",
+                  "description": "string",
+                  "batch": "string",
+                  "device-type": "string",
+                  "location": {
+                        "lat": 0,
+                        "lon": 0,
+                        "elevation": 0,
+                        "zip": "string",
+                        "postcode": "string"
+                  },
+                  "tags": [
+                        "string"
+                  ]
+                }
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_org_device_errors', 'GET', '/{version}/orgs/{org_id}/errors', ('v1', 'v2'),
+             doc="""
+                Retrieve device errors for a given org
+                GET /v1/orgs/{org-id}/errors
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_org_pending_invits', 'GET', '/{version}/orgs/{org_id}/invitations', ('v1', 'v2'),
+             cache=True, doc="""
+                Get pending invitations for an organisation
+                GET /v1/orgs/{org-id}/invitations
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_org_members', 'GET', '/{version}/orgs/{org_id}/members', ('v1', 'v2'),
+             cache=True, doc="""
+                Get members of an org
+                GET /v1/orgs/{org-id}/members
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('invite_user_to_org', 'POST', '/{version}/orgs/{org_id}/members/{user_id}', ('v1', 'v2'),
+             invalidates=(('get_org_pending_invits', 1), ('get_invit_status', 1)), doc="""
+                Invite user to join organisation (email will be sent)
+                POST /v1/orgs/{org-id}/members/{user-id}
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :param user_id: user id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('delete_user_from_org', 'DELETE', '/{version}/orgs/{org_id}/members/{user_id}', ('v1', 'v2'),
+             result='ok', invalidates=(('get_org_members', 1), ('get_invit_status', 1)), doc="""
+                Delete a user from an organisation
+                DELETE /v1/orgs/{org-id}/members/{user-id}
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :param user_id: user id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('reinvite_user_to_org', 'POST', '/{version}/orgs/{org_id}/members/invitation-data/{user_id}', ('v1', 'v2'),
+             invalidates=(('get_invit_status', 1),), doc="""
+                Resend an organisation invitation email
+                POST /v1/orgs/{org-id}/members/invitation-data/{user-id}
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :param user_id: user id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_invit_status', 'GET', '/{version}/orgs/{org_id}/members/invitation-data/{user_id}', ('v1', 'v2'),
+             cache=True, doc="""
+                Get invitation status for organisation and user
+                GET /v1/orgs/{org-id}/members/invitation-data/{user-id}
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :param user_id: user id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_org_topics', 'GET', '/{version}/orgs/{org_id}/topics', ('v1', 'v2'),
+             cache=True, doc="""
+                Get topics associated with an organisation
+                GET /v1/orgs/{org-id}/topics
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_org_stats', 'GET', '/{version}/orgs/{org_id}/usage-stats', ('v1', 'v2'),
+             doc="""
+                Retrieve usage stats for a given org
+                GET /v1/orgs/{org-id}/usage-stats
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_pub_org_meta', 'GET', '/{version}/public/orgs/{org_id}', ('v1', 'v2'),
+             cache=True, doc="""
+                Get public organisation metadata including topics [NO-AUTH]
+                GET /v1/public/orgs/{org-id}
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+
+    # ---------------------------------------- #
+    # [v2] schemas : Schema operations
+    # ---------------------------------------- #
+    Endpoint('get_schemas', 'GET', '/{version}/public/orgs/{org_id}', ('v2',),
+             cache=True, doc="""
+                Get all the available schemas that can be applied to topics [NO-AUTH]
+                GET /v2/schemas
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+
+    # ---------------------------------------- #
+    # [v2] projects : Project operations
+    # ---------------------------------------- #
+    Endpoint('get_pub_proj_info', 'GET', '/{version}/public/projects/{project_id}', ('v2',),
+             cache=True, doc="""
+                Get public project information [NO-AUTH]
+                GET /v2/public/projects/{project-id}
+
+                :param project_id: The unique id for the project.
+                :type project_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_pub_datasets', 'GET', '/{version}/public/projects/{project_id}/datasets', ('v2',),
+             cache=True, doc="""
+                Get public datasets for a given project [NO-AUTH]
+                GET /v2/public/projects/{project-id}/datasets
+
+                :param project_id: The unique id for the project.
+                :type project_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+
+    # ---------------------------------------- #
+    # [v2] events : SSE streams for device & dataset event
+    # ---------------------------------------- #
+    Endpoint('get_device_sd', 'GET', '/{version}/debug-events/{client_id}', ('v1', 'v2'),
+             result='events', doc="""
+                Opens a SSE stream with debug events for a device
+                GET /v2/debug-events/{client-id}
+
+                :param client_id: The unique id for the device.
+                :type client_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_pub_sd', 'GET', '/{version}/public/events/datasets/{dataset_id}', ('v2',),
+             result='events', doc="""
+                Opens a SSE stream for a public dataset [NO-AUTH]
+                GET /v2/public/events/datasets/{dataset-id}
+
+                :param dataset_id: The unique id for the dataset.
+                :type dataset_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_org_topics_sd', 'GET', '/{version}/events/orgs/{org_id}/topics', ('v1', 'v2'),
+             result='events', doc="""
+                Opens a SSE stream for all topics of an organisation
+                GET /v1/events/orgs/{org-id}/topics
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_topics_sd', 'GET', '/{version}/events/topics/{topic}', ('v1', 'v2'),
+             result='events', doc="""
+                Opens a SSE stream for a given topic
+                GET /v1/events/topics/{topic}
+
+                :param topic: The unique id for the interest topic.
+                :type topic: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_bookmarked_topics_sd', 'GET', '/{version}/events/users/{user_id}/bookmarks', ('v1', 'v2'),
+             result='events', doc="""
+                Opens a SSE stream for bookmarked topics for a user
+                GET /v1/events/users/{user-id}/bookmarks
+
+                :param user_id: user id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_user_topics_sd', 'GET', '/{version}/events/users/{user_id}/topics', ('v1', 'v2'),
+             result='events', doc="""
+                Opens a SSE stream for all topics for a user
+                GET /v1/events/users/{user-id}/topics
+
+                :param user_id: user id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_pub_org_topics_sd', 'GET', '/{version}/public/events/orgs/{org_id}/topics', ('v1', 'v2'),
+             result='events', doc="""
+                Opens a SSE stream for a organisations' all public topics [NO-AUTH]
+                GET /v1/public/events/orgs/{org-id}/topics
+
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_pub_topic_sd', 'GET', '/{version}/public/events/topics/{topic}', ('v1', 'v2'),
+             result='events', doc="""
+                Opens a SSE stream for a public topic [NO-AUTH]
+                GET /v1/public/events/topics/{topic}
+
+                :param topic: The unique id for the interest topic.
+                :type topic: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('get_pub_user_topics', 'GET', '/{version}/public/events/users/{user_id}/topics', ('v1', 'v2'),
+             result='events', doc="""
+                Opens a SSE stream for a users' all public topics [NO-AUTH]
+                GET /v1/public/events/users/{user-id}/topics
+
+                :param user_id: user id
+                :type user_id: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+    Endpoint('send_msg_topic', 'POST', '/{version}/topics/{topic}', ('v1', 'v2'),
+             doc="""
+                Post a message to a topic on behalf of a device
+                POST /v1/topics/{topic}
+
+                :param topic: The unique id for the interest topic.
+                :type topic: :py:class:`str`
+
+                :returns: The JSON output from the API or an error message
+                """),
+]
+
+REGISTRY = dict((endpoint.name, endpoint) for endpoint in ENDPOINTS)
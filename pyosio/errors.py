@@ -1,5 +1,4 @@
 # coding=utf-8
-from requests import RequestException
 
 
 class OSIOClientError(Exception):
@@ -32,3 +31,5 @@ class TimeoutError(OSIOClientError):
 
     def __init__(self, timeout):
         self.timeout = timeout
+        super(TimeoutError, self).__init__(
+            'Request timed out after %s seconds.' % timeout)
@@ -0,0 +1,370 @@
+# coding=utf-8
+"""
+    Streaming export of message history to Parquet.
+
+    Messages are pulled page by page through the paginated message endpoints,
+    converted to Arrow record batches and written to Parquet files partitioned
+    by topic and day::
+
+        root/topic=%2Fusers%2Fme%2Fsensors/date=2016-01-01/part-<run>-00000.parquet
+
+    Row groups are cut once their Arrow data reaches ``row_group_bytes``; no
+    more than one row group of data is buffered across all partitions. Files
+    are written under a temporary name and renamed when the run completes; a
+    failed run leaves no files behind. Requires the
+    ``pyarrow`` and ``numpy`` packages (``pip install pyosio[parquet]``).
+"""
+import json
+import os
+import time
+import uuid
+
+from .columnar import CATEGORICAL, Decoder
+from .errors import OSIOClientError
+from .backfill import epoch
+from .pagination import ITERATORS, format_date
+from .sync import StateFile
+
+try:
+    import numpy
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    numpy = pyarrow = None
+
+# Handle library reorganisation Python 2 > Python 3.
+try:
+    from urllib.parse import quote
+except ImportError:
+    from urllib import quote
+
+STATE_FILE = '_export_state.json'
+_TEXT = (str, type(u''))
+
+
+class ExportStats(object):
+
+    """
+        Counters kept by a :py:class:`ParquetExporter`.
+    """
+
+    def __init__(self):
+        self.messages = 0
+        self.pages = 0
+        self.row_groups = 0
+        self.files = 0
+        self.bytes_written = 0
+        self.seconds = 0.0
+
+    def as_dict(self):
+        return {'messages': self.messages, 'pages': self.pages, 'row_groups': self.row_groups,
+                'files': self.files, 'bytes_written': self.bytes_written, 'seconds': self.seconds}
+
+
+def _payload_text(message):
+    payload = message.get('payload') if isinstance(message, dict) else None
+    if isinstance(payload, dict) and 'text' in payload:
+        payload = payload['text']
+    if payload is None or isinstance(payload, _TEXT):
+        return payload
+    return json.dumps(payload)
+
+
+def record_batch(batch, payloads=None):
+    """
+            :param batch: A :py:class:`pyosio.columnar.MessageBatch`
+            :param payloads: Raw payload texts, stored in a ``payload`` column when given
+
+            :returns: A :py:class:`pyarrow.RecordBatch`
+            """
+    names = ['date']
+    arrays = [pyarrow.array(batch.date, mask=numpy.isnat(batch.date),
+                            type=pyarrow.timestamp('ms', tz='UTC'))]
+    for name in CATEGORICAL:
+        codes = batch.codes[name]
+        names.append(name)
+        arrays.append(pyarrow.DictionaryArray.from_arrays(
+            pyarrow.array(codes, mask=codes < 0), pyarrow.array(batch.categories[name].values,
+                                                                type=pyarrow.string())))
+    for name in sorted(batch.fields):
+        column = batch.fields[name]
+        names.append(name)
+        arrays.append(pyarrow.array(column.values, mask=column.mask))
+    if payloads is not None:
+        names.append('payload')
+        arrays.append(pyarrow.array(payloads, type=pyarrow.string()))
+    return pyarrow.RecordBatch.from_arrays(arrays, names)
+
+
+class _Partition(object):
+
+    __slots__ = ('directory', 'schema', 'pending', 'pending_bytes', 'writer', 'path')
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.schema = None
+        self.pending = []
+        self.pending_bytes = 0
+        self.writer = None
+        self.path = None
+
+
+class ParquetExporter(object):
+
+    """
+        Export the messages of topics, devices or users to a partitioned
+        Parquet dataset.
+
+            exporter = ParquetExporter(osio_client, '/data/lake/osio')
+            exporter.export('topic', topic, '2016-01-01', '2016-02-01')
+            exporter.export_since_last('topic', topic)
+
+        Fix the payload ``fields`` (and their dtypes) to keep one schema per
+        file; with inferred fields a new file is started whenever the set of
+        payload fields changes.
+
+    """
+    DEFAULT_ROW_GROUP_BYTES = 64 * 1024 * 1024
+    DEFAULT_LAG = 60
+
+    def __init__(self, client, root, row_group_bytes=DEFAULT_ROW_GROUP_BYTES, fields=None,
+                 payload=True, compression='snappy', prefetch=1):
+        """
+                :param client: Client whose paginated message iterators are used
+                :type client: :py:class:`pyosio.osio.OpenSensorsAPI`
+
+                :param root: Directory of the dataset
+                :type root: :py:class:`str`
+
+                :param row_group_bytes: Arrow bytes buffered before a row group is written
+                :type row_group_bytes: :py:class:`int`
+
+                :param fields: Payload fields to extract, see :py:class:`pyosio.columnar.Decoder`
+                :type fields: :py:class:`list` or :py:class:`dict`
+
+                :param payload: Also store the raw payload text
+                :type payload: :py:class:`bool`
+
+                :param compression: Parquet compression codec
+                :type compression: :py:class:`str`
+
+                :param prefetch: Pages fetched ahead while a page is converted and written
+                :type prefetch: :py:class:`int`
+
+                """
+        if pyarrow is None:
+            raise OSIOClientError('Parquet export requires the pyarrow and numpy packages.')
+        self.client = client
+        self.root = root
+        self.row_group_bytes = row_group_bytes
+        self.fields = fields
+        self.payload = payload
+        self.compression = compression
+        self.prefetch = prefetch
+        self.stats = ExportStats()
+        self._partitions = {}
+        self._pending_bytes = 0
+        self._run = None
+        self._files = 0
+        self._written = []
+        self._published = []
+
+    # ---------------------------------------- #
+    # Export runs
+    # ---------------------------------------- #
+
+    def export(self, kind, key, start_date=None, end_date=None, queryparams=None):
+        """
+                Export the messages dated in ``[start_date, end_date)``
+
+                :param kind: topic, device or user
+                :type kind: :py:class:`str`
+
+                :param key: Topic, client id or user id
+                :type key: :py:class:`str`
+
+                :param start_date: Oldest message, as datetime, date, epoch seconds or ISO 8601
+                :param end_date: End of the window (excluded)
+
+                :param queryparams: Other query string parameters of the endpoint
+                :type queryparams: :py:class:`dict`
+
+                :returns: Paths of the files written
+                """
+        if kind not in ITERATORS:
+            raise ValueError('Cannot export messages of a %s.' % kind)
+        start = epoch(start_date)
+        end = epoch(end_date)
+        started = time.time()
+        self._run = '%d-%s' % (started, uuid.uuid4().hex[:8])
+        self._written = []
+        self._published = []
+        pages = getattr(self.client, ITERATORS[kind])(
+            key, start_date=format_date(start_date), end_date=format_date(end_date),
+            queryparams=queryparams, pages=True, prefetch=self.prefetch)
+        decoder = Decoder(self.fields)
+        try:
+            for messages in pages:
+                batch = decoder.decode(messages)
+                payloads = [_payload_text(message) for message in messages] if self.payload else None
+                self._write(self._window(record_batch(batch, payloads), start, end), kind, key)
+                self.stats.pages += 1
+            self._close()
+        except BaseException:
+            self._abort()
+            raise
+        finally:
+            self.stats.seconds += time.time() - started
+        return list(self._written)
+
+    def export_since_last(self, kind, key, start_date=None, end_date=None, lag=DEFAULT_LAG):
+        """
+                Export the messages dated since the end of the previous
+                :py:meth:`export_since_last` of ``key``, or since ``start_date`` the
+                first time, and record the new end once every file is written.
+
+                :param end_date: End of the window, by default ``lag`` seconds ago
+                :param lag: Seconds left for late messages to arrive
+                :type lag: :py:class:`float`
+
+                :returns: Paths of the files written
+                """
+        state = StateFile(os.path.join(self.root, STATE_FILE))
+        name = '%s:%s' % (kind, key)
+        start = state.get(name, start_date)
+        end = end_date if end_date is not None else time.time() - lag
+        end = format_date(epoch(end))
+        if start is not None and epoch(start) >= epoch(end):
+            return []
+        paths = self.export(kind, key, start, end)
+        state.update(name, end)
+        return paths
+
+    # ---------------------------------------- #
+    # Writing
+    # ---------------------------------------- #
+
+    @staticmethod
+    def _window(batch, start, end):
+        if start is None and end is None:
+            return batch
+        dates = batch.column(0).cast(pyarrow.int64()).to_numpy(zero_copy_only=False)
+        keep = numpy.ones(len(dates), dtype=bool)
+        if start is not None:
+            keep &= dates >= start * 1000
+        if end is not None:
+            keep &= dates < end * 1000
+        return batch if keep.all() else batch.filter(pyarrow.array(keep))
+
+    def _partition_keys(self, batch, key):
+        """
+                :returns: An array of (topic code, day) group ids and the group labels
+                """
+        topic = batch.column(CATEGORICAL.index('topic') + 1)
+        codes = topic.indices.to_numpy(zero_copy_only=False)
+        codes = numpy.where(topic.is_null().to_numpy(zero_copy_only=False), -1, codes).astype(numpy.int64)
+        dates = batch.column(0).cast(pyarrow.int64()).to_numpy(zero_copy_only=False)
+        days = numpy.where(batch.column(0).is_null().to_numpy(zero_copy_only=False), -1,
+                           dates // 86400000)
+        # One group id per (topic, day); missing topics and dates count as -1.
+        groups, inverse = numpy.unique((codes + 1) * 1000000 + days + 1, return_inverse=True)
+        labels = []
+        dictionary = topic.dictionary.to_pylist()
+        for group in groups:
+            code, day = divmod(int(group), 1000000)
+            name = dictionary[code - 1] if code else key
+            date = numpy.datetime64(day - 1, 'D').astype(str) if day else 'unknown'
+            labels.append((name, date))
+        return inverse, labels
+
+    def _write(self, batch, kind, key):
+        if not len(batch):
+            return
+        self.stats.messages += len(batch)
+        inverse, labels = self._partition_keys(batch, key if kind == 'topic' else None)
+        for index, (topic, date) in enumerate(labels):
+            part = batch if len(labels) == 1 else batch.filter(pyarrow.array(inverse == index))
+            directory = os.path.join(self.root, 'topic=%s' % quote(topic or 'unknown', safe=''),
+                                     'date=%s' % date)
+            partition = self._partitions.get(directory)
+            if partition is None:
+                partition = self._partitions[directory] = _Partition(directory)
+            self._append(partition, part)
+        while self._pending_bytes >= self.row_group_bytes:
+            self._flush(max(self._partitions.values(), key=lambda p: p.pending_bytes))
+
+    def _append(self, partition, batch):
+        if partition.schema is not None and not batch.schema.equals(partition.schema):
+            self._flush(partition)
+            self._close_partition(partition)
+        partition.schema = batch.schema
+        partition.pending.append(batch)
+        partition.pending_bytes += batch.nbytes
+        self._pending_bytes += batch.nbytes
+
+    def _flush(self, partition):
+        """
+                Write the pending batches of a partition as one row group
+                """
+        if not partition.pending:
+            return
+        if partition.writer is None:
+            if not os.path.isdir(partition.directory):
+                os.makedirs(partition.directory)
+            partition.path = os.path.join(partition.directory,
+                                          'part-%s-%05d.parquet' % (self._run, self._files))
+            self._files += 1
+            partition.writer = pyarrow.parquet.ParquetWriter(
+                partition.path + '.tmp', partition.schema, compression=self.compression)
+        table = pyarrow.Table.from_batches(partition.pending, partition.schema)
+        partition.writer.write_table(table, row_group_size=len(table))
+        self.stats.row_groups += 1
+        self._pending_bytes -= partition.pending_bytes
+        partition.pending = []
+        partition.pending_bytes = 0
+
+    def _close_partition(self, partition):
+        if partition.writer is None:
+            return
+        partition.writer.close()
+        self._written.append(partition.path)
+        partition.writer = partition.path = None
+
+    def _abort(self):
+        """
+                Drop every file of a failed run, so that a run is written entirely or not at all
+                """
+        for partition in self._partitions.values():
+            if partition.writer is not None:
+                try:
+                    partition.writer.close()
+                except Exception:
+                    pass
+                self._written.append(partition.path)
+        published = set(self._published)
+        for path in self._written:
+            # Files renamed before the failure are withdrawn as well.
+            try:
+                os.remove(path if path in published else path + '.tmp')
+            except OSError:
+                pass
+        self._partitions = {}
+        self._pending_bytes = 0
+        self._written = []
+        self._published = []
+
+    def _close(self):
+        """
+                Write the pending row groups and publish the files of the run
+                """
+        for partition in self._partitions.values():
+            self._flush(partition)
+            self._close_partition(partition)
+        for path in self._written:
+            os.rename(path + '.tmp', path)
+            self._published.append(path)
+        for path in self._published:
+            self.stats.files += 1
+            self.stats.bytes_written += os.path.getsize(path)
+        self._partitions = {}
+        self._pending_bytes = 0
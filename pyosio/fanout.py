@@ -0,0 +1,115 @@
+# coding=utf-8
+import threading
+from collections import namedtuple
+
+# Handle library reorganisation Python 2 > Python 3.
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+
+class FanOutResult(namedtuple('FanOutResult', 'index args result error')):
+
+    """
+        Outcome of one call made by :py:func:`fan_out`.
+
+        ``index`` is the position of ``args`` in the input iterable, ``error``
+        the exception raised by the call (``result`` is then ``None``).
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _call(fn, args):
+    """
+            Call ``fn`` with an argument set: a tuple/list is expanded as positional
+            arguments, a dict as keyword arguments, anything else is passed as is.
+            """
+    if isinstance(args, dict):
+        return fn(**args)
+    if isinstance(args, (tuple, list)):
+        return fn(*args)
+    return fn(args)
+
+
+def _worker(fn, tasks, results):
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        index, args = task
+        try:
+            results.put(FanOutResult(index, args, _call(fn, args), None))
+        except Exception as e:
+            results.put(FanOutResult(index, args, None, e))
+
+
+def fan_out(fn, argsets, max_workers=8, ordered=False):
+    """
+            Run ``fn`` over many argument sets on a bounded pool of threads.
+
+            At most ``2 * max_workers`` calls are pending at any time, so the input
+            iterable is consumed lazily and memory stays bounded even in ordered mode.
+
+            :param fn: Callable to run for each argument set
+            :type fn: :py:class:`callable`
+
+            :param argsets: Iterable of argument sets (tuple, dict or single value)
+
+            :param max_workers: Number of worker threads
+            :type max_workers: :py:class:`int`
+
+            :param ordered: Yield results in input order instead of completion order
+            :type ordered: :py:class:`bool`
+
+            :returns: A generator of :py:class:`FanOutResult`
+            """
+    max_workers = max(1, int(max_workers))
+    window = 2 * max_workers
+    tasks = Queue()
+    results = Queue()
+    threads = [threading.Thread(target=_worker, args=(fn, tasks, results))
+               for _ in range(max_workers)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    argsets = iter(argsets)
+    submitted = 0
+    pending = 0
+    buffered = {}
+    next_index = 0
+    exhausted = False
+
+    try:
+        while True:
+            while not exhausted and pending + len(buffered) < window:
+                try:
+                    args = next(argsets)
+                except StopIteration:
+                    exhausted = True
+                    break
+                tasks.put((submitted, args))
+                submitted += 1
+                pending += 1
+
+            if pending == 0:
+                break
+
+            item = results.get()
+            pending -= 1
+            if not ordered:
+                yield item
+                continue
+
+            buffered[item.index] = item
+            while next_index in buffered:
+                yield buffered.pop(next_index)
+                next_index += 1
+    finally:
+        for _ in threads:
+            tasks.put(None)
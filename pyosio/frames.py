@@ -0,0 +1,308 @@
+# coding=utf-8
+"""
+    pandas DataFrames of message history and inventories.
+
+    Frames are built a chunk at a time from typed NumPy arrays rather than from
+    a list of dicts: message pages go through :py:mod:`pyosio.columnar`,
+    inventory records are flattened and encoded ``chunk_size`` records at a
+    time. Every column gets an explicit dtype: ``datetime64[ms, UTC]`` dates,
+    ``category`` ids, ``float64``, nullable ``Int64`` and ``boolean`` numbers and
+    ``object`` for anything else. Requires the ``pandas`` package
+    (``pip install pyosio[pandas]``).
+"""
+import numbers
+from collections import OrderedDict
+
+from .errors import OSIOClientError
+from .columnar import Categories, CATEGORICAL, Decoder
+
+try:
+    import numpy
+    import pandas
+except ImportError:
+    numpy = pandas = None
+
+DEFAULT_CHUNK_SIZE = 100000
+_TEXT = (str, type(u''))
+
+
+def _require_pandas():
+    if pandas is None:
+        raise OSIOClientError('DataFrame export requires the pandas package.')
+
+
+class _Chunk(object):
+
+    """
+        One column of one chunk: ``kind`` is datetime, category, bool, int, float,
+        object or null (no value at all); ``mask`` is True where the value is missing.
+    """
+    __slots__ = ('kind', 'values', 'mask')
+
+    def __init__(self, kind, values, mask=None):
+        self.kind = kind
+        self.values = values
+        self.mask = mask
+
+    def as_objects(self, categories):
+        if self.kind == 'category':
+            return numpy.array(categories.values + [None], dtype=object)[self.values]
+        values = self.values.astype(object)
+        if self.mask is not None:
+            values[self.mask] = None
+        return values
+
+
+def _empty(kind, size):
+    if kind == 'datetime':
+        return _Chunk(kind, numpy.full(size, numpy.datetime64('NaT'), dtype='datetime64[ms]'))
+    if kind == 'category':
+        return _Chunk(kind, numpy.full(size, -1, dtype=numpy.int32))
+    if kind in ('object', 'null'):
+        return _Chunk(kind, numpy.full(size, None, dtype=object))
+    dtype = {'bool': numpy.bool_, 'int': numpy.int64, 'float': numpy.float64}[kind]
+    return _Chunk(kind, numpy.zeros(size, dtype=dtype), numpy.ones(size, dtype=bool))
+
+
+class FrameBuilder(object):
+
+    """
+        Accumulates typed column chunks and assembles them into one DataFrame,
+        concatenating one column at a time so that the chunks of a single
+        column at most are held next to the frame.
+    """
+
+    def __init__(self, categorical=None):
+        """
+                :param categorical: Columns always stored as ``category``; other
+                        string columns are when they hold at most one distinct value
+                        for every two rows
+                """
+        _require_pandas()
+        self.rows = 0
+        self.categorical = set(categorical or ())
+        self.categories = {}
+        self._columns = {}
+        self._order = []
+
+    def append(self, size, columns):
+        """
+                :param size: Rows in the chunk
+                :param columns: :py:class:`_Chunk` by column name; absent columns are missing
+                """
+        for name, chunk in columns.items():
+            if name not in self._columns:
+                self._columns[name] = []
+                self._order.append(name)
+                if self.rows:
+                    self._columns[name].append(_empty(chunk.kind, self.rows))
+        for name in self._order:
+            if name not in columns:
+                self._columns[name].append(_empty(self._columns[name][-1].kind, size))
+            else:
+                self._columns[name].append(columns[name])
+        self.rows += size
+
+    def _assemble(self, name, chunks):
+        kinds = set(chunk.kind for chunk in chunks) - set(['null'])
+        if kinds == set(['int', 'float']):
+            chunks = [_Chunk('float', chunk.values.astype(numpy.float64), chunk.mask)
+                      if chunk.kind == 'int' else chunk for chunk in chunks]
+            kinds = set(['float'])
+        if len(kinds) > 1:
+            categories = self.categories.get(name)
+            return pandas.Series(numpy.concatenate([chunk.as_objects(categories) for chunk in chunks]),
+                                 dtype=object)
+        kind = kinds.pop() if kinds else 'object'
+        chunks = [_empty(kind, len(chunk.values)) if chunk.kind == 'null' else chunk
+                  for chunk in chunks]
+        values = numpy.concatenate([chunk.values for chunk in chunks])
+        if kind == 'datetime':
+            return pandas.Series(values).dt.tz_localize('UTC')
+        if kind == 'object':
+            return pandas.Series(values, dtype=object)
+        if kind == 'category':
+            categories = self.categories[name]
+            if name in self.categorical or 2 * len(categories) <= len(values):
+                return pandas.Series(pandas.Categorical.from_codes(values, categories.values))
+            return pandas.Series(numpy.array(categories.values + [None], dtype=object)[values],
+                                 dtype=object)
+        mask = numpy.concatenate([chunk.mask for chunk in chunks])
+        if kind == 'float':
+            values[mask] = numpy.nan
+            return pandas.Series(values)
+        if kind == 'int':
+            return pandas.Series(pandas.arrays.IntegerArray(values, mask))
+        return pandas.Series(pandas.arrays.BooleanArray(values, mask))
+
+    def frame(self):
+        """
+                :returns: A :py:class:`pandas.DataFrame` of everything appended; the
+                        builder is emptied
+                """
+        data = {}
+        for name in self._order:
+            data[name] = self._assemble(name, self._columns.pop(name))
+        order, self._order, self.rows = self._order, [], 0
+        return pandas.DataFrame(data, columns=order)
+
+
+def _kind(dtype):
+    return {'b': 'bool', 'i': 'int', 'u': 'int', 'f': 'float'}.get(numpy.dtype(dtype).kind, 'object')
+
+
+def batch_columns(batch):
+    """
+            :param batch: A :py:class:`pyosio.columnar.MessageBatch`
+            :returns: The columns of the batch as :py:class:`_Chunk` objects
+            """
+    columns = OrderedDict([('date', _Chunk('datetime', batch.date))])
+    for name in CATEGORICAL:
+        columns[name] = _Chunk('category', batch.codes[name])
+    for name, column in batch.fields.items():
+        columns[name] = _Chunk(_kind(column.values.dtype), column.values, column.mask)
+    return columns
+
+
+def flatten(record, prefix=''):
+    """
+            :returns: A flat dict of a record, nested keys joined with dots
+            """
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, dict) and value:
+            flat.update(flatten(value, prefix + key + '.'))
+        else:
+            flat[prefix + key] = value
+    return flat
+
+
+def _record_column(values, categories):
+    present = [value for value in values if value is not None]
+    if not present:
+        return _empty('null', len(values))
+    mask = numpy.array([value is None for value in values], dtype=bool)
+    if all(isinstance(value, _TEXT) for value in present):
+        return _Chunk('category', categories.encode(values))
+    if all(isinstance(value, bool) for value in present):
+        kind, dtype, fill = 'bool', numpy.bool_, False
+    elif all(isinstance(value, numbers.Integral) and not isinstance(value, bool) and
+             -2 ** 63 <= value < 2 ** 63 for value in present):
+        kind, dtype, fill = 'int', numpy.int64, 0
+    elif all(isinstance(value, numbers.Real) and not isinstance(value, bool) for value in present):
+        kind, dtype, fill = 'float', numpy.float64, numpy.nan
+    else:
+        return _Chunk('object', numpy.array(values + [None], dtype=object)[:-1])
+    return _Chunk(kind, numpy.array([fill if value is None else value for value in values],
+                                    dtype=dtype), mask)
+
+
+def records_frame(records, chunk_size=DEFAULT_CHUNK_SIZE, categorical=None):
+    """
+            Build a DataFrame of inventory records, e.g. the devices returned by
+            ``get_org_devices``. Nested objects become dotted columns
+            (``location.lat``).
+
+            :param records: Iterable of dicts
+            :param chunk_size: Records flattened and encoded at a time
+            :type chunk_size: :py:class:`int`
+
+            :param categorical: Columns always stored as ``category``
+            :type categorical: :py:class:`list`
+
+            :returns: A :py:class:`pandas.DataFrame`
+            """
+    builder = FrameBuilder(categorical)
+    chunk = []
+    for record in records:
+        chunk.append(flatten(record) if isinstance(record, dict) else {'value': record})
+        if len(chunk) >= chunk_size:
+            _append_records(builder, chunk)
+            chunk = []
+    if chunk or not builder.rows:
+        _append_records(builder, chunk)
+    return builder.frame()
+
+
+def _append_records(builder, records):
+    names = []
+    seen = set()
+    for record in records:
+        for name in record:
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+    columns = OrderedDict()
+    for name in names:
+        categories = builder.categories.setdefault(name, Categories())
+        columns[name] = _record_column([record.get(name) for record in records], categories)
+    builder.append(len(records), columns)
+
+
+def inventory(result):
+    """
+            :returns: The records of an inventory result: the list itself, or the
+                    first list found in a wrapping object
+            """
+    if isinstance(result, list):
+        return result
+    if isinstance(result, dict):
+        for value in result.values():
+            if isinstance(value, list):
+                return value
+    raise OSIOClientError('Expected a list of records, got %s.' % type(result).__name__)
+
+
+def messages_frames(batches, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+            Group message batches into DataFrames of about ``chunk_size`` rows,
+            so that memory is bounded by the chunk whatever the length of the
+            history. Category codes are shared between the frames, but the
+            categories of a frame only list the values seen until then.
+
+            :param batches: Iterable of :py:class:`pyosio.columnar.MessageBatch`
+                    produced by one :py:class:`pyosio.columnar.Decoder`
+            :returns: A generator of :py:class:`pandas.DataFrame`
+            """
+    _require_pandas()
+    builder = None
+    for batch in batches:
+        if builder is None:
+            builder = FrameBuilder(CATEGORICAL)
+        builder.categories.update(batch.categories)
+        builder.append(len(batch), batch_columns(batch))
+        if builder.rows >= chunk_size:
+            yield builder.frame()
+    if builder is not None and builder.rows:
+        yield builder.frame()
+
+
+def messages_frame(batches):
+    """
+            :param batches: Iterable of :py:class:`pyosio.columnar.MessageBatch`
+                    produced by one :py:class:`pyosio.columnar.Decoder`
+            :returns: A single :py:class:`pandas.DataFrame` of every message
+            """
+    builder = FrameBuilder(CATEGORICAL)
+    for batch in batches:
+        builder.categories.update(batch.categories)
+        builder.append(len(batch), batch_columns(batch))
+    if not builder.rows:
+        batch = Decoder().decode([])
+        builder.categories.update(batch.categories)
+        builder.append(0, batch_columns(batch))
+    return builder.frame()
+
+
+def to_dataframe(result, chunk_size=DEFAULT_CHUNK_SIZE, fields=None):
+    """
+            Build a DataFrame of an endpoint result: a message page of the
+            ``get_*_msgs`` endpoints or an inventory, see :py:func:`inventory`.
+
+            :param fields: Payload fields to extract from messages, see
+                    :py:class:`pyosio.columnar.Decoder`
+            :returns: A :py:class:`pandas.DataFrame`
+            """
+    if isinstance(result, dict) and 'messages' in result:
+        return messages_frame([Decoder(fields).decode(result)])
+    return records_frame(inventory(result), chunk_size)
@@ -0,0 +1,158 @@
+# coding=utf-8
+import threading
+from collections import OrderedDict
+
+from .lazy import lazy_import
+
+requests = lazy_import('requests')
+
+
+class HTTPCacheStats(object):
+
+    """
+        Counters kept by a :py:class:`HTTPCache`.
+    """
+
+    def __init__(self):
+        self.revalidated = 0
+        self.stored = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+    def as_dict(self):
+        return {'revalidated': self.revalidated, 'stored': self.stored,
+                'evictions': self.evictions, 'bytes_saved': self.bytes_saved}
+
+
+class _Entry(object):
+
+    __slots__ = ('status_code', 'headers', 'content', 'encoding', 'url')
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.headers = requests.structures.CaseInsensitiveDict(response.headers)
+        self.content = response.content
+        self.encoding = response.encoding
+        self.url = response.url
+
+    @property
+    def validators(self):
+        headers = {}
+        if 'ETag' in self.headers:
+            headers['If-None-Match'] = self.headers['ETag']
+        if 'Last-Modified' in self.headers:
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+
+class HTTPCache(object):
+
+    """
+        Conditional GET cache for the REST API.
+
+        Successful GET responses carrying an ``ETag`` or ``Last-Modified`` header
+        are kept in memory; the next identical request sends them back as
+        ``If-None-Match``/``If-Modified-Since`` and a ``304 Not Modified`` answer
+        is replaced by the stored response. Entries are evicted least recently
+        used first once the stored bodies exceed ``max_bytes``.
+
+    """
+    DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """
+                :param max_bytes: Budget for the stored response bodies
+                :type max_bytes: :py:class:`int`
+
+                """
+        self.max_bytes = max_bytes
+        self.stats = HTTPCacheStats()
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url, params=None, headers=None):
+        """
+                :returns: The cache key of a GET request. The Authorization header is
+                        part of it, so clients with different credentials never share entries.
+                """
+        params = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        return url, params, (headers or {}).get('Authorization')
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """
+                Bytes of response bodies currently stored.
+                """
+        return self._size
+
+    def validators(self, key):
+        """
+                :returns: The conditional request headers for ``key``
+                """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.validators if entry is not None else {}
+
+    def update(self, key, response):
+        """
+                Store a fresh response or answer a 304 from the cache
+
+                :param key: Key from :py:meth:`key`
+                :param response: Response to the (conditional) request
+                :type response: :py:class:`requests.Response`
+
+                :returns: The response to hand to the caller
+                """
+        with self._lock:
+            if response.status_code == 304:
+                entry = self._entries.get(key)
+                if entry is None:
+                    return response
+                self._entries[key] = self._entries.pop(key)
+                for name in ('ETag', 'Last-Modified'):
+                    if name in response.headers:
+                        entry.headers[name] = response.headers[name]
+                self.stats.revalidated += 1
+                self.stats.bytes_saved += len(entry.content)
+                return self._revive(entry)
+
+            if response.status_code != 200 or not ('ETag' in response.headers or
+                                                     'Last-Modified' in response.headers):
+                return response
+
+            entry = _Entry(response)
+            if len(entry.content) > self.max_bytes:
+                return response
+            self._discard(key)
+            self._entries[key] = entry
+            self._size += len(entry.content)
+            self.stats.stored += 1
+            while self._size > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self.stats.evictions += 1
+            return response
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.content)
+
+    @staticmethod
+    def _revive(entry):
+        response = requests.Response()
+        response.status_code = entry.status_code
+        response.headers = requests.structures.CaseInsensitiveDict(entry.headers)
+        response._content = entry.content
+        response.encoding = entry.encoding
+        response.url = entry.url
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
@@ -0,0 +1,32 @@
+# coding=utf-8
+import importlib
+
+
+class LazyModule(object):
+
+    """
+        Stand-in for a module that is imported on first attribute access, so
+        heavy dependencies (``requests``, ``sseclient``) only cost their import
+        time when a request is actually made.
+    """
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        self.__dict__.update(vars(module))
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return '<lazy module %r>' % self._name
+
+
+def lazy_import(name):
+    """
+            :param name: Absolute module name
+            :type name: :py:class:`str`
+
+            :returns: A :py:class:`LazyModule` for ``name``
+            """
+    return LazyModule(name)
@@ -1,9 +1,23 @@
-import requests
 import logging
-import json
-import getpass
-from errors import *
-from sseclient import SSEClient
+import time
+from .errors import *
+from .transport import Transport
+from .fanout import fan_out
+from .retry import RetryPolicy
+from .deadline import current_deadline
+from .endpoints import install, REGISTRY
+from .pagination import Cursor, Paginator, format_date
+from .backfill import ShardPlanner, backfill, epoch
+from .bulk import ChunkPlanner, bulk_fetch, bulk_input
+from .httpcache import HTTPCache
+from .singleflight import SingleFlight, share_json
+from . import codec
+from .lazy import lazy_import
+
+# Loaded on first use: most jobs never open a stream and importing requests
+# dominates start-up time.
+requests = lazy_import('requests')
+sseclient = lazy_import('sseclient')
 
 # Handle library reorganisation Python 2 > Python 3.
 try:
@@ -14,6 +28,7 @@ except ImportError:
     from urllib import urlencode
 
 
+@install
 class OpenSensorsAPI():
 
     """
@@ -35,11 +50,17 @@ class OpenSensorsAPI():
     """
     DEFAULT_DEBUG = True
     DEFAULT_TIMEOUT = 10
+    DEFAULT_CONNECT_TIMEOUT = 5
+    DEFAULT_STREAM_IDLE_TIMEOUT = 90
     DEFAULT_API_BASE_URL = 'https://api.opensensors.io/'
     DEFAULT_REALTIME_API_URL = 'https://realtime.opensensors.io/'
     DEFAULT_VERSIONS = ['v1', 'v2']
+    DEFAULT_FAN_OUT_WORKERS = 8
+    DEFAULT_BACKFILL_SHARDS = 4
 
-    def __init__(self, user_id, api_key, version='v1'):
+    def __init__(self, user_id, api_key, version='v1', transport=None, realtime_transport=None,
+                 retry=None, rate_limiter=None, timeout=None, stream_idle_timeout=None,
+                 http_cache=None, metadata_cache=None, page_cache=None, coalesce=True):
         """
                 Initialize the class with you user_id and secret_key.
 
@@ -52,6 +73,37 @@ class OpenSensorsAPI():
                 :param version: Version of Open Sensors API
                 :type version: :py:class:`str`
 
+                :param transport: Connection pool used for the REST API
+                :type transport: :py:class:`pyosio.transport.Transport`
+
+                :param realtime_transport: Connection pool used for the Real-Time API
+                :type realtime_transport: :py:class:`pyosio.transport.Transport`
+
+                :param retry: Retry policy applied to every request and stream connect
+                :type retry: :py:class:`pyosio.retry.RetryPolicy`
+
+                :param rate_limiter: Client-side pacing of requests, may be shared between clients
+                :type rate_limiter: :py:class:`pyosio.ratelimit.RateLimiter`
+
+                :param timeout: Request timeout in seconds, or a (connect, read) tuple
+                :type timeout: :py:class:`float` or :py:class:`tuple`
+
+                :param stream_idle_timeout: Seconds without data after which a stream is
+                        considered stalled and reconnected
+                :type stream_idle_timeout: :py:class:`float`
+
+                :param http_cache: Conditional GET cache for ETag/Last-Modified validators
+                :type http_cache: :py:class:`pyosio.httpcache.HTTPCache`
+
+                :param metadata_cache: TTL cache of decoded metadata results
+                :type metadata_cache: :py:class:`pyosio.cache.MetadataCache`
+
+                :param page_cache: On-disk cache of historical message pages
+                :type page_cache: :py:class:`pyosio.pagecache.PageCache`
+
+                :param coalesce: Share one request between identical concurrent GETs
+                :type coalesce: :py:class:`bool`
+
                 """
 
         self.user_id = user_id
@@ -62,7 +114,25 @@ class OpenSensorsAPI():
         self._headers = {"Content-Type": "application/json", "Accept": "application/json",
                          'Authorization': 'api-key ' + self.api_key,
                          "User-Agent": "Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/47.0.2526.106 Safari/537.36"}
-        self.logger = logging.getLogger(__name__).setLevel(logging.INFO)
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        self._transport = transport if transport is not None else Transport()
+        self._realtime_transport = realtime_transport if realtime_transport is not None else Transport()
+        self._retry = retry if retry is not None else RetryPolicy()
+        self._rate_limiter = rate_limiter
+        self.timeout = timeout if timeout is not None else (self.DEFAULT_CONNECT_TIMEOUT, self.DEFAULT_TIMEOUT)
+        self.stream_idle_timeout = stream_idle_timeout or self.DEFAULT_STREAM_IDLE_TIMEOUT
+        self._http_cache = http_cache
+        self._metadata_cache = metadata_cache
+        self._page_cache = page_cache
+        self._single_flight = SingleFlight() if coalesce else None
+
+    def close(self):
+        """
+                Close the pooled connections of the REST and Real-Time transports.
+                """
+        self._transport.close()
+        self._realtime_transport.close()
 
     # ---------------------------------------- #
     # SETers/GETers
@@ -81,10 +151,134 @@ class OpenSensorsAPI():
         else:
             self.logger.warn('Invalid API version')
 
+    @property
+    def retry_stats(self):
+        """
+                Counters of the retry policy: attempts, retries, gave_up and the
+                total sleep_seconds spent waiting between attempts.
+                """
+        return self._retry.stats.as_dict()
+
+    @property
+    def rate_limit_stats(self):
+        """
+                Counters of the rate limiter: requests, waits and the total
+                wait_seconds spent pacing, or None without a rate limiter.
+                """
+        return self._rate_limiter.stats.as_dict() if self._rate_limiter is not None else None
+
+    @property
+    def http_cache_stats(self):
+        """
+                Counters of the HTTP cache: responses stored, 304s revalidated,
+                evictions and bytes_saved, or None without an HTTP cache.
+                """
+        return self._http_cache.stats.as_dict() if self._http_cache is not None else None
+
+    @property
+    def cache_stats(self):
+        """
+                Counters of the metadata cache: hits, misses, evictions, expirations
+                and invalidations, or None without a metadata cache.
+                """
+        return self._metadata_cache.stats.as_dict() if self._metadata_cache is not None else None
+
+    @property
+    def page_cache_stats(self):
+        """
+                Counters of the page cache: hits, misses, pages stored, evictions
+                and bytes_served from disk, or None without a page cache.
+                """
+        return self._page_cache.stats.as_dict() if self._page_cache is not None else None
+
+    @property
+    def transfer_stats(self):
+        """
+                Byte counters of the REST transport: responses, wire_bytes received
+                (compressed) against decoded_bytes, and sent_bytes of request bodies
+                against the sent_wire_bytes actually uploaded.
+                """
+        stats = getattr(self._transport, 'stats', None)
+        return stats.as_dict() if stats is not None else None
+
+    @property
+    def coalesce_stats(self):
+        """
+                Counters of request coalescing: GET calls sent and calls collapsed
+                into an identical in-flight one, or None when coalescing is off.
+                """
+        return self._single_flight.stats.as_dict() if self._single_flight is not None else None
+
     # ---------------------------------------- #
     # CRUD Handlers: GET, POST, DELETE, PUT
     # ---------------------------------------- #
 
+    def _request(self, transport, method, url, **kwargs):
+        """
+                Send a request through a transport, applying the timeouts, the
+                current deadline, the rate limiter and the retry policy
+
+                :param transport: Transport to use
+                :type transport: :py:class:`pyosio.transport.Transport`
+
+                :param method: HTTP method
+                :type method: :py:class:`str`
+
+                :param url: Absolute url
+                :type url: :py:class:`str`
+
+                :returns: The Reponse from the API
+                """
+        def send():
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire(url)
+            timeout = kwargs.get('timeout', self.timeout)
+            deadline = current_deadline()
+            if deadline is not None:
+                deadline.check()
+                timeout = deadline.clamp(timeout)
+            return transport.request(method, url, **dict(kwargs, timeout=timeout))
+
+        return self._retry.execute(method, send)
+
+    def _conditional_get(self, url, headers=None, params=None):
+        """
+                GET through the HTTP cache: send the stored validators and serve a
+                304 answer from the cache.
+
+                :param url: Absolute url
+                :type url: :py:class:`str`
+
+                :returns: The Reponse from the API
+                """
+        if self._http_cache is None:
+            return self._request(self._transport, 'GET', url, headers=headers, params=params)
+
+        key = self._http_cache.key(url, params, headers)
+        validators = self._http_cache.validators(key)
+        if validators:
+            headers = dict(headers or {}, **validators)
+        response = self._request(self._transport, 'GET', url, headers=headers, params=params)
+        return self._http_cache.update(key, response)
+
+    def _shared_get(self, url, headers=None, params=None):
+        """
+                GET shared between identical concurrent callers, who all receive a
+                copy of the same response and decode its JSON on their own.
+
+                :param url: Absolute url
+                :type url: :py:class:`str`
+
+                :returns: The Reponse from the API
+                """
+        if self._single_flight is None:
+            return self._conditional_get(url, headers=headers, params=params)
+
+        def send():
+            return self._conditional_get(url, headers=headers, params=params)
+
+        return self._single_flight.do(HTTPCache.key(url, params, headers), send, share_json)
+
     def _get(self, url, supported_versions, **queryparams):
         """
                 Handle authenticated GET requests
@@ -102,14 +296,13 @@ class OpenSensorsAPI():
         if self.version in supported_versions:
             url = urljoin(self.base_url, url)
             try:
-                response = requests.get(
-                    url, headers=self._headers, params=queryparams)
+                response = self._shared_get(url, headers=self._headers, params=queryparams)
 
                 return response
 
             except requests.exceptions.RequestException as e:
                 raise OSIOClientApiError(
-                    'Invalid API server response.\n%s' % response)
+                    'Invalid API server response.\n%s' % e)
 
         else:
             raise OSIOClientApiError(
@@ -133,13 +326,13 @@ class OpenSensorsAPI():
         if self.version in supported_versions:
             url = urljoin(self.base_url, url)
             try:
-                response = requests.get(url, params=queryparams)
+                response = self._shared_get(url, params=queryparams)
 
                 return response
 
             except requests.exceptions.RequestException as e:
                 raise OSIOClientApiError(
-                    'Invalid API server response.\n%s' % response)
+                    'Invalid API server response.\n%s' % e)
 
         else:
             raise OSIOClientApiError(
@@ -147,6 +340,38 @@ class OpenSensorsAPI():
 
         return None
 
+    def _get_history(self, url, supported_versions, **queryparams):
+        """
+                Handle authenticated GET requests for stored messages. Queries of a
+                closed time window are served from and stored in the page cache.
+
+                :param url: The url for the endpoint including path parameters
+                :type url: :py:class:`str`
+
+                :param supported_versions: list of supported versions through this API endpoint.
+                :type supported_versions: :py:class:`list`
+
+                :param queryparams: The query string parameters
+                :returns: The Reponse from the API
+                """
+        if self._page_cache is None or not self._page_cache.cacheable(queryparams):
+            return self._get(url, supported_versions, **queryparams)
+
+        key = self._page_cache.key(urljoin(self.base_url, url), queryparams, self.user_id)
+        response = self._page_cache.get(key)
+        if response is None:
+            response = self._get(url, supported_versions, **queryparams)
+            self._page_cache.put(key, response)
+        return response
+
+    def _stream_timeout(self):
+        """
+                :returns: (connect, read) timeout for streams, where the read timeout
+                        is the idle time after which a stream counts as stalled
+                """
+        connect = self.timeout[0] if isinstance(self.timeout, tuple) else self.timeout
+        return (connect, self.stream_idle_timeout)
+
     def _get_stream_data(self, url, supported_versions, **queryparams):
         """
                 Handle authenticated GET requests to get streams of data
@@ -165,19 +390,19 @@ class OpenSensorsAPI():
         if self.version in supported_versions:
             url = urljoin(self.realtime_base_url, url)
             try:
-                response = requests.get(
-                    url, headers=self._headers, params=queryparams, stream=True)
+                response = self._request(
+                    self._realtime_transport, 'GET', url, headers=self._headers, params=queryparams,
+                    stream=True, timeout=self._stream_timeout())
 
-                for line in response:
-                    print line
+                for line in response.iter_lines():
                     if line:
                         try:
-                            yield json.loads(line.decode('utf8'))
-                        except ValueError as e:
+                            yield codec.loads(line)
+                        except ValueError:
                             pass
             except requests.exceptions.RequestException as e:
                 raise OSIOClientApiError(
-                    'Invalid API server response.\n%s' % response)
+                    'Invalid API server response.\n%s' % e)
 
         else:
             raise OSIOClientApiError(
@@ -203,15 +428,22 @@ class OpenSensorsAPI():
             try:
                 # add key to parameters
                 queryparams['api-key'] = self.api_key
-                response = requests.get(
-                    url, headers=self._headers, params=queryparams, stream=True)
+                request = requests.Request('GET', url, params=queryparams).prepare()
+
+                def connect():
+                    if self._rate_limiter is not None:
+                        self._rate_limiter.acquire(url)
+                    return sseclient.SSEClient(request.url, session=self._realtime_transport.session,
+                                               timeout=self._stream_timeout())
 
-                for item in SSEClient(response.url):
-                    yield json.loads(str(item.data).encode('utf-8'))
+                client = self._retry.execute('GET', connect)
+
+                for item in client:
+                    yield codec.loads(item.data)
 
             except requests.exceptions.RequestException as e:
                 raise OSIOClientApiError(
-                    'Invalid API server response.\n%s' % response)
+                    'Invalid API server response.\n%s' % e)
 
         else:
             raise OSIOClientApiError(
@@ -237,17 +469,18 @@ class OpenSensorsAPI():
             try:
 
                 if data != None:
-                    response = requests.post(
-                        url, headers=self._headers, json=data)
+                    response = self._request(
+                        self._transport, 'POST', url, headers=self._headers, json=data)
 
                 else:
-                    response = requests.post(url, headers=self._headers)
+                    response = self._request(
+                        self._transport, 'POST', url, headers=self._headers)
 
                 return response
 
             except requests.exceptions.RequestException as e:
                 raise OSIOClientApiError(
-                    'Invalid API server response.\n%s' % response)
+                    'Invalid API server response.\n%s' % e)
         else:
             raise OSIOClientApiError(
                 'Version %s is not supported. \n' % self.version)
@@ -271,16 +504,17 @@ class OpenSensorsAPI():
             try:
 
                 if data != None:
-                    response = requests.delete(
-                        url, headers=self._headers, json=data)
+                    response = self._request(
+                        self._transport, 'DELETE', url, headers=self._headers, json=data)
                 else:
-                    response = requests.delete(url, headers=self._headers)
+                    response = self._request(
+                        self._transport, 'DELETE', url, headers=self._headers)
 
                 return response
 
             except requests.exceptions.RequestException as e:
                 raise OSIOClientApiError(
-                    'Invalid API server response.\n%s' % response)
+                    'Invalid API server response.\n%s' % e)
         else:
             raise OSIOClientApiError(
                 'Version %s is not supported. \n' % self.version)
@@ -305,12 +539,12 @@ class OpenSensorsAPI():
         if self.version in supported_versions:
             url = urljoin(self.base_url, url)
             try:
-                response = requests.patch(
-                    url, headers=self._headers, json=data)
+                response = self._request(
+                    self._transport, 'PATCH', url, headers=self._headers, json=data)
                 return response
             except requests.exceptions.RequestException as e:
                 raise OSIOClientApiError(
-                    'Invalid API server response.\n%s' % response)
+                    'Invalid API server response.\n%s' % e)
         else:
             raise OSIOClientApiError(
                 'Version %s is not supported. \n' % self.version)
@@ -336,7 +570,8 @@ class OpenSensorsAPI():
             url = urljoin(self.base_url, url)
             try:
 
-                response = requests.put(url, headers=self._headers, json=data)
+                response = self._request(
+                    self._transport, 'PUT', url, headers=self._headers, json=data)
 
                 return response
 
@@ -347,7 +582,7 @@ class OpenSensorsAPI():
 
             except requests.exceptions.RequestException as e:
                 raise OSIOClientApiError(
-                    'Invalid API server response.\n%s' % response.text)
+                    'Invalid API server response.\n%s' % e)
         else:
             raise OSIOClientApiError(
                 'Version %s is not supported. \n' % self.version)
@@ -359,47 +594,117 @@ class OpenSensorsAPI():
                 :returns: The json file
                 """
         if response.status_code in [200, 204, 422, 500]:
-            return response.json()
+            return codec.decode_response(response)
         else:
             return None
 
     # ---------------------------------------- #
-    # OpenSensors REST API
-    # api.opensensors.io
-    # ---------------------------------------- #
-
-    # ---------------------------------------- #
-    # [v2] datasets : Datasets operations
+    # Batch helpers
     # ---------------------------------------- #
 
-    def get_dataset_meta(self, dataset_id):
+    def fan_out(self, endpoint, argsets, max_workers=DEFAULT_FAN_OUT_WORKERS, ordered=False):
         """
-                Get dataset metadata
-                GET /v2/datasets/{dataset-id}
+                Call an endpoint for many argument sets with bounded concurrency.
+                Results are yielded as they complete (or in input order when
+                ``ordered`` is set); a failing call does not stop the others, its
+                exception is returned in the ``error`` field of its result.
 
-                :param dataset_id: The unique id for the dataset.
-                :type dataset_id: :py:class:`str`
+                Keep ``max_workers`` at or below the transport ``pool_maxsize`` so
+                that every worker reuses a pooled connection. Calls run under the
+                deadline active when ``fan_out`` is called.
 
-                :returns: The JSON output from the API or an error message
+                    for item in osio_client.fan_out('get_topic_meta', topics):
+                        if item.ok:
+                            refresh(item.args, item.result)
+
+                :param endpoint: Name of an endpoint method, or a callable
+                :type endpoint: :py:class:`str`
+
+                :param argsets: Iterable of argument sets: a tuple of positional
+                        arguments, a dict of keyword arguments or a single argument
+
+                :param max_workers: Number of concurrent calls
+                :type max_workers: :py:class:`int`
+
+                :param ordered: Yield results in input order
+                :type ordered: :py:class:`bool`
+
+                :returns: A generator of :py:class:`pyosio.fanout.FanOutResult`
                 """
-        url = "/{}/datasets/{}".format(self.version, dataset_id)
-        response = self._get(url, ["v2"])
+        fn = endpoint if callable(endpoint) else getattr(self, endpoint)
+        deadline = current_deadline()
+        if deadline is not None:
+            fn = deadline.wrap(fn)
+        return fan_out(fn, argsets, max_workers=max_workers, ordered=ordered)
 
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
+    # ---------------------------------------- #
+    # OpenSensors REST API
+    # api.opensensors.io
+    #
+    # Endpoints are declared in pyosio.endpoints and installed on the class;
+    # only those with custom logic are written out below.
+    # ---------------------------------------- #
 
-    def get_pub_dataset_meta(self, dataset_id):
+    def _call(self, endpoint, args, queryparams=None, data=None):
         """
-                Get public dataset information [NO-AUTH]
-                GET /v2/public/datasets/{dataset-id}
+                Call a registered endpoint: serve it from the metadata cache, send it
+                through its handler, convert the response and invalidate the cached
+                results it makes stale
 
-                :param dataset_id: The unique id for the dataset.
-                :type dataset_id: :py:class:`str`
+                :param endpoint: Registered endpoint
+                :type endpoint: :py:class:`pyosio.endpoints.Endpoint`
 
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/datasets/{}".format(self.version, dataset_id)
-        response = self._get(url, ["v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
+                :param args: Path arguments, in path order
+                :type args: :py:class:`tuple`
+
+                :param queryparams: The query string parameters
+                :type queryparams: :py:class:`dict`
+
+                :param data: The request body
+                :type data: :py:class:`dict`
+
+                :returns: The result of the endpoint
+                """
+        url = endpoint.url(self.version, args)
+        handler = getattr(self, endpoint.handler)
+        # A pyosio.query.MessageQuery with client-side filters selects the
+        # messages of the page.
+        select = queryparams.select if getattr(queryparams, 'filtered', False) else None
+        if select is not None and endpoint.handler != '_get_history':
+            raise OSIOClientError('%s does not return messages to filter.' % endpoint.name)
+
+        cache = self._metadata_cache
+        if cache is not None:
+            # Cache keys hold the method arguments in signature order.
+            arguments = args + ((data,) if endpoint.body else ()) + \
+                ((queryparams,) if endpoint.query else ())
+            if endpoint.cache:
+                hit, value = cache.get(endpoint.name, arguments, self.version)
+                if hit:
+                    return value
+
+        try:
+            if endpoint.write:
+                response = handler(url, endpoint.versions, data)
+            else:
+                response = handler(url, endpoint.versions, **(queryparams or {}))
+        finally:
+            if cache is not None:
+                for name, n in endpoint.invalidates:
+                    cache.invalidate(name, arguments[:n])
+
+        if endpoint.result == 'ok':
+            return response.status_code in (200, 204, 422)
+        if endpoint.result == 'text':
+            return response.text if response else response
+        value = self._get_json(response)
+        if select is not None and isinstance(value, dict) and isinstance(value.get('messages'), list):
+            value = dict(value, messages=select(value['messages']))
+        # Error bodies (422, 500) are decoded too, but must not be served from the cache.
+        if cache is not None and endpoint.cache and value is not None and \
+                200 <= response.status_code < 300:
+            cache.put(endpoint.name, arguments, value, self.version)
+        return value
 
     # ---------------------------------------- #
     # [v1/v2] login : Login and retreive a JWT
@@ -418,7 +723,7 @@ class OpenSensorsAPI():
         if self.version == "v1":
             return {"username": response}
         else:
-            return json.JSONDecoder().decode(response)
+            return codec.loads(response)
 
     def login(self, user_id, password=None):
         """
@@ -434,6 +739,7 @@ class OpenSensorsAPI():
                 :returns: The JSON output from the API or an error message
                 """
         if not password:
+            import getpass
             password = getpass.getpass(
                 "Enter your password to login into OpenSensorIO: ")  # use getpass to get passwd without echoing it back
 
@@ -441,1350 +747,302 @@ class OpenSensorsAPI():
         url = "/{}/login".format(self.version)
         response = self._post(url, ["v1", "v2"], data=credentials_input)
         if self.version == "v1":
-            return response.json()
+            return codec.decode_response(response)
         else:
-            return response.json()
+            return codec.decode_response(response)
 
     # ---------------------------------------- #
     # [v1/v2] messages : Stored messages
     # ---------------------------------------- #
 
-    def get_device_msgs(self, client_id, queryparams={}):
+    def _paginate(self, name, args, start_date, end_date, queryparams, cursor, pages, prefetch=0,
+                  prefetch_bytes=Paginator.DEFAULT_PREFETCH_BYTES):
+        """
+                :returns: A :py:class:`pyosio.pagination.Paginator` over a message endpoint
+                """
+        endpoint = REGISTRY[name]
+        if isinstance(cursor, dict):
+            cursor = Cursor.from_dict(cursor)
+        if cursor is None:
+            params = dict(queryparams or {})
+            if start_date is not None:
+                params['start-date'] = format_date(start_date)
+            if end_date is not None:
+                params['end-date'] = format_date(end_date)
+            cursor = Cursor(endpoint.url(self.version, args), params)
+        handler = getattr(self, endpoint.handler)
+
+        def fetch(url, params):
+            return handler(url, endpoint.versions, **params)
+
+        # A pyosio.query.MessageQuery with client-side filters selects the
+        # messages of every page.
+        select = queryparams.select if getattr(queryparams, 'filtered', False) else None
+        return Paginator(fetch, cursor, pages, prefetch, prefetch_bytes, select)
+
+    def iter_device_msgs(self, client_id, start_date=None, end_date=None, queryparams=None,
+                         cursor=None, pages=False, prefetch=0,
+                         prefetch_bytes=Paginator.DEFAULT_PREFETCH_BYTES):
         """
-                Get messages for a given device
+                Iterate over all messages of a device, following pagination
                 GET /v1/messages/device/{client-id}
 
                 :param client_id: The unique id for the device.
                 :type client_id: :py:class:`str`
 
-                :param queryparams: The query string parameters
-                queryparams = { user-id: string,
-                                                radius: long,
-                                                postcode: string,
-                                                tags: string,
-                                                end-date: string,
-                                                zip: string,
-                                                lat: double,
-                                                start-date: string,
-                                                elevation: double,
-                                                lon: double,
-                                                dur: double }
+                :param start_date: Oldest message, as datetime, date, epoch seconds or ISO 8601
+                :param end_date: Newest message, as datetime, date, epoch seconds or ISO 8601
 
-                :returns: The JSON output from the API or an error message
+                :param queryparams: Other query string parameters, see :py:meth:`get_device_msgs`
+                :type queryparams: :py:class:`dict`
+
+                :param cursor: Resume from the cursor of an earlier iteration
+                :type cursor: :py:class:`pyosio.pagination.Cursor` or :py:class:`dict`
+
+                :param pages: Yield the message list of each page instead of messages
+                :type pages: :py:class:`bool`
+
+                :param prefetch: Number of pages fetched ahead on a background thread
+                        while the caller processes the current one
+                :type prefetch: :py:class:`int`
+
+                :param prefetch_bytes: Budget for the response bodies fetched ahead
+                :type prefetch_bytes: :py:class:`int`
+
+                :returns: A :py:class:`pyosio.pagination.Paginator`
                 """
-        url = "/{}/messages/device/{}".format(self.version, client_id)
-        response = self._get(url, ["v1"], **queryparams)
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
+        return self._paginate('get_device_msgs', (client_id,), start_date, end_date, queryparams,
+                              cursor, pages, prefetch, prefetch_bytes)
 
-    def get_topic_msgs(self, topic, queryparams={}):
+    def iter_topic_msgs(self, topic, start_date=None, end_date=None, queryparams=None,
+                        cursor=None, pages=False, prefetch=0,
+                        prefetch_bytes=Paginator.DEFAULT_PREFETCH_BYTES):
         """
-                Get messages for a given topic
+                Iterate over all messages of a topic, following pagination
                 GET /v1/messages/topic/{topic}
 
                 :param topic: The unique id for the interest topic.
                 :type topic: :py:class:`str`
 
-                :param queryparams: The query string parameters
-                queryparams = { user-id: string,
-                                                radius: long,
-                                                postcode: string,
-                                                tags: string,
-                                                end-date: string,
-                                                zip: string,
-                                                lat: double,
-                                                start-date: string,
-                                                elevation: double,
-                                                lon: double,
-                                                dur: double }
+                See :py:meth:`iter_device_msgs` for the other parameters.
 
-                :returns: The JSON output from the API or an error message
+                :returns: A :py:class:`pyosio.pagination.Paginator`
                 """
-        url = "/{}/messages/topic/{}".format(self.version, topic)
-        response = self._get(url, ["v1"], **queryparams)
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
+        return self._paginate('get_topic_msgs', (topic,), start_date, end_date, queryparams,
+                              cursor, pages, prefetch, prefetch_bytes)
 
-    def get_user_msgs(self, user_id, queryparams={}):
+    def iter_user_msgs(self, user_id, start_date=None, end_date=None, queryparams=None,
+                       cursor=None, pages=False, prefetch=0,
+                       prefetch_bytes=Paginator.DEFAULT_PREFETCH_BYTES):
         """
-                Get messages for a given user
+                Iterate over all messages of a user, following pagination
                 GET /v1/messages/user/{user-id}
 
                 :param user_id: User id
                 :type user_id: :py:class:`str`
 
-                :param queryparams: The query string parameters
-                queryparams = { user-id: string,
-                                                radius: long,
-                                                postcode: string,
-                                                tags: string,
-                                                end-date: string,
-                                                zip: string,
-                                                lat: double,
-                                                start-date: string,
-                                                elevation: double,
-                                                lon: double,
-                                                dur: double }
+                See :py:meth:`iter_device_msgs` for the other parameters.
 
-                :returns: The JSON output from the API or an error message
+                :returns: A :py:class:`pyosio.pagination.Paginator`
                 """
-        url = "/{}/messages/user/{}".format(self.version, user_id)
-        response = self._get(url, ["v1"], **queryparams)
-
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
+        return self._paginate('get_user_msgs', (user_id,), start_date, end_date, queryparams,
+                              cursor, pages, prefetch, prefetch_bytes)
 
-    def get_pub_dataset_msgs(self, dataset_id, queryparams={}):
+    def iter_pub_dataset_msgs(self, dataset_id, start_date=None, end_date=None, queryparams=None,
+                              cursor=None, pages=False, prefetch=0,
+                              prefetch_bytes=Paginator.DEFAULT_PREFETCH_BYTES):
         """
-                Get messages for a given public dataset [NO-AUTH]
+                Iterate over all messages of a public dataset, following pagination [NO-AUTH]
                 GET /v2/public/messages/dataset/{dataset-id}
 
                 :param dataset_id: The unique id for the dataset.
                 :type dataset_id: :py:class:`str`
 
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/messages/dataset/{}".format(self.version, dataset_id)
-        response = self._get(url, ["v1", "v2"], **queryparams)
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_bulk_pub_dataset_msgs(self, dataset_msgs_bulk_input):
-        """
-                Get messages for a given public dataset [NO-AUTH]
-                POST /v2/public/messages/dataset/bulk
-
-                :param dataset_msgs_bulk_input: bulk input
-                :type dataset_msgs_bulk_input: :py:class:`dict`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/messages/dataset/{}".format(self.version, bulk)
-        response = self._post(url, ["v2"], dataset_msgs_bulk_input)
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    # ---------------------------------------- #
-    # [v1/v2] users : User operations
-    # ---------------------------------------- #
-
-    def get_pub_user_meta(self, user_id):
-        """
-                Get public user metadata including topics [NO-AUTH]
-                GET /v1/public/users/{user-id}
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/public/users/{}".format(self.version, user_id)
-        response = self._get_pub(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def update_user_meta(self, user_id, data):
-        """
-                Update user metadata
-                PUT /v1/users/{user-id}
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                param data: metadata
-                :type data: :py:class:`dict`
-                data = {
-                          "name": "string*",
-                          "email": "string*",
-                          "password": "string*"
-                        }
-
-                :returns: The JSON output from the API or an error message
-                """
-
-        url = "/{}/users/{}".format(self.version, user_id)
-        response = self._put(url, ["v1"], data)
-        return True if response.status_code in [200, 204, 422] else False
-
-    def get_user_meta(self, user_id):
-        """
-                Get user metadata
-                GET /v1/users/{user-id}
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
+                See :py:meth:`iter_device_msgs` for the other parameters.
 
-                :returns: The JSON output from the API or an error message
+                :returns: A :py:class:`pyosio.pagination.Paginator`
                 """
-        url = "/{}/users/{}".format(self.version, user_id)
-        response = self._get(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
+        return self._paginate('get_pub_dataset_msgs', (dataset_id,), start_date, end_date,
+                              queryparams, cursor, pages, prefetch, prefetch_bytes)
 
-    def get_api_key(self, user_id):
+    def _backfill(self, name, args, start_date, end_date, queryparams, max_workers, shard_seconds,
+                  target_messages):
         """
-                Get API key
-                GET /v1/users/{user-id}/api-key
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
+                :returns: A generator of the messages of a message endpoint, see
+                        :py:meth:`backfill_topic_msgs`
                 """
-        url = "/{}/users/{}/api-key".format(self.version, user_id)
-        response = self._get(url, ["v1"])
-        return response.text if response else response
-
-    def generate_api_key(self, user_id):
-        """
-                Generate a new API key
-                POST /v1/users/{user-id}/api-key
+        start = epoch(start_date)
+        end = epoch(end_date, time.time())
+        if shard_seconds is None:
+            shard_seconds = (end - start) / (self.DEFAULT_BACKFILL_SHARDS * max(1, max_workers))
+        planner = ShardPlanner(start, end, shard_seconds, target_messages)
 
-                :param user_id: User id
-                :type user_id: :py:class:`str`
+        def fetch(start_date, end_date):
+            return self._paginate(name, args, start_date, end_date, queryparams, None, False)
 
-                :returns: The JSON output from the API or an error message
-                """
+        def fan_out(fn, shards):
+            return self.fan_out(fn, shards, max_workers=max_workers, ordered=True)
 
-        url = "/{}/users/{}/api-key".format(self.version, user_id)
-        response = self._post(url, ["v1"])
-        return response.text if response else response
+        return backfill(fetch, planner, fan_out)
 
-    def bookmark_topic(self, user_id, topic):
+    def backfill_topic_msgs(self, topic, start_date, end_date=None, queryparams=None,
+                            max_workers=DEFAULT_FAN_OUT_WORKERS, shard_seconds=None,
+                            target_messages=ShardPlanner.DEFAULT_TARGET_MESSAGES):
         """
-                Create a bookmark for a given user and topic
-                PUT /v1/users/{user-id}/bookmark/{topic}
+                Download the messages of a topic over a long time range with
+                concurrent requests, yielding them in date order
+                GET /v1/messages/topic/{topic}
 
-                :param user_id: User id
-                :type user_id: :py:class:`str`
+                The range is split into time shards fetched by ``max_workers``
+                threads; shards are resized from the message density seen so far
+                so that each holds about ``target_messages``.
 
                 :param topic: The unique id for the interest topic.
                 :type topic: :py:class:`str`
 
-                :returns: The JSON output from the API or an error message
-                """
-
-        url = "/{}/users/{}/bookmark/{}".format(self.version, user_id, topic)
-        response = self._put(url, ["v1"])
-
-        return True if response.status_code in [200, 204, 422] else False
-
-    def delete_bookmarked_topic(self, user_id, topic):
-        """
-                Delete a bookmark for a given user and topic
-                DELETE /v1/users/{user-id}/bookmark/{topic}
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
+                :param start_date: Oldest message, as datetime, date, epoch seconds or ISO 8601
+                :param end_date: End of the range (excluded), now when omitted
 
-                :param topic: The unique id for the interest topic.
-                :type topic: :py:class:`str`
+                :param queryparams: Other query string parameters, see :py:meth:`get_topic_msgs`
+                :type queryparams: :py:class:`dict`
 
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/bookmark/{}".format(self.version, user_id, topic)
-        response = self._delete(url, ["v1"])
-        return True if response.status_code in [200, 204, 422] else False
+                :param max_workers: Number of shards fetched concurrently
+                :type max_workers: :py:class:`int`
 
-    def get_user_bookmarks(self, user_id):
-        """
-                Get bookmarks associated with a user
-                GET /v1/users/{user-id}/bookmarks
+                :param shard_seconds: Length of the first shards, by default the
+                        range split into four shards per worker
+                :type shard_seconds: :py:class:`int`
 
-                :param user_id: User id
-                :type user_id: :py:class:`str`
+                :param target_messages: Number of messages a shard should hold
+                :type target_messages: :py:class:`int`
 
-                :returns: The JSON output from the API or an error message
+                :returns: A generator of messages
                 """
-        url = "/{}/users/{}/bookmarks".format(self.version, user_id)
-        response = self._get(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
+        return self._backfill('get_topic_msgs', (topic,), start_date, end_date, queryparams,
+                              max_workers, shard_seconds, target_messages)
 
-    def get_user_bookmarks_followers(self, user_id):
+    def backfill_device_msgs(self, client_id, start_date, end_date=None, queryparams=None,
+                             max_workers=DEFAULT_FAN_OUT_WORKERS, shard_seconds=None,
+                             target_messages=ShardPlanner.DEFAULT_TARGET_MESSAGES):
         """
-                Get users that bookmarked any of a given users topics
-                GET /v1/users/{user-id}/bookmarks/followers
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
+                Download the messages of a device over a long time range with
+                concurrent requests, see :py:meth:`backfill_topic_msgs`
+                GET /v1/messages/device/{client-id}
 
-                :returns: The JSON output from the API or an error message
+                :returns: A generator of messages
                 """
-        url = "/{}/users/{}/bookmarks/followers".format(self.version, user_id)
-        response = self._get(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
+        return self._backfill('get_device_msgs', (client_id,), start_date, end_date, queryparams,
+                              max_workers, shard_seconds, target_messages)
 
-    def link_device_user(self, user_id, client_id):
+    def backfill_user_msgs(self, user_id, start_date, end_date=None, queryparams=None,
+                           max_workers=DEFAULT_FAN_OUT_WORKERS, shard_seconds=None,
+                           target_messages=ShardPlanner.DEFAULT_TARGET_MESSAGES):
         """
-                Associate a device with a user, user joins the device creator s organisation
-                PUT /v1/users/{user-id}/claim-device/{client-id}
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                :param client_id: The unique id for the device.
-                :type client_id: :py:class:`str`
+                Download the messages of a user over a long time range with
+                concurrent requests, see :py:meth:`backfill_topic_msgs`
+                GET /v1/messages/user/{user-id}
 
-                :returns: The JSON output from the API or an error message
+                :returns: A generator of messages
                 """
-        url = "/{}/users/{}/claim-device/{}".format(
-            self.version, user_id, client_id)
-        response = self._put(url, ["v1"])
-        return True if response.status_code in [200, 204, 422] else False
+        return self._backfill('get_user_msgs', (user_id,), start_date, end_date, queryparams,
+                              max_workers, shard_seconds, target_messages)
 
-    def get_user_device_errors(self, user_id):
+    def iter_bulk_pub_dataset_msgs(self, dataset_ids, start_date=None, end_date=None, queryparams=None,
+                                   max_workers=DEFAULT_FAN_OUT_WORKERS,
+                                   chunk_size=ChunkPlanner.DEFAULT_CHUNK_SIZE,
+                                   target_bytes=ChunkPlanner.DEFAULT_TARGET_BYTES):
         """
-                Retrieve device errors for a given user
-                GET /v1/users/{user-id}/device-errors
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
+                Get the messages of many public datasets [NO-AUTH] through
+                concurrent bulk requests of ``chunk_size`` datasets or so. Chunks
+                are resized to get responses of about ``target_bytes``, and split
+                when the server finds them too large. Requires version v2.
+                POST /v2/public/messages/dataset/bulk
 
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/device-errors".format(self.version, user_id)
-        response = self._get(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
+                    for dataset_id, messages in osio_client.iter_bulk_pub_dataset_msgs(ids):
+                        store(dataset_id, messages)
 
-    def set_device(self, user_id, create_device_input):
-        """
-                Create a new device for a user
-                POST /v1/users/{user-id}/devices
+                :param dataset_ids: Public dataset ids, any number
+                :type dataset_ids: :py:class:`list`
 
-                :param user_id: User id
-                :type user_id: :py:class:`str`
+                :param start_date: Oldest message, as datetime, date, epoch seconds or ISO 8601
+                :param end_date: Newest message
 
-                param create_device_input: device metadata
-                :type create_device_input: :py:class:`dict`
-
-                create_device_input = {
-                        "description": "string",
-                        "tags": [
-                                "string"
-                        ],
-                        "locked-password": true,
-                        "client-id": "string",
-                        "password": "string",
-                        "name": "string",
-                        "org-id": "string",
-                        "batch": "string",
-                        "device-type": "string",
-                        "location": {
-                                "lat": 0,
-                                "lon": 0,
-                                "elevation": 0,
-                                "zip": "string",
-                                "postcode": "string"
-                        }
-                }
+                :param queryparams: Other parameters of the bulk request, or a
+                        :py:class:`pyosio.query.MessageQuery` whose client-side
+                        filters select the messages of every dataset
+                :type queryparams: :py:class:`dict`
 
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/devices".format(self.version, user_id)
-        response = self._post(url, ["v1"], create_device_input)
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
+                :param max_workers: Number of concurrent requests
+                :type max_workers: :py:class:`int`
 
-    def get_user_devices(self, user_id):
-        """
-                Get devices associated with a user
-                GET /v1/users/{user-id}/devices
+                :param chunk_size: Dataset ids of the first requests
+                :type chunk_size: :py:class:`int`
 
-                :param user_id: User id
-                :type user_id: :py:class:`str`
+                :param target_bytes: Response size a request should have
+                :type target_bytes: :py:class:`int`
 
-                :returns: The JSON output from the API or an error message
+                :returns: A generator of ``(dataset_id, messages)`` pairs, in order of completion
                 """
-        url = "/{}/users/{}/devices".format(self.version, user_id)
-        response = self._get(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
+        endpoint = REGISTRY['get_bulk_pub_dataset_msgs']
+        params = dict(queryparams or {})
+        if start_date is not None:
+            params['start-date'] = format_date(start_date)
+        if end_date is not None:
+            params['end-date'] = format_date(end_date)
+        planner = ChunkPlanner(dataset_ids, chunk_size, target_bytes=target_bytes, workers=max_workers)
 
-    def get_device_meta(self, user_id, client_id, queryparams):
-        """
-                Get device metadata
-                GET /v1/users/{user-id}/devices/{client-id}
-
-                :param client_id: The unique id for the device.
-                :type client_id: :py:class:`str`
+        def fetch(ids):
+            return self._post(endpoint.url(self.version, ()), endpoint.versions, bulk_input(ids, params))
 
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                :param queryparams: The query string parameters
+        def fan_out(fn, chunks):
+            return self.fan_out(fn, chunks, max_workers=max_workers)
 
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/devices/{}".format(
-            self.version, user_id, client_id)
+        results = bulk_fetch(fetch, planner, fan_out)
+        if getattr(queryparams, 'filtered', False):
+            results = ((dataset_id, queryparams.select(messages)) for dataset_id, messages in results)
+        return results
 
-        response = self._get(url, ["v1"], **queryparams)
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
+    # ---------------------------------------- #
+    # DataFrames
+    # Message history: iter_*_msgs(...).to_dataframe() or .dataframes()
+    # ---------------------------------------- #
 
-    def delete_device(self, user_id, client_id):
+    def get_user_devices_info_dataframe(self, user_id, queryparams=None, chunk_size=None):
         """
-                Delete a device
-                DELETE /v1/users/{user-id}/devices/{client-id}
-
-                :param client_id: The unique id for the device.
-                :type client_id: :py:class:`str`
+                Information about the devices of a user as a DataFrame, see
+                :py:meth:`get_user_devices_info` and :py:func:`pyosio.frames.records_frame`.
+                Requires pandas.
 
                 :param user_id: User id
                 :type user_id: :py:class:`str`
 
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/devices/{}".format(
-            self.version, user_id, client_id)
-        response = self._delete(url, ["v1"])
-        return True if response.status_code in [200, 204, 422] else False
-
-    def update_device_meta(self, user_id, client_id, update_device_input):
-        """
-                Update device metadata
-                PUT /v1/users/{user-id}/devices/{client-id}
-
-                :param client_id: The unique id for the device.
-                :type client_id: :py:class:`str`
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
+                :param queryparams: The query string parameters
+                :type queryparams: :py:class:`dict`
 
-                param update_device_input: device metadata
-                :type update_device_input: :py:class:`dict`
-
-                update_device_input = {
-                        "name": "string",
-                        "description": "string",
-                        "batch": "string",
-                        "device-type": "string",
-                        "location": {
-                                "lat": 0,
-                                "lon": 0,
-                                "elevation": 0,
-                                "zip": "string",
-                                "postcode": "string"
-                        },
-                        "tags": [
-                                "string"
-                        ]
-                }
+                :param chunk_size: Records encoded at a time
+                :type chunk_size: :py:class:`int`
 
-                :returns: The JSON output from the API or an error message
+                :returns: A :py:class:`pandas.DataFrame`
                 """
-        url = "/{}/users/{}/devices/{}".format(
-            self.version, user_id, client_id)
-        response = self._put(url, ["v1"], update_device_input)
-
-        return True if response.status_code in [200, 204, 422] else False
+        from .frames import records_frame, inventory, DEFAULT_CHUNK_SIZE
+        result = self.get_user_devices_info(user_id, queryparams)
+        return records_frame(inventory(result), chunk_size or DEFAULT_CHUNK_SIZE)
 
-    def reset_device_passw(self, user_id, client_id):
+    def get_org_devices_dataframe(self, org_id, chunk_size=None):
         """
-                Generate a new password for a device
-                POST /v1/users/{user-id}/devices/{client-id}/reset-password
+                The devices of an organisation as a DataFrame, see
+                :py:meth:`get_org_devices` and :py:func:`pyosio.frames.records_frame`.
+                Requires pandas.
 
-                :param user_id: User id
-                :type user_id: :py:class:`str`
+                :param org_id: The unique id for the organization.
+                :type org_id: :py:class:`str`
 
-                :param client_id: The unique id for the device.
-                :type client_id: :py:class:`str`
+                :param chunk_size: Records encoded at a time
+                :type chunk_size: :py:class:`int`
 
-                :returns: The JSON output from the API or an error message
+                :returns: A :py:class:`pandas.DataFrame`
                 """
-        url = "/{}/users/{}/devices/{}/reset-password".format(
-            self.version, user_id, client_id)
-        response = self._post(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_user_devices_info(self, user_id, queryparams={}):
-        """
-                Get information about the values of multiple devices with one call
-                GET /v1/users/{user-id}/devices/bulk
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
+        from .frames import records_frame, inventory, DEFAULT_CHUNK_SIZE
+        result = self.get_org_devices(org_id)
+        return records_frame(inventory(result), chunk_size or DEFAULT_CHUNK_SIZE)
 
-                :param queryparams: The query string parameters
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/devices/bulk".format(self.version, user_id)
-        response = self._get(url, ["v1"], **queryparams)
-
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def delete_user_devices(self, user_id, device_del):
-        """
-                Delete devices in bulk (all in one transaction)
-                DELETE /v1/users/{user-id}/devices/bulk
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                param device: device meta
-                :type device: :py:class:`dict`
-
-
-                device = [
-                  {
-                        "client-id": "string"
-                  }
-                ]
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/devices/bulk".format(self.version, user_id)
-        response = self._delete(url, ["v1"], device_del)
-        return True if response.status_code in [200, 204, 422] else False
-
-    def update_user_bulk_devices(self, user_id, bulk_update_params_input):
-        """
-                Update the description, tags and location of multiple devices with one call]
-                PUT /v1/users/{user-id}/devices/bulk
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                param bulk_update_params_input: metadata
-                :type bulk_update_params_input: :py:class:`dict`
-
-                bulk_update_params_input = {
-                  "all-devices": true,
-                  "devices": [
-                        "string"
-                  ],
-                  "values": {
-                        "description": "string",
-                        "description-various": true,
-                        "tags": [
-                          "string"
-                        ],
-                        "tags-various": true,
-                        "location": {
-                          "lat": 0,
-                          "lon": 0
-                        },
-                        "location-various": true
-                  }
-                }
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/devices/bulk".format(self.version, user_id)
-        response = self._put(url, ["v1"], bulk_update_params_input)
-        return True if response.status_code in [200, 204, 422] else False
-
-    def set_user_bulk_devices(self, user_id, new_device):
-        """
-                Create new devices in bulk (all in one transaction)
-                POST /v1/users/{user-id}/devices/bulk
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                param new_device: metadata
-                :type new_device: :py:class:`dict`
-
-                new_device = [
-                        {
-                                "description": "string",
-                                "tags": [
-                                  "string"
-                                ],
-                                "locked-password": true,
-                                "client-id": "string",
-                                "password": "string",
-                                "name": "string",
-                                "org-id": "string",
-                                "batch": "string",
-                                "device-type": "string",
-                                "location": {
-                                  "lat": 0,
-                                  "lon": 0,
-                                  "elevation": 0,
-                                  "zip": "string",
-                                  "postcode": "string"
-                                }
-                        }
-                ]
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/devices/bulk".format(self.version, user_id)
-        response = self._post(url, ["v1"], new_device)
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_user_org_invits(self, user_id):
-        """
-                Get pending org invitations for a user
-                GET /v1/users/{user-id}/invitations
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/invitations".format(self.version, user_id)
-        response = self._get(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_user_orgs(self, user_id):
-        """"
-                Get organisations a user is member of
-                GET /v1/users/{user-id}/orgs
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/orgs".format(self.version, user_id)
-        response = self._get(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def delete_user_org(self, user_id, org_id):
-        """
-                Leave an organisation (stop being a member)
-                DELETE /v1/users/{user-id}/orgs/{org-id}
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/orgs/{}".format(self.version, user_id, org_id)
-        response = self._delete(url, ["v1"])
-        return True if response.status_code in [200, 204, 422] else False
-
-    def get_user_owned_orgs(self, user_id):
-        """
-                Get organisations a user owns
-                GET /v1/users/{user-id}/owned-orgs
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/owned-orgs".format(self.version, user_id)
-        response = self._get(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_user_topics(self, user_id):
-        """
-                Get topics associated with a user
-                GET /v1/users/{user-id}/topics
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/topics".format(self.version, user_id)
-        response = self._get(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_user_stats(self, user_id):
-        """
-                Retrieve usage stats for a given user
-                GET /v1/users/{user-id}/usage-stats
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/usage-stats".format(self.version, user_id)
-        response = self._get(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_user_datasets(self, user_id):
-        """
-                Get datasets associated with a user
-                GET /v2/users/{user-id}/datasets
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/datasets".format(self.version, user_id)
-        response = self._get(url, ["v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_user_devices(self, user_id):
-        """
-                Get devices associated with a user
-                GET /v2/users/{user-id}/devices
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/devices".format(self.version, user_id)
-        response = self._get(url, ["v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_user_topics(self, user_id):
-        """
-                Get topics associated with a user
-                GET /v2/users/{user-id}/topics
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/topics".format(self.version, user_id)
-        response = self._get(url, ["v2", "v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def delete_user_bulk_topics(self, user_id):
-        """
-                Bulk delete topics by ids
-                DELETE /v2/users/{user-id}/topics/bulk
-
-                :param user_id: User id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/users/{}/topics/bulk".format(self.version, user_id)
-        response = self._get(url, ["v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    # ---------------------------------------- #
-    # [v1/v2] topics : Topic operations
-    # ---------------------------------------- #
-
-    def get_pub_topic_info(self, topic):
-        """
-                Get public topic information [NO-AUTH]
-                GET /v1/public/topics/{topic}
-
-                :param topic: The unique id for the interest topic.
-                :type topic: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/public/topics/{}".format(self.version, topic)
-        response = self._get(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def search_pub_topic_info(self, topic):
-        """
-                Search for public topics [NO-AUTH]
-                GET /v1/search/topics/{term}
-
-                :param topic: The unique id for the interest topic.
-                :type topic: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/search/topics/{}".format(self.version, topic)
-        response = self._get(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def set_topic(self, new_topic_input):
-        """
-                Create a topic
-                POST /v*/topics
-
-                create_topic_input {
-                  "topic": "string",
-                  "name": "string",
-                  "description": "string",
-                  "public": true,
-                  "topic-info": {
-                        "format": "string"
-                  },
-                  "schema-id": 0,
-                  "rollups-enabled": true
-                }
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/topics".format(self.version)
-        response = self._post(url, ["v1"], new_topic_input)
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def delete_topic(self, topic):
-        """
-                Delete a topic
-                DELETE /v1/topics/{topic}
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/topics/{}".format(self.version, topic)
-        response = self._delete(url, ["v1"])
-        return True if response.status_code in [200, 204, 422] else False
-
-    def get_topic_meta(self, topic):
-        """
-                Get topic metadata
-                GET /v1/topics/{topic}
-
-                :param topic: The unique id for the interest topic.
-                :type topic: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/topics/{}".format(self.version, topic)
-        response = self._get(url, ["v1"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def update_topic_meta(self, topic, topic_input):
-        """
-                Update topic metadata
-                PUT /v*/topics/{topic}
-
-                :param topic: The unique id for the interest topic.
-                :type topic: :py:class:`str`
-
-                {
-                  "name": "string",
-                  "topic-info": {
-                        "format": "string"
-                  },
-                  "description": "string",
-                  "public": true,
-                  "rollups-enabled": true,
-                  "schema-id": 0
-                }
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/topics/{}".format(self.version, topic)
-        response = self._put(url, ["v1", "v2"], topic_input)
-        return True if response.status_code in [200, 204, 422] else False
-
-    # ---------------------------------------- #
-    # [v1/v2] orgs : Organisation operations
-    # ---------------------------------------- #
-
-    def create_org(self, create_org_input):
-        """
-                Create an organisation
-                POST /v1/orgs
-
-                {
-                  "id": "string",
-                  "name": "string",
-                  "website": "string",
-                  "description": "string",
-                  "email": "string"
-                }
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs".format(self.version)
-        response = self._post(url, ["v1", "v2"], create_org_input)
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def update_org(self, org_id):
-        """
-                Update organisation metadata
-                PUT /v1/orgs/{org-id}
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}".format(self.version, org_id)
-        response = self._put(url, ["v1", "v2"], create_org_input)
-        return True if response.status_code in [200, 204, 422] else False
-
-    def delete_org(self, org_id):
-        """
-                Delete an organisation. Be careful! This is will also delete devices and topics
-                DELETE /v1/orgs/{org-id}
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-
-        url = "/{}/orgs/{}".format(self.version, org_id)
-        response = self._delete(url, ["v1", "v2"])
-        return True if response.status_code in [200, 204, 422] else False
-
-    def get_org_meta(self, org_id):
-        """
-                Get organisation metadata
-                GET /v1/orgs/{org-id}
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}".format(self.version, org_id)
-        response = self._get(url, ["v1", "v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def accept_org_invit(self, org_id, tokens):
-        """
-                Accept an organisation invitation
-                PUT /v1/orgs/{org-id}/confirm-membership/{token}
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}/confirm-membership/{}".format(
-            self.version, org_id, tokens)
-        response = self._get(url, ["v1", "v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_org_devices(self, org_id):
-        """
-                Get devices associated with an organisation
-                GET /v1/orgs/{org-id}/devices
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}/devices".format(self.version, org_id)
-        response = self._get(url, ["v1", "v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_filtered_org_devices(self, org_id, d_batch, d_type):
-        """
-                Get a device s associated organisation with a given batch and type
-                GET /v1/orgs/{org-id}/devices/{batch}/{type}
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}/devices/{}/{}".format(
-            self.version, org_id, d_batch, d_type)
-        response = self._get(url, ["v1", "v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_org_device_meta(self, org_id, client_id):
-        """
-                Get device metadata
-                GET /v1/orgs/{org-id}/devices/{client-id}
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :param client_id: The unique id for the device.
-                :type client_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}/devices/{}".format(self.version, org_id, client_id)
-        response = self._get(url, ["v1", "v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def delete_org_device(self, org_id, client_id):
-        """
-                Delete a device
-                DELETE /v1/orgs/{org-id}/devices/{client-id}
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :param client_id: The unique id for the device.
-                :type client_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}/devices/{}".format(self.version, org_id, client_id)
-        response = self._delete(url, ["v1", "v2"])
-        return True if response.status_code in [200, 204, 422] else False
-
-    def update_org_device(self, org_id, client_id, update_device_input):
-        """
-                Update device metadata
-                PUT /v1/orgs/{org-id}/devices/{client-id}
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :param client_id: The unique id for the device.
-                :type client_id: :py:class:`str`
-
-                update_device_input = {
-                  "name": "string",
-                  "description": "string",
-                  "batch": "string",
-                  "device-type": "string",
-                  "location": {
-                        "lat": 0,
-                        "lon": 0,
-                        "elevation": 0,
-                        "zip": "string",
-                        "postcode": "string"
-                  },
-                  "tags": [
-                        "string"
-                  ]
-                }
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}/devices/{}".format(self.version, org_id, client_id)
-        response = self._put(url, update_device_input)
-        return True if response.status_code in [200, 204, 422] else False
-
-    def get_org_device_errors(self, org_id):
-        """
-                Retrieve device errors for a given org
-                GET /v1/orgs/{org-id}/errors
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}/errors".format(self.version, org_id)
-        response = self._get(url, ["v1", "v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_org_pending_invits(self, org_id):
-        """
-                Get pending invitations for an organisation
-                GET /v1/orgs/{org-id}/invitations
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}/invitations".format(self.version, org_id)
-        response = self._get(url, ["v1", "v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_org_members(self, org_id):
-        """
-                Get members of an org
-                GET /v1/orgs/{org-id}/members
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}/members".format(self.version, org_id)
-        response = self._get(url, ["v1", "v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def invite_user_to_org(self, org_id, user_id):
-        """
-                Invite user to join organisation (email will be sent)
-                POST /v1/orgs/{org-id}/members/{user-id}
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :param user_id: user id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}/members/{}".format(self.version, org_id, user_id)
-        response = self._post(url, ["v1", "v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def delete_user_from_org(self, org_id, user_id):
-        """
-                Delete a user from an organisation
-                DELETE /v1/orgs/{org-id}/members/{user-id}
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :param user_id: user id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}/members/{}".format(self.version, org_id, user_id)
-        response = self._delete(url, ["v1", "v2"])
-        return True if response.status_code in [200, 204, 422] else False
-
-    def reinvite_user_to_org(self, org_id, user_id):
-        """
-                Resend an organisation invitation email
-                POST /v1/orgs/{org-id}/members/invitation-data/{user-id}
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :param user_id: user id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-
-        url = "/{}/orgs/{}/members/invitation-data/{}".format(
-            self.version, org_id, user_id)
-        response = self._post(url, ["v1", "v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_invit_status(self, org_id, user_id):
-        """
-                Get invitation status for organisation and user
-                GET /v1/orgs/{org-id}/members/invitation-data/{user-id}
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :param user_id: user id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}/members/invitation-data/{}".format(
-            self.version, org_id, user_id)
-        response = self._get(url)
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_org_topics(self, org_id):
-        """
-                Get topics associated with an organisation
-                GET /v1/orgs/{org-id}/topics
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}/topics".format(self.version, org_id)
-        response = self._get(url, ["v1", "v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_org_stats(self, org_id):
-        """
-                Retrieve usage stats for a given org
-                GET /v1/orgs/{org-id}/usage-stats
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/orgs/{}/usage-stats".format(self.version, org_id)
-        response = self._get(url, ["v1", "v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_pub_org_meta(self, org_id):
-        """
-                Get public organisation metadata including topics [NO-AUTH]
-                GET /v1/public/orgs/{org-id}
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/public/orgs/{}".format(self.version, org_id)
-        response = self._get(url, ["v1", "v2"])
-        return response
-
-    # ---------------------------------------- #
-    # [v2] schemas : Schema operations
-    # ---------------------------------------- #
-    def get_schemas(self, org_id):
-        """
-                Get all the available schemas that can be applied to topics [NO-AUTH]
-                GET /v2/schemas
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/public/orgs/{}".format(self.version, org_id)
-        response = self._get(url, ["v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    # ---------------------------------------- #
-    # [v2] projects : Project operations
-    # ---------------------------------------- #
-
-    def get_pub_proj_info(self, project_id):
-        """
-                Get public project information [NO-AUTH]
-                GET /v2/public/projects/{project-id}
-
-                :param project_id: The unique id for the project.
-                :type project_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/public/projects/{}".format(self.version, project_id)
-        response = self._get(url, ["v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    def get_pub_datasets(self, project_id):
-        """
-                Get public datasets for a given project [NO-AUTH]
-                GET /v2/public/projects/{project-id}/datasets
-
-                :param project_id: The unique id for the project.
-                :type project_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/public/projects/{}/datasets".format(
-            self.version, project_id)
-        response = self._get(url, ["v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
-
-    # ---------------------------------------- #
-    # OpenSensors Real-Time API
-    # realtime.opensensors.io
-    # ---------------------------------------- #
-
-    # ---------------------------------------- #
-    # [v2] events : SSE streams for device & dataset event
-    # ---------------------------------------- #
-    def get_device_sd(self, client_id):
-        """
-                Opens a SSE stream with debug events for a device
-                GET /v2/debug-events/{client-id}
-
-                :param client_id: The unique id for the device.
-                :type client_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/debug-events/{}".format(self.version, client_id)
-        response = self._get_stream_events(url, ["v1", "v2"])
-        return response
-
-    def get_pub_sd(self, dataset_id):
-        """
-                Opens a SSE stream for a public dataset [NO-AUTH]
-                GET /v2/public/events/datasets/{dataset-id}
-
-                :param dataset_id: The unique id for the dataset.
-                :type dataset_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/public/events/datasets/{}".format(self.version, dataset_id)
-        response = self._get_stream_events(url, ["v2"])
-        return response
-
-    # ---------------------------------------- #
-    # events : SSE streams for device & message event
-    # ---------------------------------------- #
-
-    def get_org_topics_sd(self, org_id):
-        """
-                Opens a SSE stream for all topics of an organisation
-                GET /v1/events/orgs/{org-id}/topics
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/events/orgs/{}/topics".format(self.version, org_id)
-        response = self._get_stream_events(url, ["v1", "v2"])
-
-        return response
-
-    def get_topics_sd(self, topic):
-        """
-                Opens a SSE stream for a given topic
-                GET /v1/events/topics/{topic}
-
-                :param topic: The unique id for the interest topic.
-                :type topic: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/events/topics/{}".format(self.version, topic)
-        response = self._get_stream_events(url, ["v1", "v2"])
-        return response
-
-    def get_user_bookmarked_topics_sd(self, user_id):
-        """
-                Opens a SSE stream for bookmarked topics for a user
-                GET /v1/events/users/{user-id}/bookmarks
-
-                :param user_id: user id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/events/users/{}/bookmarks".format(self.version, user_id)
-        response = self._get_stream_events(url, ["v1", "v2"])
-        return response
-
-    def get_user_topics_sd(self, user_id):
-        """
-                Opens a SSE stream for all topics for a user
-                GET /v1/events/users/{user-id}/topics
-
-                :param user_id: user id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/events/users/{}/topics".format(self.version, user_id)
-        response = self._get_stream_events(url, ["v1", "v2"])
-        return response
-
-    def get_pub_org_topics_sd(self, org_id):
-        """
-                Opens a SSE stream for a organisations' all public topics [NO-AUTH]
-                GET /v1/public/events/orgs/{org-id}/topics
-
-                :param org_id: The unique id for the organization.
-                :type org_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/public/events/orgs/{}/topics".format(self.version, org_id)
-        response = self._get_stream_events(url, ["v1", "v2"])
-
-        return response
-
-    def get_pub_topic_sd(self, topic):
-        """
-                Opens a SSE stream for a public topic [NO-AUTH]
-                GET /v1/public/events/topics/{topic}
-
-                :param topic: The unique id for the interest topic.
-                :type topic: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-
-        url = "/{}/public/events/topics/{}".format(self.version, topic)
-
-        response = self._get_stream_events(url, ["v1", "v2"])
-        return response
-
-    def get_pub_user_topics(self, user_id):
-        """
-                Opens a SSE stream for a users' all public topics [NO-AUTH]
-                GET /v1/public/events/users/{user-id}/topics
-
-                :param user_id: user id
-                :type user_id: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/public/events/users/{}/topics".format(self.version, user_id)
-        response = self._get_stream_events(url, ["v1", "v2"])
-        return response
-
-    # ---------------------------------------- #
-    # messages : Send messages
-    # ---------------------------------------- #
-    def send_msg_topic(self, topic):
-        """
-                Post a message to a topic on behalf of a device
-                POST /v1/topics/{topic}
-
-                :param topic: The unique id for the interest topic.
-                :type topic: :py:class:`str`
-
-                :returns: The JSON output from the API or an error message
-                """
-        url = "/{}/topics/{}".format(self.version, topic)
-        response = self._post(url, ["v1", "v2"])
-        return response.json() if response.status_code in [200, 204, 422, 500] else None
@@ -0,0 +1,165 @@
+# coding=utf-8
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .pagination import parse_date
+
+
+class PageCacheStats(object):
+
+    """
+        Counters kept by a :py:class:`PageCache`.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evictions = 0
+        self.bytes_served = 0
+
+    def as_dict(self):
+        return {'hits': self.hits, 'misses': self.misses, 'stored': self.stored,
+                'evictions': self.evictions, 'bytes_served': self.bytes_served}
+
+
+class PageCache(object):
+
+    """
+        Persistent cache of historical message pages.
+
+        Messages of a closed time window never change, so the responses of the
+        message endpoints are stored in a SQLite file when the query has an
+        ``end-date`` older than ``settle`` seconds. Pages are keyed by url,
+        normalized query parameters and user, compressed with zlib and evicted
+        least recently used first once they exceed ``max_bytes``. The file can
+        be shared between processes.
+
+    """
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    DEFAULT_SETTLE = 3600
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, settle=DEFAULT_SETTLE, level=6):
+        """
+                :param path: SQLite database file
+                :type path: :py:class:`str`
+
+                :param max_bytes: Budget for the compressed pages
+                :type max_bytes: :py:class:`int`
+
+                :param settle: Seconds after its end-date before a window counts as
+                        closed, to leave room for late messages
+                :type settle: :py:class:`float`
+
+                :param level: zlib compression level
+                :type level: :py:class:`int`
+
+                """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.settle = settle
+        self.level = level
+        self.stats = PageCacheStats()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._db:
+            self._db.execute('CREATE TABLE IF NOT EXISTS pages ('
+                             'key TEXT PRIMARY KEY, url TEXT, body BLOB, size INTEGER, '
+                             'accessed REAL)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed)')
+
+    def cacheable(self, params):
+        """
+                :returns: True when the query covers a closed time window
+                """
+        end = parse_date((params or {}).get('end-date'))
+        return end is not None and end + self.settle < time.time()
+
+    @staticmethod
+    def key(url, params=None, user_id=None):
+        """
+                :returns: The cache key of a message query
+                """
+        params = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        blob = json.dumps([url, params, user_id], sort_keys=True)
+        return hashlib.sha1(blob.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+                :returns: The stored response for ``key`` or None
+                """
+        with self._lock:
+            row = self._db.execute('SELECT url, body FROM pages WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            with self._db:
+                self._db.execute('UPDATE pages SET accessed = ? WHERE key = ?', (time.time(), key))
+            content = zlib.decompress(bytes(row[1]))
+            self.stats.hits += 1
+            self.stats.bytes_served += len(content)
+        return self._revive(row[0], content)
+
+    def put(self, key, response):
+        """
+                Store a successful response under ``key``
+                """
+        if response.status_code != 200:
+            return
+        body = zlib.compress(response.content, self.level)
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            with self._db:
+                self._db.execute('INSERT OR REPLACE INTO pages (key, url, body, size, accessed) '
+                                 'VALUES (?, ?, ?, ?, ?)',
+                                 (key, response.url, sqlite3.Binary(body), len(body), time.time()))
+                self.stats.stored += 1
+                self._evict()
+
+    def _evict(self):
+        size = self.size
+        if size <= self.max_bytes:
+            return
+        rows = self._db.execute('SELECT key, size FROM pages ORDER BY accessed').fetchall()
+        for key, length in rows:
+            if size <= self.max_bytes:
+                break
+            self._db.execute('DELETE FROM pages WHERE key = ?', (key,))
+            size -= length
+            self.stats.evictions += 1
+
+    @property
+    def size(self):
+        """
+                Bytes of compressed pages currently stored.
+                """
+        return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    @staticmethod
+    def _revive(url, content):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+        response._content = content
+        response.encoding = 'utf-8'
+        response.url = url
+        return response
+
+    def clear(self):
+        with self._lock:
+            with self._db:
+                self._db.execute('DELETE FROM pages')
+
+    def close(self):
+        self._db.close()
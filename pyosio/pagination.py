@@ -0,0 +1,394 @@
+# coding=utf-8
+"""
+    Iteration over the paginated message endpoints.
+
+    A message page is ``{"messages": [...], "next": "/v1/messages/...?cursor=..."}``.
+    :py:class:`Paginator` follows the ``next`` links one page at a time and keeps
+    a :py:class:`Cursor` pointing just past the last message (or page) handed
+    out, so an interrupted iteration can be resumed from where it stopped.
+"""
+import calendar
+import datetime
+import numbers
+import re
+import threading
+import time
+from collections import deque
+
+from . import codec
+from .deadline import current_deadline
+from .errors import OSIOClientApiError
+
+# Handle library reorganisation Python 2 > Python 3.
+try:
+    from urllib.parse import urlsplit, urlunsplit, parse_qsl
+except ImportError:
+    from urlparse import urlsplit, urlunsplit, parse_qsl
+
+_OFFSET = re.compile(r'([+-])(\d{2}):?(\d{2})$')
+_FORMATS = ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M', '%Y-%m-%d')
+# Paginated message iterators of the client by kind of key.
+ITERATORS = {'topic': 'iter_topic_msgs', 'device': 'iter_device_msgs', 'user': 'iter_user_msgs'}
+
+
+def parse_date(value):
+    """
+            Parse an ISO 8601 date as used by the ``start-date``/``end-date``
+            query parameters.
+
+            :returns: Seconds since the epoch, or None when ``value`` is not a date
+            """
+    if not isinstance(value, str) and not isinstance(value, type(u'')):
+        return None
+    value = value.strip().replace(' ', 'T')
+    offset = 0
+    if value.endswith('Z'):
+        value = value[:-1]
+    else:
+        match = _OFFSET.search(value)
+        if match and 'T' in value:
+            sign = 1 if match.group(1) == '+' else -1
+            offset = sign * (int(match.group(2)) * 3600 + int(match.group(3)) * 60)
+            value = value[:match.start()]
+    fraction = 0.0
+    if '.' in value:
+        value, digits = value.split('.', 1)
+        if not digits.isdigit():
+            return None
+        fraction = float('0.' + digits)
+    for fmt in _FORMATS:
+        try:
+            return calendar.timegm(time.strptime(value, fmt)) + fraction - offset
+        except ValueError:
+            continue
+    return None
+
+
+def format_date(value):
+    """
+            Format a ``start-date``/``end-date`` query parameter.
+
+            :param value: A :py:class:`datetime.datetime` (naive values are UTC),
+                    a :py:class:`datetime.date`, seconds since the epoch or an
+                    ISO 8601 string, passed through
+            :returns: An ISO 8601 string, or None for None
+            """
+    if value is None or isinstance(value, str) or isinstance(value, type(u'')):
+        return value
+    if isinstance(value, numbers.Number) and not isinstance(value, bool):
+        value = datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=value)
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = (value - value.utcoffset()).replace(tzinfo=None)
+        text = value.strftime('%Y-%m-%dT%H:%M:%S')
+        if value.microsecond:
+            text += '.%03d' % (value.microsecond // 1000)
+        return text + 'Z'
+    if isinstance(value, datetime.date):
+        return value.strftime('%Y-%m-%d')
+    raise ValueError('Invalid date %r' % (value,))
+
+
+def split_url(url):
+    """
+            :returns: A (url, params) tuple of a url with its query string moved to a dict
+            """
+    parts = urlsplit(url)
+    return urlunsplit(parts[:3] + ('', '')), dict(parse_qsl(parts.query))
+
+
+class Cursor(object):
+
+    """
+        Resume point of a :py:class:`Paginator`: the page being read, as url and
+        query parameters, and the number of its messages already handed out.
+        ``url`` is None once the last page has been read.
+    """
+    __slots__ = ('url', 'params', 'offset')
+
+    def __init__(self, url, params=None, offset=0):
+        self.url = url
+        self.params = dict(params or {})
+        self.offset = offset
+
+    @property
+    def done(self):
+        return self.url is None
+
+    def as_dict(self):
+        return {'url': self.url, 'params': self.params, 'offset': self.offset}
+
+    @classmethod
+    def from_dict(cls, value):
+        """
+                :param value: Output of :py:meth:`as_dict`, e.g. after a JSON round trip
+                :returns: A :py:class:`Cursor`
+                """
+        return cls(value['url'], value.get('params'), value.get('offset', 0))
+
+    def __eq__(self, other):
+        return isinstance(other, Cursor) and self.as_dict() == other.as_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'Cursor(%r, %r, %r)' % (self.url, self.params, self.offset)
+
+
+def next_cursor(page, cursor):
+    """
+            :param page: Decoded message page
+            :param cursor: Cursor of that page
+
+            :returns: The cursor of the following page, done when there is none
+            """
+    messages = page.get('messages') if isinstance(page, dict) else None
+    link = page.get('next') if isinstance(page, dict) else None
+    if not messages or not link:
+        return Cursor(None)
+    url, params = split_url(link)
+    if not url:
+        url = cursor.url
+    following = Cursor(url, params)
+    if following.url == cursor.url and following.params == cursor.params:
+        # A page linking to itself would loop forever.
+        return Cursor(None)
+    return following
+
+
+def check_page(response):
+    """
+            :returns: The decoded message page of a response
+            """
+    if response is None or response.status_code != 200:
+        raise OSIOClientApiError(
+            'Invalid API server response.\nHTTP %s for %s' % (
+                getattr(response, 'status_code', None), getattr(response, 'url', None)))
+    return codec.decode_response(response)
+
+
+class Prefetcher(object):
+
+    """
+        Fetch the pages of a query on a background thread, up to ``depth`` pages
+        ahead of the consumer and within ``max_bytes`` of response bodies
+        (always at least one page).
+    """
+
+    def __init__(self, fetch, cursor, depth, max_bytes):
+        """
+                :param fetch: Callable taking (url, params) and returning the response
+                :param cursor: First page to fetch
+                :type cursor: :py:class:`Cursor`
+
+                :param depth: Number of pages fetched ahead
+                :type depth: :py:class:`int`
+
+                :param max_bytes: Budget for the response bodies fetched ahead
+                :type max_bytes: :py:class:`int`
+
+                """
+        self._fetch = fetch
+        self._depth = max(1, depth)
+        self._max_bytes = max_bytes
+        self._pages = deque()
+        self._bytes = 0
+        self._done = False
+        self._closed = False
+        self._error = None
+        self._condition = threading.Condition()
+        thread = threading.Thread(target=self._run, args=(cursor,))
+        thread.daemon = True
+        thread.start()
+
+    def _full(self):
+        return self._pages and (len(self._pages) >= self._depth or self._bytes >= self._max_bytes)
+
+    def _run(self, cursor):
+        try:
+            while not cursor.done:
+                with self._condition:
+                    while not self._closed and self._full():
+                        self._condition.wait()
+                    if self._closed:
+                        return
+                response = self._fetch(cursor.url, cursor.params)
+                page = check_page(response)
+                following = next_cursor(page, cursor)
+                size = len(response.content)
+                with self._condition:
+                    self._pages.append((cursor, page, following, size))
+                    self._bytes += size
+                    self._condition.notify_all()
+                cursor = following
+        except Exception as e:
+            self._error = e
+        finally:
+            with self._condition:
+                self._done = True
+                self._condition.notify_all()
+
+    def get(self):
+        """
+                :returns: The next (cursor, page, following cursor) tuple, None after the last page
+                """
+        with self._condition:
+            while not self._pages and not self._done:
+                self._condition.wait()
+            if self._pages:
+                cursor, page, following, size = self._pages.popleft()
+                self._bytes -= size
+                self._condition.notify_all()
+                return cursor, page, following
+        if self._error is not None:
+            raise self._error
+        return None
+
+    def close(self):
+        """
+                Stop fetching; a request in flight is completed and dropped.
+                """
+        with self._condition:
+            self._closed = True
+            self._pages.clear()
+            self._condition.notify_all()
+
+
+class Paginator(object):
+
+    """
+        Iterable over every message of a paginated query, fetching one page at
+        a time. With ``pages`` set it yields the message list of each page
+        instead. :py:attr:`cursor` always points just past what was yielded.
+
+        With ``prefetch`` set, up to that many following pages are fetched on a
+        background thread while the caller works on the current one.
+
+            messages = osio_client.iter_topic_msgs(topic, start_date=since)
+            for message in messages:
+                store(message)
+            save(messages.cursor.as_dict())
+
+    """
+    DEFAULT_PREFETCH_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, fetch, cursor, pages=False, prefetch=0, prefetch_bytes=DEFAULT_PREFETCH_BYTES,
+                 select=None):
+        """
+                :param fetch: Callable taking (url, params) and returning the response
+                :param cursor: Where to start
+                :type cursor: :py:class:`Cursor`
+
+                :param pages: Yield pages rather than messages
+                :type pages: :py:class:`bool`
+
+                :param prefetch: Number of pages fetched ahead, 0 to fetch on demand
+                :type prefetch: :py:class:`int`
+
+                :param prefetch_bytes: Budget for the response bodies fetched ahead
+                :type prefetch_bytes: :py:class:`int`
+
+                :param select: Callable returning the messages of a page to keep,
+                        e.g. :py:meth:`pyosio.query.MessageQuery.select`. Cursor
+                        offsets count the messages kept.
+
+                """
+        self._fetch = fetch
+        self.cursor = cursor
+        self.pages = pages
+        self.prefetch = prefetch
+        self.prefetch_bytes = prefetch_bytes
+        self.select = select
+
+    def _messages(self, page):
+        messages = page.get('messages') or []
+        return self.select(messages) if self.select is not None else messages
+
+    def _pages(self):
+        """
+                :returns: A generator of (cursor, page, following cursor) tuples
+                """
+        cursor = self.cursor
+        if not self.prefetch:
+            while not cursor.done:
+                page = check_page(self._fetch(cursor.url, cursor.params))
+                following = next_cursor(page, cursor)
+                yield cursor, page, following
+                cursor = following
+            return
+
+        fetch = self._fetch
+        deadline = current_deadline()
+        if deadline is not None:
+            fetch = deadline.wrap(fetch)
+        prefetcher = Prefetcher(fetch, cursor, self.prefetch, self.prefetch_bytes)
+        try:
+            while True:
+                item = prefetcher.get()
+                if item is None:
+                    return
+                yield item
+        finally:
+            prefetcher.close()
+
+    def _iter_pages(self):
+        for cursor, page, following in self._pages():
+            messages = self._messages(page)
+            self.cursor = following
+            if messages[cursor.offset:]:
+                yield messages[cursor.offset:]
+
+    def _iter_messages(self):
+        for cursor, page, following in self._pages():
+            messages = self._messages(page)
+            for offset in range(cursor.offset, len(messages)):
+                if offset + 1 < len(messages):
+                    self.cursor = Cursor(cursor.url, cursor.params, offset + 1)
+                else:
+                    self.cursor = following
+                yield messages[offset]
+            self.cursor = following
+
+    def __iter__(self):
+        return self._iter_pages() if self.pages else self._iter_messages()
+
+    def columns(self, fields=None):
+        """
+                Iterate page by page over :py:class:`pyosio.columnar.MessageBatch`
+                objects sharing their category codes. Requires numpy.
+
+                :param fields: Payload fields to extract, see :py:class:`pyosio.columnar.Decoder`
+                :type fields: :py:class:`list` or :py:class:`dict`
+
+                :returns: A generator of :py:class:`pyosio.columnar.MessageBatch`
+                """
+        from .columnar import Decoder
+        decoder = Decoder(fields)
+        for messages in self._iter_pages():
+            yield decoder.decode(messages)
+
+    def to_dataframe(self, fields=None):
+        """
+                Build one :py:class:`pandas.DataFrame` of every message, page by page
+                through :py:meth:`columns`. Requires pandas.
+
+                :param fields: Payload fields to extract, see :py:class:`pyosio.columnar.Decoder`
+                :returns: A :py:class:`pandas.DataFrame`
+                """
+        from .frames import messages_frame
+        return messages_frame(self.columns(fields))
+
+    def dataframes(self, chunk_size=None, fields=None):
+        """
+                Iterate over DataFrames of about ``chunk_size`` messages, holding one
+                chunk in memory at a time. Requires pandas.
+
+                :param chunk_size: Rows per DataFrame
+                :type chunk_size: :py:class:`int`
+
+                :param fields: Payload fields to extract, see :py:class:`pyosio.columnar.Decoder`
+                :returns: A generator of :py:class:`pandas.DataFrame`
+                """
+        from .frames import messages_frames, DEFAULT_CHUNK_SIZE
+        return messages_frames(self.columns(fields), chunk_size or DEFAULT_CHUNK_SIZE)
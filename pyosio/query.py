@@ -0,0 +1,362 @@
+# coding=utf-8
+"""
+    Typed queries of the stored message endpoints.
+
+    A :py:class:`MessageQuery` validates and normalises the query parameters
+    of the ``get_*_msgs`` endpoints (``start-date``, ``end-date``, ``dur``,
+    ``tags``, ``lat``/``lon``/``radius``, ``postcode``, ``zip``, ``elevation``
+    and ``user-id``): an unknown name or a malformed value raises
+    :py:class:`ValueError` instead of being ignored by the server. These are
+    pushed to the server; filters the API does not have, on payload fields
+    and devices, are applied client-side as NumPy predicates over each
+    decoded page. A query is a read-only mapping of its server parameters,
+    so it can be passed wherever ``queryparams`` is expected.
+
+        query = MessageQuery(start_date='2016-01-01').near(51.5, -0.12, 1000)
+        query = query.where('temperature', '>', 30)
+        for message in osio_client.iter_topic_msgs(topic, queryparams=query):
+            print(message)
+"""
+import difflib
+import numbers
+import re
+
+from .backfill import epoch
+from .columnar import Decoder
+from .errors import OSIOClientError
+from .pagination import format_date
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Handle library reorganisation Python 2 > Python 3.
+try:
+    from collections.abc import Mapping
+    from urllib.parse import urlencode
+except ImportError:
+    from collections import Mapping
+    from urllib import urlencode
+
+_TEXT = (str, type(u''))
+_SPACES = re.compile(r'\s+')
+OPERATORS = ('==', '!=', '<', '<=', '>', '>=', 'in', 'between')
+
+
+def _date(name, value):
+    try:
+        return format_date(epoch(value))
+    except (TypeError, ValueError):
+        raise ValueError('Invalid %s %r.' % (name, value))
+
+
+def _number(name, value, low=None, high=None, positive=False):
+    if isinstance(value, _TEXT):
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+    if not isinstance(value, numbers.Real) or isinstance(value, bool) or value != value:
+        raise ValueError('Invalid %s %r, expected a number.' % (name, value))
+    if (low is not None and value < low) or (high is not None and value > high) or \
+            (positive and value <= 0):
+        raise ValueError('%s %r out of range.' % (name, value))
+    return float(value)
+
+
+def _text(name, value):
+    if not isinstance(value, _TEXT) or not value.strip():
+        raise ValueError('Invalid %s %r, expected a string.' % (name, value))
+    return _SPACES.sub(' ', value.strip())
+
+
+def _tags(name, value):
+    if isinstance(value, _TEXT):
+        value = value.split(',')
+    tags = sorted(set(_text(name, tag) for tag in value))
+    if not tags:
+        raise ValueError('Invalid %s %r.' % (name, value))
+    return ','.join(tags)
+
+
+# Query parameter of the message endpoints: normaliser.
+PARAMETERS = {
+    'start-date': _date,
+    'end-date': _date,
+    'dur': lambda name, value: _number(name, value, positive=True),
+    'tags': _tags,
+    'lat': lambda name, value: _number(name, value, -90, 90),
+    'lon': lambda name, value: _number(name, value, -180, 180),
+    'radius': lambda name, value: int(_number(name, value, positive=True)),
+    'elevation': _number,
+    'postcode': lambda name, value: _text(name, value).upper(),
+    'zip': _text,
+    'user-id': _text,
+}
+
+
+def normalise(params):
+    """
+            :param params: Query parameters; ``start_date`` stands for ``start-date``
+            :type params: :py:class:`dict`
+
+            :returns: The parameters validated and in canonical form
+            """
+    normalised = {}
+    for name, value in params.items():
+        key = name.replace('_', '-')
+        if key not in PARAMETERS:
+            matches = difflib.get_close_matches(key, sorted(PARAMETERS), 1)
+            raise ValueError('Unknown query parameter %r%s.' % (
+                name, ', did you mean %r' % matches[0] if matches else ''))
+        if value is not None:
+            normalised[key] = PARAMETERS[key](key, value)
+    if 'start-date' in normalised and 'end-date' in normalised and \
+            epoch(normalised['start-date']) > epoch(normalised['end-date']):
+        raise ValueError('start-date is after end-date.')
+    if ('lat' in normalised) != ('lon' in normalised):
+        raise ValueError('lat and lon go together.')
+    if 'radius' in normalised and 'lat' not in normalised:
+        raise ValueError('radius needs lat and lon.')
+    return normalised
+
+
+class Predicate(object):
+
+    """
+        A client-side condition on a numeric payload field, evaluated on a
+        whole :py:class:`pyosio.columnar.MessageBatch` at once. Messages
+        without the field never match.
+    """
+    __slots__ = ('field', 'op', 'value')
+
+    def __init__(self, field, op, value):
+        if op not in OPERATORS:
+            raise ValueError('Unknown operator %r, expected one of %s.' % (op, ', '.join(OPERATORS)))
+        if op == 'between':
+            low, high = value
+            value = (_number(field, low), _number(field, high))
+        elif op == 'in':
+            value = tuple(sorted(set(_number(field, v) for v in value)))
+        else:
+            value = _number(field, value)
+        self.field = field
+        self.op = op
+        self.value = value
+
+    def __repr__(self):
+        return '%s %s %r' % (self.field, self.op, self.value)
+
+    def mask(self, batch):
+        if self.field not in batch:
+            return numpy.zeros(len(batch), dtype=bool)
+        column = batch[self.field]
+        values, op, value = column.values, self.op, self.value
+        if op == '==':
+            matched = values == value
+        elif op == '!=':
+            matched = values != value
+        elif op == '<':
+            matched = values < value
+        elif op == '<=':
+            matched = values <= value
+        elif op == '>':
+            matched = values > value
+        elif op == '>=':
+            matched = values >= value
+        elif op == 'in':
+            matched = numpy.isin(values, value)
+        else:
+            matched = (values >= value[0]) & (values <= value[1])
+        return matched & ~column.mask
+
+
+class MessageQuery(Mapping):
+
+    """
+        Validated query of the message endpoints. The mapping holds the
+        parameters sent to the server; builder methods return new queries.
+    """
+
+    def __init__(self, params=None, **kwargs):
+        """
+                :param params: Query parameters, e.g. ``{'start-date': '2016-01-01'}``
+                :type params: :py:class:`dict`
+
+                :param kwargs: More query parameters, ``start_date`` standing for ``start-date``
+                """
+        merged = dict(params or {})
+        merged.update(kwargs)
+        self._params = normalise(merged)
+        self.predicates = ()
+        self.devices = None
+
+    def _copy(self, params=None, predicates=(), devices=None):
+        merged = dict(self._params)
+        merged.update((name, value) for name, value in (params or {}).items() if value is not None)
+        query = MessageQuery(merged)
+        query.predicates = self.predicates + tuple(predicates)
+        query.devices = self.devices if devices is None else frozenset(devices)
+        return query
+
+    # ---------------------------------------- #
+    # Mapping of the server parameters
+    # ---------------------------------------- #
+
+    def __getitem__(self, name):
+        return self._params[name]
+
+    def __iter__(self):
+        return iter(self._params)
+
+    def __len__(self):
+        return len(self._params)
+
+    def __eq__(self, other):
+        return isinstance(other, MessageQuery) and self.cache_key() == other.cache_key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.cache_key())
+
+    def __repr__(self):
+        return 'MessageQuery(%s)' % self.cache_key()
+
+    def cache_key(self):
+        """
+                :returns: A string identifying the query, equal for equivalent queries
+                """
+        key = urlencode(sorted((name, repr(value) if isinstance(value, float) else value)
+                               for name, value in self._params.items()))
+        filters = sorted(repr(predicate) for predicate in self.predicates)
+        if self.devices is not None:
+            filters.append('device in %r' % sorted(self.devices))
+        return key + ''.join(';' + text for text in filters)
+
+    # ---------------------------------------- #
+    # Builder
+    # ---------------------------------------- #
+
+    def between(self, start_date=None, end_date=None):
+        """
+                :returns: The query restricted to messages dated from ``start_date`` to ``end_date``
+                """
+        return self._copy({'start-date': start_date, 'end-date': end_date})
+
+    def near(self, lat, lon, radius=None, elevation=None):
+        """
+                :returns: The query restricted to messages sent within ``radius`` of a place
+                """
+        return self._copy({'lat': lat, 'lon': lon, 'radius': radius, 'elevation': elevation})
+
+    def tagged(self, *tags):
+        """
+                :returns: The query restricted to messages tagged with ``tags``
+                """
+        return self._copy({'tags': tags})
+
+    def where(self, field, op, value):
+        """
+                Add a client-side condition on a numeric payload field
+
+                :param op: One of ``==``, ``!=``, ``<``, ``<=``, ``>``, ``>=``,
+                        ``in`` (a list of values) or ``between`` (a pair, both included)
+                :returns: The query restricted to the messages matching
+                """
+        return self._copy(predicates=[Predicate(field, op, value)])
+
+    def from_devices(self, *devices):
+        """
+                :returns: The query restricted client-side to the messages of ``devices``
+                """
+        return self._copy(devices=[_text('device', device) for device in devices])
+
+    # ---------------------------------------- #
+    # Client-side evaluation
+    # ---------------------------------------- #
+
+    @property
+    def filtered(self):
+        """
+                True when part of the query is evaluated client-side
+                """
+        return bool(self.predicates) or self.devices is not None
+
+    def _devices_mask(self, batch):
+        codes = [code for code, device in enumerate(batch.categories['device'].values)
+                 if device in self.devices]
+        return numpy.isin(batch.codes['device'], codes)
+
+    def _fields_mask(self, batch, dates):
+        matched = numpy.ones(len(batch), dtype=bool)
+        for predicate in self.predicates:
+            matched &= predicate.mask(batch)
+        if dates:
+            date = batch.date.astype('int64')
+            valid = ~numpy.isnat(batch.date)
+            for name, compare in (('start-date', numpy.greater_equal), ('end-date', numpy.less_equal)):
+                if name in self._params:
+                    matched &= valid & compare(date, int(round(epoch(self._params[name]) * 1000)))
+        return matched
+
+    def mask(self, batch, dates=False):
+        """
+                :param batch: A :py:class:`pyosio.columnar.MessageBatch`
+                :param dates: Also apply the date range, both ends included as on
+                        the server, for messages that were not queried with it
+                :type dates: :py:class:`bool`
+
+                :returns: A boolean array, True for the messages matching the
+                        client-side part of the query
+                """
+        matched = self._fields_mask(batch, dates)
+        if self.devices is not None:
+            matched &= self._devices_mask(batch)
+        return matched
+
+    def select(self, messages, dates=False):
+        """
+                Keep the messages matching the client-side part of the query. The
+                devices are matched first, so that only the payloads of the
+                remaining messages are decoded.
+
+                :param messages: A list of messages
+                :returns: The messages matching
+                """
+        if not messages or (not self.filtered and not dates):
+            return messages
+        if numpy is None:
+            raise OSIOClientError('Client-side filters require the numpy package.')
+        if self.devices is not None:
+            batch = Decoder({}, ('device',), dates=False).decode(messages)
+            messages = [messages[i] for i in numpy.flatnonzero(self._devices_mask(batch))]
+        if messages and (self.predicates or dates):
+            fields = dict((predicate.field, numpy.float64) for predicate in self.predicates)
+            batch = Decoder(fields, (), dates).decode(messages)
+            messages = [messages[i] for i in numpy.flatnonzero(self._fields_mask(batch, dates))]
+        return messages
+
+    def filter(self, items):
+        """
+                Evaluate the query client-side over an iterable of messages, of
+                message pages or of lists of messages, e.g. a stream: the date
+                range and the client-side filters. Parameters only the server
+                can evaluate are refused.
+
+                :returns: A generator
+                """
+        remote = sorted(set(self._params) - set(['start-date', 'end-date']))
+        if remote:
+            raise OSIOClientError('%s can only be evaluated by the server.' % ', '.join(remote))
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get('messages'), list):
+                page = dict(item)
+                page['messages'] = self.select(item['messages'], dates=True)
+                yield page
+            elif isinstance(item, list):
+                yield self.select(item, dates=True)
+            elif self.select([item], dates=True):
+                yield item
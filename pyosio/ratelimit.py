@@ -0,0 +1,259 @@
+# coding=utf-8
+import os
+import threading
+import time
+
+from .deadline import current_deadline
+from .errors import OSIOClientError, TimeoutError
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Handle library reorganisation Python 2 > Python 3.
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+
+class TokenBucket(object):
+
+    """
+        Thread-safe token bucket refilled at ``rate`` tokens per second up to
+        ``capacity``.
+
+        Tokens are reserved rather than polled: :py:meth:`reserve` debits the
+        bucket immediately (it may go negative) and returns how long the caller
+        has to wait, so concurrent callers are served in arrival order.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+                :param rate: Tokens added per second
+                :type rate: :py:class:`float`
+
+                :param capacity: Maximum burst size, defaults to one second worth of tokens
+                :type capacity: :py:class:`float`
+
+                """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.time()
+
+    def _take(self, tokens, state):
+        now = time.time()
+        available, updated = state
+        available = min(self.capacity, available + (now - updated) * self.rate)
+        available -= tokens
+        wait = -available / self.rate if available < 0 else 0.0
+        return wait, (available, now)
+
+    def _give(self, tokens, state):
+        available, updated = state
+        return None, (min(self.capacity, available + tokens), updated)
+
+    def _update(self, change):
+        with self._lock:
+            result, (self._tokens, self._updated) = change((self._tokens, self._updated))
+            return result
+
+    def reserve(self, tokens=1):
+        """
+                Take ``tokens`` from the bucket
+
+                :returns: Seconds to wait before using them
+                """
+        return self._update(lambda state: self._take(tokens, state))
+
+    def refund(self, tokens=1):
+        """
+                Give back ``tokens`` reserved for a request that was not sent
+                """
+        self._update(lambda state: self._give(tokens, state))
+
+
+class FileTokenBucket(TokenBucket):
+
+    """
+        Token bucket whose state lives in a file guarded by ``flock``, so every
+        process on the machine using the same ``path`` shares one budget.
+    """
+
+    def __init__(self, path, rate, capacity=None):
+        """
+                :param path: File holding the bucket state, created if missing
+                :type path: :py:class:`str`
+
+                :param rate: Tokens added per second
+                :type rate: :py:class:`float`
+
+                :param capacity: Maximum burst size
+                :type capacity: :py:class:`float`
+
+                """
+        if fcntl is None:
+            raise OSIOClientError('FileTokenBucket needs fcntl, not available on this platform.')
+        super(FileTokenBucket, self).__init__(rate, capacity)
+        self.path = path
+
+    def _update(self, change):
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                raw = os.read(fd, 64).decode('ascii').split()
+                state = (float(raw[0]), float(raw[1])) if len(raw) == 2 else (self.capacity, time.time())
+                result, state = change(state)
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, ('%r %r' % state).encode('ascii'))
+                return result
+            finally:
+                os.close(fd)
+
+
+class RateLimitStats(object):
+
+    """
+        Thread-safe counters kept by a :py:class:`RateLimiter`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def record(self, wait, requests=1):
+        with self._lock:
+            self.requests += requests
+            if wait > 0:
+                self.waits += requests
+                self.wait_seconds += wait * requests
+
+    def as_dict(self):
+        with self._lock:
+            return {'requests': self.requests, 'waits': self.waits,
+                    'wait_seconds': self.wait_seconds}
+
+
+class RateLimiter(object):
+
+    """
+        Client-side pacing of requests per host and, optionally, per endpoint
+        family (messages, users, orgs, topics, ...).
+
+        One limiter can be shared by several clients and threads. With
+        ``shared_dir`` the buckets are stored in files of that directory so all
+        processes of the machine pointing at it share the same budget.
+
+    """
+
+    def __init__(self, rate, capacity=None, families=None, shared_dir=None):
+        """
+                :param rate: Requests per second allowed per host
+                :type rate: :py:class:`float`
+
+                :param capacity: Burst size per host
+                :type capacity: :py:class:`float`
+
+                :param families: Requests per second per endpoint family,
+                        e.g. {"messages": 2, "orgs": 5}
+                :type families: :py:class:`dict`
+
+                :param shared_dir: Directory holding the cross-process bucket files
+                :type shared_dir: :py:class:`str`
+
+                """
+        self.rate = rate
+        self.capacity = capacity
+        self.families = families or {}
+        self.shared_dir = shared_dir
+        self.stats = RateLimitStats()
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def family(path):
+        """
+                Endpoint family of a url path: "/v1/public/messages/topic/x" -> "messages"
+
+                :param path: Url path
+                :type path: :py:class:`str`
+
+                :returns: The family name or None
+                """
+        for segment in path.strip('/').split('/')[1:]:
+            if segment not in ('public', 'events'):
+                return segment
+        return None
+
+    def _bucket(self, key, rate, capacity=None):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if self.shared_dir is not None:
+                    path = os.path.join(self.shared_dir, '%s.bucket' % key.replace(':', '_'))
+                    bucket = FileTokenBucket(path, rate, capacity)
+                else:
+                    bucket = TokenBucket(rate, capacity)
+                self._buckets[key] = bucket
+            return bucket
+
+    def reserve(self, url):
+        """
+                Reserve a slot for a request to ``url``
+
+                :param url: Absolute url of the request
+                :type url: :py:class:`str`
+
+                :returns: Seconds to wait before sending the request
+                """
+        parsed = urlparse(url)
+        wait = self._bucket(parsed.netloc, self.rate, self.capacity).reserve()
+        family = self.family(parsed.path)
+        if family in self.families:
+            key = '%s-%s' % (parsed.netloc, family)
+            wait = max(wait, self._bucket(key, self.families[family]).reserve())
+        self.stats.record(wait)
+        return wait
+
+    def refund(self, url, wait=0.0):
+        """
+                Give back the slot reserved for a request to ``url`` that was not sent
+
+                :param url: Absolute url of the request
+                :type url: :py:class:`str`
+
+                :param wait: Wait returned by :py:meth:`reserve`
+                :type wait: :py:class:`float`
+
+                """
+        parsed = urlparse(url)
+        self._bucket(parsed.netloc, self.rate, self.capacity).refund()
+        family = self.family(parsed.path)
+        if family in self.families:
+            self._bucket('%s-%s' % (parsed.netloc, family), self.families[family]).refund()
+        self.stats.record(wait, requests=-1)
+
+    def acquire(self, url):
+        """
+                Block until a request to ``url`` may be sent. Raise
+                :py:class:`pyosio.errors.TimeoutError` instead of waiting past
+                the current deadline.
+
+                :param url: Absolute url of the request
+                :type url: :py:class:`str`
+
+                """
+        wait = self.reserve(url)
+        if wait > 0:
+            deadline = current_deadline()
+            if deadline is not None and wait >= deadline.remaining():
+                self.refund(url, wait)
+                raise TimeoutError(deadline.seconds)
+            time.sleep(wait)
@@ -0,0 +1,204 @@
+# coding=utf-8
+import random
+import threading
+import time
+from .deadline import current_deadline
+from .errors import TimeoutError
+from .lazy import lazy_import
+
+requests = lazy_import('requests')
+urllib3_exceptions = lazy_import('urllib3.exceptions')
+
+
+def _connect_failed(error):
+    """
+            :returns: True when a request failed before a connection was made, so
+                    the server cannot have seen it
+            """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError) or \
+            getattr(error, 'response', None) is not None:
+        return False
+    cause = error.args[0] if error.args else None
+    return isinstance(cause, (urllib3_exceptions.NewConnectionError, urllib3_exceptions.MaxRetryError))
+
+
+class RetryStats(object):
+
+    """
+        Thread-safe counters kept by a :py:class:`RetryPolicy`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.retries = 0
+        self.gave_up = 0
+        self.sleep_seconds = 0.0
+
+    def record(self, attempts=0, retries=0, gave_up=0, sleep_seconds=0.0):
+        with self._lock:
+            self.attempts += attempts
+            self.retries += retries
+            self.gave_up += gave_up
+            self.sleep_seconds += sleep_seconds
+
+    def as_dict(self):
+        with self._lock:
+            return {'attempts': self.attempts, 'retries': self.retries,
+                    'gave_up': self.gave_up, 'sleep_seconds': self.sleep_seconds}
+
+
+class RetryPolicy(object):
+
+    """
+        Retry transient failures with capped exponential backoff and full jitter.
+
+        A request is retried when the server answers with one of ``statuses``
+        or when the connection fails. Only idempotent ``methods`` are retried
+        after the request may have reached the server; other methods (POST)
+        are only retried when the connection could not be established.
+        A ``Retry-After`` header overrides the computed backoff.
+
+    """
+    DEFAULT_MAX_ATTEMPTS = 3
+    DEFAULT_BACKOFF_BASE = 0.5
+    DEFAULT_BACKOFF_MAX = 30
+    DEFAULT_STATUSES = (429, 502, 503, 504)
+    DEFAULT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'PATCH')
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, backoff_base=DEFAULT_BACKOFF_BASE,
+                 backoff_max=DEFAULT_BACKOFF_MAX, statuses=DEFAULT_STATUSES,
+                 methods=DEFAULT_METHODS, respect_retry_after=True):
+        """
+                :param max_attempts: Total number of attempts, 1 disables retries
+                :type max_attempts: :py:class:`int`
+
+                :param backoff_base: Backoff of the first retry in seconds
+                :type backoff_base: :py:class:`float`
+
+                :param backoff_max: Upper bound of the backoff in seconds
+                :type backoff_max: :py:class:`float`
+
+                :param statuses: Response status codes that are retried
+                :type statuses: :py:class:`tuple`
+
+                :param methods: Idempotent HTTP methods
+                :type methods: :py:class:`tuple`
+
+                :param respect_retry_after: Wait as long as the Retry-After header asks
+                :type respect_retry_after: :py:class:`bool`
+
+                """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.statuses = statuses
+        self.methods = methods
+        self.respect_retry_after = respect_retry_after
+        self.stats = RetryStats()
+
+    def backoff(self, attempt):
+        """
+                :param attempt: Number of the attempt that just failed, from 1
+                :returns: A random delay between 0 and the exponential backoff cap
+                """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def _retry_after(self, headers):
+        value = headers.get('Retry-After') if headers else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            from email.utils import parsedate_tz, mktime_tz
+            date = parsedate_tz(value)
+            if date is None:
+                return None
+            return max(0.0, mktime_tz(date) - time.time())
+
+    def delay(self, method, attempt, status=None, headers=None, error=None):
+        """
+                Decide whether a failed attempt is retried.
+
+                :param method: HTTP method of the request
+                :type method: :py:class:`str`
+
+                :param attempt: Number of the attempt that just failed, from 1
+                :type attempt: :py:class:`int`
+
+                :param status: Response status code, if a response was received
+                :type status: :py:class:`int`
+
+                :param headers: Response headers, if a response was received
+
+                :param error: ``'connect'`` when no connection could be made,
+                        ``'read'`` when it broke after the request was sent
+                :type error: :py:class:`str`
+
+                :returns: Seconds to wait before the next attempt, or None to give up
+                """
+        if error == 'connect':
+            retryable = True
+        elif error == 'read':
+            retryable = method.upper() in self.methods
+        else:
+            retryable = status in self.statuses and method.upper() in self.methods
+
+        if not retryable:
+            return None
+        if attempt >= self.max_attempts:
+            self.stats.record(gave_up=1)
+            return None
+
+        delay = self.backoff(attempt)
+        if self.respect_retry_after:
+            retry_after = self._retry_after(headers)
+            if retry_after is not None:
+                delay = retry_after
+        self.stats.record(retries=1, sleep_seconds=delay)
+        return delay
+
+    def execute(self, method, send):
+        """
+                Call ``send`` until it succeeds or the policy gives up. Under a
+                :py:class:`pyosio.deadline.Deadline`, a retry that would start
+                after the deadline raises :py:class:`pyosio.errors.TimeoutError`.
+
+                :param method: HTTP method of the request
+                :type method: :py:class:`str`
+
+                :param send: Callable performing one attempt. It returns a response
+                        or raises a :py:class:`requests.exceptions.RequestException`
+
+                :returns: The last response
+                """
+        attempt = 0
+        while True:
+            attempt += 1
+            self.stats.record(attempts=1)
+            try:
+                response = send()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.HTTPError) as e:
+                failed = getattr(e, 'response', None)
+                if _connect_failed(e):
+                    delay = self.delay(method, attempt, error='connect')
+                elif failed is not None:
+                    delay = self.delay(method, attempt, failed.status_code, failed.headers)
+                else:
+                    delay = self.delay(method, attempt, error='read')
+                if delay is None:
+                    raise
+            else:
+                status = getattr(response, 'status_code', None)
+                delay = self.delay(method, attempt, status, getattr(response, 'headers', None))
+                if delay is None:
+                    return response
+                response.close()
+            deadline = current_deadline()
+            if deadline is not None and delay >= deadline.remaining():
+                raise TimeoutError(deadline.seconds)
+            time.sleep(delay)
@@ -0,0 +1,489 @@
+# coding=utf-8
+"""
+    Local time-series store of recent messages, one ring buffer file per topic.
+
+    A ring file holds fixed-width records: the date in epoch milliseconds,
+    the code of the device and one ``float64`` per payload field, NaN when
+    missing. Once ``capacity`` records are written, new ones replace the
+    oldest. Records are kept in date order, whatever order they arrive in, so
+    a time range is found by binary search over the date column. Files are memory-mapped: readers get NumPy
+    views of the records without copying, and any number of processes may
+    map the same file while one writes to it. Requires the ``numpy`` package
+    (``pip install pyosio[numpy]``).
+
+    Layout of a file: a 4096 byte header (magic, version, capacity, records
+    written, record size, schema length, merge sequence number and the JSON
+    schema), then ``capacity`` records. Device names are kept next to it, in
+    ``<file>.devices.json``.
+"""
+import json
+import os
+import threading
+import time
+
+from .backfill import epoch
+from .columnar import Categories, Decoder
+from .errors import OSIOClientError
+from .sync import StateFile
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Handle library reorganisation Python 2 > Python 3.
+try:
+    from urllib.parse import quote
+except ImportError:
+    from urllib import quote
+
+MAGIC = b'OSIORING'
+VERSION = 2
+HEADER_BYTES = 4096
+# Header words after the magic: version, capacity, written, record size, schema
+# length and merge sequence number, odd while stored records are being rewritten.
+_HEADER_WORDS = 6
+_VERSION, _CAPACITY, _WRITTEN, _RECORD_SIZE, _SCHEMA_LENGTH, _SEQUENCE = range(_HEADER_WORDS)
+
+
+def _require_numpy():
+    if numpy is None:
+        raise OSIOClientError('The ring store requires the numpy package.')
+
+
+def record_dtype(fields):
+    """
+            :returns: The NumPy dtype of the records holding ``fields``
+            """
+    return numpy.dtype([('date', '<i8'), ('device', '<i4')] + [(name, '<f8') for name in fields],
+                       align=True)
+
+
+class RingFile(object):
+
+    """
+        One memory-mapped ring buffer of records in date order.
+
+        Only one process may open a file for writing. Records older than
+        stored ones are merged into place; once the ring is full, records
+        older than all it holds are dropped. A reader sees the records
+        published by the last :py:meth:`append`. The views it gets stay valid
+        until the writer wraps around, or merges older records into their
+        range; read with ``copy=True`` to get a consistent snapshot instead.
+    """
+
+    def __init__(self, path, fields=None, capacity=None, writable=False):
+        """
+                :param path: Path of the file
+                :type path: :py:class:`str`
+
+                :param fields: Payload fields of the records, to create the file
+                :type fields: :py:class:`list`
+
+                :param capacity: Number of records, to create the file
+                :type capacity: :py:class:`int`
+
+                :param writable: Open for writing, creating the file if needed
+                :type writable: :py:class:`bool`
+
+                """
+        _require_numpy()
+        self.path = path
+        self.writable = writable
+        self.late = 0
+        self._lock = threading.Lock()
+        self._file = None
+        if writable and not os.path.exists(path):
+            if fields is None or not capacity:
+                raise OSIOClientError('Creating %s needs fields and a capacity.' % path)
+            self._create(path, list(fields), int(capacity))
+        if writable:
+            self._file = open(path, 'r+b')
+            if fcntl is not None:
+                try:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except (IOError, OSError):
+                    self._file.close()
+                    raise OSIOClientError('%s is already open for writing.' % path)
+        mode = 'r+' if writable else 'r'
+        self._header = numpy.memmap(path, dtype='<u8', mode=mode, offset=len(MAGIC),
+                                    shape=(_HEADER_WORDS,))
+        with open(path, 'rb') as f:
+            head = f.read(HEADER_BYTES)
+        if head[:len(MAGIC)] != MAGIC or int(self._header[_VERSION]) != VERSION:
+            raise OSIOClientError('%s is not a ring file.' % path)
+        start = len(MAGIC) + _HEADER_WORDS * 8
+        schema = json.loads(head[start:start + int(self._header[_SCHEMA_LENGTH])].decode('utf-8'))
+        self.fields = schema['fields']
+        if fields is not None and list(fields) != self.fields:
+            raise OSIOClientError('%s holds the fields %s.' % (path, ', '.join(self.fields)))
+        self.capacity = int(self._header[_CAPACITY])
+        self.dtype = record_dtype(self.fields)
+        if int(self._header[_RECORD_SIZE]) != self.dtype.itemsize:
+            raise OSIOClientError('%s has records of another size.' % path)
+        self.records = numpy.memmap(path, dtype=self.dtype, mode=mode, offset=HEADER_BYTES,
+                                    shape=(self.capacity,))
+
+    @staticmethod
+    def _create(path, fields, capacity):
+        schema = json.dumps({'fields': fields}).encode('utf-8')
+        header = numpy.array([VERSION, capacity, 0, record_dtype(fields).itemsize, len(schema), 0],
+                             dtype='<u8').tobytes()
+        if len(MAGIC) + len(header) + len(schema) > HEADER_BYTES:
+            raise OSIOClientError('Too many fields for a ring file.')
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        # Created under a temporary name so that no reader maps a partial header.
+        with open(path + '.tmp', 'wb') as f:
+            f.write(MAGIC + header + schema)
+            f.truncate(HEADER_BYTES + capacity * record_dtype(fields).itemsize)
+        os.rename(path + '.tmp', path)
+
+    @property
+    def written(self):
+        """
+                Records appended since the file was created
+                """
+        return int(self._header[_WRITTEN])
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    def close(self):
+        self.records = self._header = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def flush(self):
+        """
+                Write the mapped pages back to the file
+                """
+        self.records.flush()
+        self._header.flush()
+
+    # ---------------------------------------- #
+    # Writing
+    # ---------------------------------------- #
+
+    def append(self, date, device, values):
+        """
+                Store records in any order. They are sorted by date and merged
+                after the stored records of the same date or older: the cost of
+                a merge grows with the number of stored records newer than the
+                oldest record appended.
+
+                :param date: Dates in epoch milliseconds
+                :type date: :py:class:`numpy.ndarray`
+
+                :param device: Device codes
+                :type device: :py:class:`numpy.ndarray`
+
+                :param values: Arrays of payload values by field name, NaN when missing
+                :type values: :py:class:`dict`
+
+                :returns: The number of records stored, not counting those dropped
+                        for being older than all the full ring holds
+                """
+        if not self.writable:
+            raise OSIOClientError('%s is open for reading.' % self.path)
+        date = numpy.asarray(date, dtype='<i8')
+        order = numpy.argsort(date, kind='mergesort')
+        rows = numpy.zeros(len(order), dtype=self.dtype)
+        rows['date'] = date[order]
+        rows['device'] = numpy.asarray(device)[order]
+        for name in self.fields:
+            rows[name] = values[name][order] if name in values else numpy.nan
+        count = len(rows)
+        with self._lock:
+            written = self.written
+            if written >= self.capacity and count:
+                # Older than all the full ring holds: dropped without merging.
+                oldest = self.records['date'][written % self.capacity]
+                rows = rows[int(numpy.searchsorted(rows['date'], oldest, side='left')):]
+            split = written
+            if written and len(rows):
+                split = self._locate(rows['date'][0], 'right', max(0, written - self.capacity), written)
+            if split < written:
+                tail = self._copy(split, written)
+                # Positions of the new records once merged with the stored ones.
+                at = numpy.searchsorted(tail['date'], rows['date'], side='right') + numpy.arange(len(rows))
+                merged = numpy.zeros(len(tail) + len(rows), dtype=self.dtype)
+                fresh = numpy.zeros(len(merged), dtype=bool)
+                fresh[at] = True
+                merged[at] = rows
+                merged[~fresh] = tail
+            else:
+                merged, fresh = rows, numpy.ones(len(rows), dtype=bool)
+            end = split + len(merged)
+            # Only the newest records fit in the ring.
+            cut = max(0, end - self.capacity - split)
+            stored = int(fresh[cut:].sum())
+            self.late += count - stored
+            if split < written:
+                self._header[_SEQUENCE] += 1
+            position = cut
+            for lo, hi in self._slots(split + cut, end):
+                self.records[lo:hi] = merged[position:position + hi - lo]
+                position += hi - lo
+            # Published once the records are in place.
+            self._header[_WRITTEN] = end
+            if split < written:
+                self._header[_SEQUENCE] += 1
+            return stored
+
+    # ---------------------------------------- #
+    # Reading
+    # ---------------------------------------- #
+
+    def _slots(self, first, last):
+        """
+                :returns: The (start, end) slot ranges of the records numbered [first, last)
+                """
+        if first >= last:
+            return []
+        lo, hi = first % self.capacity, (last - 1) % self.capacity + 1
+        if lo < hi:
+            return [(lo, hi)]
+        return [(lo, self.capacity), (0, hi)]
+
+    def _locate(self, millis, side, first, written):
+        """
+                :returns: The number of the record a date would be inserted at,
+                        among the records numbered [first, written)
+                """
+        number = first
+        for lo, hi in self._slots(first, written):
+            found = int(numpy.searchsorted(self.records['date'][lo:hi], millis, side=side))
+            number += found
+            if found < hi - lo:
+                break
+        return number
+
+    def _copy(self, first, last):
+        parts = [self.records[lo:hi] for lo, hi in self._slots(first, last)]
+        return numpy.concatenate(parts) if parts else numpy.zeros(0, dtype=self.dtype)
+
+    def search(self, start=None, end=None, written=None):
+        """
+                :param start: Oldest date, as datetime, date, epoch seconds or ISO 8601
+                :param end: End of the range (excluded)
+                :returns: The (first, last) numbers of the records in the range
+                """
+        written = self.written if written is None else written
+        first = max(0, written - self.capacity)
+        bounds = []
+        for value, default in ((start, first), (end, written)):
+            if value is None:
+                bounds.append(default)
+            else:
+                bounds.append(self._locate(int(round(epoch(value) * 1000)), 'left', first, written))
+        return bounds[0], max(bounds[0], bounds[1])
+
+    def segments(self, start=None, end=None):
+        """
+                :returns: Views of the records in ``[start, end)``, one per
+                        contiguous part of the ring, oldest first
+                """
+        first, last = self.search(start, end)
+        return [self.records[lo:hi] for lo, hi in self._slots(first, last)]
+
+    def read(self, start=None, end=None, copy=False):
+        """
+                :param start: Oldest date, as datetime, date, epoch seconds or ISO 8601
+                :param end: End of the range (excluded)
+                :param copy: Return a copy, checked not to have been overwritten or
+                        merged into while it was taken
+                :type copy: :py:class:`bool`
+
+                :returns: A structured array of the records in ``[start, end)``: a
+                        view of the file unless the range wraps around the ring
+                """
+        while True:
+            sequence = int(self._header[_SEQUENCE])
+            written = self.written
+            first, last = self.search(start, end, written)
+            if not copy:
+                parts = [self.records[lo:hi] for lo, hi in self._slots(first, last)]
+                return parts[0] if len(parts) == 1 else self._copy(first, last)
+            rows = self._copy(first, last)
+            if not sequence % 2 and int(self._header[_SEQUENCE]) == sequence and \
+                    self.written - self.capacity <= first:
+                return rows
+
+    def dates(self, rows):
+        """
+                :returns: The dates of records as ``datetime64[ms]``
+                """
+        return rows['date'].view('datetime64[ms]')
+
+
+class RingStoreStats(object):
+
+    """
+        Counters kept by a :py:class:`RingStore`.
+    """
+
+    def __init__(self):
+        self.messages = 0
+        self.records = 0
+
+    def as_dict(self):
+        return {'messages': self.messages, 'records': self.records}
+
+
+class RingStore(object):
+
+    """
+        A directory of ring files, one per topic, fed from message pages,
+        paginated iterators and streams.
+
+            store = RingStore('dashboard', ['temperature', 'humidity'])
+            store.feed(osio_client.get_topics_sd(topic))
+
+            reader = RingStore('dashboard', ['temperature', 'humidity'], writable=False)
+            rows = reader.read(topic, start=time.time() - 3600)
+            print(rows['temperature'].mean())
+
+    """
+    DEFAULT_CAPACITY = 1024 * 1024
+    DEFAULT_BATCH_SIZE = 1000
+    DEFAULT_FLUSH_INTERVAL = 1.0
+
+    def __init__(self, root, fields, capacity=DEFAULT_CAPACITY, writable=True):
+        """
+                :param root: Directory of the ring files
+                :type root: :py:class:`str`
+
+                :param fields: Numeric payload fields stored
+                :type fields: :py:class:`list`
+
+                :param capacity: Records per topic of the files created
+                :type capacity: :py:class:`int`
+
+                :param writable: Open the files for writing; one process at most may do so
+                :type writable: :py:class:`bool`
+
+                """
+        _require_numpy()
+        self.root = root
+        self.fields = list(fields)
+        self.capacity = capacity
+        self.writable = writable
+        self.stats = RingStoreStats()
+        self._files = {}
+        self._devices = {}
+        self._decoder = Decoder(dict((name, numpy.float64) for name in self.fields))
+        self._lock = threading.Lock()
+
+    def path(self, topic):
+        return os.path.join(self.root, quote(topic, safe='') + '.ring')
+
+    def file(self, topic):
+        """
+                :returns: The :py:class:`RingFile` of a topic
+                """
+        with self._lock:
+            ring = self._files.get(topic)
+            if ring is None:
+                if not self.writable and not os.path.exists(self.path(topic)):
+                    raise OSIOClientError('No ring file for %s.' % topic)
+                ring = self._files[topic] = RingFile(self.path(topic), self.fields, self.capacity,
+                                                     self.writable)
+            return ring
+
+    def devices(self, topic):
+        """
+                :returns: The device names of a topic, by code
+                """
+        return StateFile(self.path(topic) + '.devices.json').get('devices', [])
+
+    def _device_codes(self, topic, names):
+        categories = self._devices.get(topic)
+        if categories is None:
+            categories = self._devices[topic] = Categories()
+            for name in self.devices(topic):
+                categories.code(name)
+        known = len(categories)
+        codes = categories.encode(names)
+        if len(categories) > known:
+            StateFile(self.path(topic) + '.devices.json').update('devices', categories.values)
+        return codes
+
+    def append(self, topic, messages):
+        """
+                Store messages of a topic
+
+                :param messages: A message page or a list of messages, in any order
+                :returns: The number of records written
+                """
+        batch = self._decoder.decode(messages)
+        dated = ~numpy.isnat(batch.date)
+        ring = self.file(topic)
+        devices = self._device_codes(topic, list(batch.labels('device')[dated]))
+        values = dict((name, batch[name].values[dated]) for name in self.fields)
+        written = ring.append(batch.date[dated].astype('<i8'), devices, values)
+        self.stats.messages += len(batch)
+        self.stats.records += written
+        return written
+
+    def feed(self, items, topic=None, batch_size=DEFAULT_BATCH_SIZE,
+             flush_interval=DEFAULT_FLUSH_INTERVAL):
+        """
+                Store the messages of an iterable of messages, of message pages or
+                of lists of messages, e.g. a paginated iterator (newest first) or
+                a stream
+
+                :param topic: Topic of the messages, by default their ``topic`` field
+                :param batch_size: Messages of a stream written at a time
+                :type batch_size: :py:class:`int`
+
+                :param flush_interval: Seconds after which the messages received are
+                        written even if fewer than ``batch_size``, so that a slow
+                        stream becomes visible to readers
+                :type flush_interval: :py:class:`float`
+
+                :returns: The number of records written
+                """
+        written = 0
+        pending = []
+        flushed = time.time()
+        for item in items:
+            if isinstance(item, dict) and 'messages' in item:
+                item = item['messages'] or []
+            pending.extend(item if isinstance(item, list) else [item])
+            if len(pending) >= batch_size or (pending and time.time() - flushed >= flush_interval):
+                written += self._store(pending, topic)
+                pending = []
+                flushed = time.time()
+        return written + self._store(pending, topic)
+
+    def _store(self, messages, topic):
+        if topic is not None:
+            return self.append(topic, messages) if messages else 0
+        topics = {}
+        for message in messages:
+            topics.setdefault(message.get('topic'), []).append(message)
+        return sum(self.append(name, group) for name, group in topics.items() if name is not None)
+
+    def read(self, topic, start=None, end=None, copy=False):
+        """
+                :returns: The records of a topic in ``[start, end)``, see :py:meth:`RingFile.read`
+                """
+        return self.file(topic).read(start, end, copy)
+
+    def flush(self):
+        for ring in list(self._files.values()):
+            ring.flush()
+
+    def close(self):
+        with self._lock:
+            for ring in self._files.values():
+                ring.close()
+            self._files = {}
@@ -0,0 +1,98 @@
+# coding=utf-8
+import threading
+
+from .deadline import current_deadline
+from .errors import TimeoutError
+
+
+class SingleFlightStats(object):
+
+    """
+        Counters kept by a :py:class:`SingleFlight`.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.collapsed = 0
+
+    def as_dict(self):
+        return {'calls': self.calls, 'collapsed': self.collapsed}
+
+
+class _Call(object):
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+
+    """
+        Coalesce identical concurrent calls.
+
+        While a call for a key is in flight, other callers with the same key wait
+        for it and receive its result (or its exception) instead of issuing their
+        own. Nothing is remembered once the call returns.
+
+    """
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, share=None):
+        """
+                :param key: Hashable identity of the call
+                :param fn: Callable doing the work, run by the first caller only
+                :param share: Callable applied to the result handed to every other
+                        caller, e.g. :py:func:`share_json`
+
+                :returns: The result of ``fn``
+                """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+                self.stats.calls += 1
+            else:
+                leader = False
+                self.stats.collapsed += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result
+
+        deadline = current_deadline()
+        if not call.done.wait(deadline.remaining() if deadline is not None else None):
+            raise TimeoutError(deadline.seconds)
+        if call.error is not None:
+            raise call.error
+        return share(call.result) if share is not None else call.result
+
+
+def share_json(response):
+    """
+            Copy a response handed to several callers. The copy shares the body
+            but decodes its JSON on its own, so a caller changing the decoded
+            object does not change what the others see.
+
+            :returns: A shallow copy of ``response``
+            """
+    shared = object.__new__(type(response))
+    shared.__dict__.update(response.__dict__)
+    shared.__dict__.pop('_decoded_json', None)
+    return shared
@@ -0,0 +1,245 @@
+# coding=utf-8
+"""
+    Incremental synchronisation of message history.
+
+    A :py:class:`Watermark` per topic, device or user records what has been
+    handed off so far: the date of the newest message and the ids of the
+    messages at that date. A sync run fetches from the watermark on, one time
+    window at a time, skips the messages the watermark names, and saves the
+    new watermark to a :py:class:`StateFile` once the batch of a window has
+    been consumed. An interrupted run resumes from the last batch consumed:
+    no message is missed, and only the messages sharing the watermark date
+    are fetched again.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+from .backfill import ShardPlanner, epoch, message_time
+from .errors import OSIOClientError
+from .pagination import ITERATORS, format_date, parse_date
+
+# os.rename does not replace an existing file on Windows.
+_replace = getattr(os, 'replace', os.rename)
+
+
+def message_id(message):
+    """
+            :returns: The ``id`` of a message, or a digest of its content when it has none
+            """
+    if isinstance(message, dict) and message.get('id') is not None:
+        return message['id']
+    text = json.dumps(message, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class StateFile(object):
+
+    """
+        A JSON object on disk. Every update rewrites a temporary file, syncs
+        it and renames it over the previous state, so the file always holds
+        either the old or the new state whatever happens to the process.
+        Updates are serialised within a process; the file should not be
+        shared between processes.
+    """
+
+    def __init__(self, path):
+        """
+                :param path: Path of the state file
+                :type path: :py:class:`str`
+
+                """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+                :returns: The saved state, empty when there is none yet
+                """
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (IOError, OSError):
+            return {}
+
+    def get(self, name, default=None):
+        return self.load().get(name, default)
+
+    def update(self, name, value):
+        """
+                Save ``value`` under ``name``, or remove ``name`` when ``value`` is None
+                """
+        with self._lock:
+            state = self.load()
+            if value is None:
+                state.pop(name, None)
+            else:
+                state[name] = value
+            self._save(state)
+
+    def _save(self, state):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump(state, f, sort_keys=True, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        _replace(self.path + '.tmp', self.path)
+
+
+class Watermark(namedtuple('Watermark', 'date ids')):
+
+    """
+        The ``date`` of the newest message handed off, as found in the message,
+        and the :py:func:`message_id` of every message handed off at that date.
+    """
+    __slots__ = ()
+
+    @property
+    def seconds(self):
+        return parse_date(self.date)
+
+    def as_dict(self):
+        return {'date': self.date, 'ids': list(self.ids)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['date'], tuple(data.get('ids') or ()))
+
+
+class IncrementalSync(object):
+
+    """
+        Fetches only the messages newer than the watermark of a topic, device
+        or user, and advances the watermark once they have been handed off.
+
+            sync = IncrementalSync(osio_client, 'mirror/state.json')
+            for batch in sync.batches('topic', topic, start_date='2016-01-01'):
+                store(batch)
+
+        Every batch holds the messages of one time window in date order. The
+        watermark of a batch is saved when the next batch is requested or the
+        iteration ends, so a batch whose processing fails or is interrupted is
+        handed off again by the next run.
+    """
+    DEFAULT_WINDOW_SECONDS = 3600
+
+    def __init__(self, client, path, window_seconds=DEFAULT_WINDOW_SECONDS,
+                 target_messages=ShardPlanner.DEFAULT_TARGET_MESSAGES, prefetch=0):
+        """
+                :param client: Client whose paginated message iterators are used
+                :type client: :py:class:`pyosio.osio.OpenSensorsAPI`
+
+                :param path: Path of the state file holding the watermarks
+                :type path: :py:class:`str`
+
+                :param window_seconds: Length of the first window of a run; later
+                        windows are sized to hold about ``target_messages``
+                :type window_seconds: :py:class:`int`
+
+                :param target_messages: Number of messages a window should hold
+                :type target_messages: :py:class:`int`
+
+                :param prefetch: Pages fetched ahead while a batch is consumed
+                :type prefetch: :py:class:`int`
+
+                """
+        self.client = client
+        self.state = StateFile(path)
+        self.window_seconds = window_seconds
+        self.target_messages = target_messages
+        self.prefetch = prefetch
+
+    @staticmethod
+    def _name(kind, key):
+        return '%s:%s' % (kind, key)
+
+    def watermark(self, kind, key):
+        """
+                :returns: The saved :py:class:`Watermark` of a key, or None
+                """
+        data = self.state.get(self._name(kind, key))
+        return Watermark.from_dict(data) if data else None
+
+    def reset(self, kind, key):
+        """
+                Forget the watermark of a key: the next run starts over from its ``start_date``
+                """
+        self.state.update(self._name(kind, key), None)
+
+    def batches(self, kind, key, start_date=None, end_date=None, queryparams=None):
+        """
+                Hand off the messages newer than the watermark of a key
+
+                :param kind: topic, device or user
+                :type kind: :py:class:`str`
+
+                :param key: Topic, client id or user id
+                :type key: :py:class:`str`
+
+                :param start_date: Oldest message of the first run, when the key
+                        has no watermark yet
+                :param end_date: Newest message of the run (included), now by default
+
+                :param queryparams: Other query string parameters of the endpoint
+                :type queryparams: :py:class:`dict`
+
+                :returns: A generator of lists of messages
+                """
+        if kind not in ITERATORS:
+            raise ValueError('Cannot sync messages of a %s.' % kind)
+        name = self._name(kind, key)
+        mark = self.watermark(kind, key)
+        if mark is None:
+            if start_date is None:
+                raise OSIOClientError('%s has no watermark yet, a start_date is needed.' % name)
+            mark = Watermark(format_date(start_date), ())
+        end = epoch(end_date, time.time())
+        if mark.seconds > end:
+            return
+        iterate = getattr(self.client, ITERATORS[kind])
+        planner = ShardPlanner(mark.seconds, end, self.window_seconds, self.target_messages)
+        # The window ending at ``end`` includes it: later messages dated at
+        # the end are told apart by the ids of the watermark.
+        windows = iter(planner) if mark.seconds < end else iter([(end, end)])
+        for start, stop in windows:
+            last = stop >= end
+            skip = set(mark.ids)
+            pages = iterate(key, start_date=mark.date if start == mark.seconds else format_date(start),
+                            end_date=format_date(stop), queryparams=queryparams, pages=True,
+                            prefetch=self.prefetch)
+            batch = []
+            for page in pages:
+                for message in page:
+                    when = message_time(message)
+                    if when is None or when < start or when > stop or (when == stop and not last):
+                        continue
+                    if when == mark.seconds and message_id(message) in skip:
+                        continue
+                    batch.append((when, message))
+            batch.sort(key=lambda item: item[0])
+            planner.observe(stop - start, len(batch))
+            if not batch:
+                continue
+            yield [message for _, message in batch]
+
+            newest, message = batch[-1]
+            ids = [message_id(m) for when, m in batch if when == newest]
+            if newest == mark.seconds:
+                ids = list(mark.ids) + ids
+            mark = Watermark(message['date'], tuple(ids))
+            self.state.update(name, mark.as_dict())
+
+    def messages(self, kind, key, start_date=None, end_date=None, queryparams=None):
+        """
+                The messages of :py:meth:`batches` one at a time
+
+                :returns: A generator of messages
+                """
+        for batch in self.batches(kind, key, start_date, end_date, queryparams):
+            for message in batch:
+                yield message
@@ -0,0 +1,197 @@
+# coding=utf-8
+import threading
+import time
+import zlib
+
+from . import codec
+from .lazy import lazy_import
+
+requests = lazy_import('requests')
+
+
+def accept_encoding():
+    """
+            :returns: The content encodings urllib3 can decode, including br/zstd
+                    when the brotli/zstandard decoders are installed
+            """
+    try:
+        from urllib3.util.request import ACCEPT_ENCODING
+    except ImportError:
+        try:
+            from requests.packages.urllib3.util.request import ACCEPT_ENCODING
+        except ImportError:
+            ACCEPT_ENCODING = 'gzip,deflate'
+    return ACCEPT_ENCODING
+
+
+def gzip_compress(data, level=6):
+    """
+            :returns: ``data`` in the gzip format
+            """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+class TransferStats(object):
+
+    """
+        Byte counters kept by a :py:class:`Transport`. ``wire_bytes`` is the
+        size of the (compressed) response bodies as received and
+        ``decoded_bytes`` their size once decompressed; ``sent_bytes`` and
+        ``sent_wire_bytes`` are the same for request bodies. Streamed responses
+        are not counted.
+    """
+
+    def __init__(self):
+        self.responses = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self.sent_bytes = 0
+        self.sent_wire_bytes = 0
+        self._lock = threading.Lock()
+
+    def record(self, wire_bytes=0, decoded_bytes=0, sent_bytes=0, sent_wire_bytes=0, responses=0):
+        with self._lock:
+            self.responses += responses
+            self.wire_bytes += wire_bytes
+            self.decoded_bytes += decoded_bytes
+            self.sent_bytes += sent_bytes
+            self.sent_wire_bytes += sent_wire_bytes
+
+    def as_dict(self):
+        return {'responses': self.responses, 'wire_bytes': self.wire_bytes,
+                'decoded_bytes': self.decoded_bytes, 'sent_bytes': self.sent_bytes,
+                'sent_wire_bytes': self.sent_wire_bytes}
+
+
+class Transport(object):
+
+    """
+        Pooled keep-alive HTTP transport used by OpenSensorsAPI.
+
+        A single :py:class:`requests.Session` is shared by every handler so that
+        TCP/TLS connections to the API are reused across calls. The underlying
+        urllib3 pools are thread-safe; the session is recreated (dropping all
+        pooled sockets) once it has been idle for longer than ``idle_timeout``.
+
+        Responses are requested compressed with every encoding urllib3 can
+        decode (gzip, deflate, and br/zstd when brotli/zstandard are installed).
+        JSON request bodies of at least ``compress_min_bytes`` are sent gzipped.
+
+        Any object exposing ``request(method, url, **kwargs)`` returning a
+        :py:class:`requests.Response` and a ``close()`` method can be used
+        in place of this class.
+
+    """
+    DEFAULT_POOL_CONNECTIONS = 10
+    DEFAULT_POOL_MAXSIZE = 10
+    DEFAULT_IDLE_TIMEOUT = 60
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, pool_block=False,
+                 compress_min_bytes=None):
+        """
+                Initialize the transport.
+
+                :param pool_connections: Number of host pools to keep.
+                :type pool_connections: :py:class:`int`
+
+                :param pool_maxsize: Maximum number of connections kept per host.
+                :type pool_maxsize: :py:class:`int`
+
+                :param idle_timeout: Seconds of inactivity after which pooled
+                        connections are dropped. ``None`` disables eviction.
+                :type idle_timeout: :py:class:`float`
+
+                :param pool_block: Block when all connections of a host are in use
+                        instead of opening an extra, non-pooled connection.
+                :type pool_block: :py:class:`bool`
+
+                :param compress_min_bytes: Gzip JSON request bodies of at least this
+                        size. ``None`` sends every body uncompressed.
+                :type compress_min_bytes: :py:class:`int`
+
+                """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.idle_timeout = idle_timeout
+        self.pool_block = pool_block
+        self.compress_min_bytes = compress_min_bytes
+        self.stats = TransferStats()
+        self._lock = threading.Lock()
+        self._session = None
+        self._last_used = 0
+
+    def _new_session(self):
+        """
+                :returns: A session with a sized connection pool mounted
+                """
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize,
+                              pool_block=self.pool_block)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['Accept-Encoding'] = accept_encoding()
+        return session
+
+    @property
+    def session(self):
+        """
+                The shared session, evicting idle connections first if needed.
+                """
+        with self._lock:
+            now = time.time()
+            if self._session is None:
+                self._session = self._new_session()
+            elif self.idle_timeout is not None and now - self._last_used > self.idle_timeout:
+                self._session.close()
+                self._session = self._new_session()
+            self._last_used = now
+            return self._session
+
+    def request(self, method, url, **kwargs):
+        """
+                Send a request through the pooled session
+
+                :param method: HTTP method
+                :type method: :py:class:`str`
+
+                :param url: Absolute url
+                :type url: :py:class:`str`
+
+                :returns: The Reponse from the server
+                """
+        sent = sent_wire = 0
+        if kwargs.get('json') is not None:
+            body = codec.dumps(kwargs.pop('json'))
+            headers = dict(kwargs.get('headers') or {}, **{'Content-Type': 'application/json'})
+            sent = len(body)
+            if self.compress_min_bytes is not None and sent >= self.compress_min_bytes:
+                body = gzip_compress(body)
+                headers['Content-Encoding'] = 'gzip'
+            sent_wire = len(body)
+            kwargs['data'] = body
+            kwargs['headers'] = headers
+
+        response = self.session.request(method, url, **kwargs)
+
+        if kwargs.get('stream'):
+            self.stats.record(sent_bytes=sent, sent_wire_bytes=sent_wire)
+        else:
+            decoded = len(response.content)
+            raw = getattr(response, 'raw', None)
+            wire = raw.tell() if hasattr(raw, 'tell') else decoded
+            self.stats.record(wire_bytes=wire, decoded_bytes=decoded, sent_bytes=sent,
+                              sent_wire_bytes=sent_wire, responses=1)
+        return response
+
+    def close(self):
+        """
+                Close every pooled connection.
+                """
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
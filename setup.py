@@ -18,9 +18,13 @@ setup(
         'License :: OSI Approved :: MIT License',
         'Programming Language :: Python :: 2',
         'Programming Language :: Python :: 2.6',
-        'Programming Language :: Python :: 2.7'
+        'Programming Language :: Python :: 2.7',
+        'Programming Language :: Python :: 3'
     ],
     keywords='IoT',
     packages=find_packages(),
     install_requires=['requests','sseclient','pyyaml'],
+    extras_require={'async': ['aiohttp'], 'fast': ['orjson; python_version >= "3"'],
+                    'numpy': ['numpy'], 'pandas': ['numpy', 'pandas'],
+                    'parquet': ['numpy', 'pyarrow']},
 )
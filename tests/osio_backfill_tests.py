@@ -0,0 +1,83 @@
+# coding=utf-8
+
+from benchmarks.mock_server import MockServer
+from pyosio.osio import OpenSensorsAPI
+from pyosio.backfill import ShardPlanner
+from pyosio.pagination import format_date, parse_date
+import json
+import threading
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400
+# A sparse day of one message an hour followed by a dense hour of one a second.
+TIMES = [i * 3600 for i in range(24)] + [DAY + i for i in range(3600)]
+MESSAGES = [{'date': format_date(t), 'payload': {'text': str(t)}} for t in TIMES]
+PAGE_SIZE = 500
+
+
+class HistoryHandler(object):
+
+    def __init__(self):
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, method, path, query, body, headers):
+        with self._lock:
+            self.requests += 1
+        start, end = parse_date(query['start-date']), parse_date(query['end-date'])
+        # Both ends inclusive and newest first, as a server may well do.
+        selected = [m for m in reversed(MESSAGES) if start <= parse_date(m['date']) <= end]
+        offset = int(query.get('cursor', 0))
+        page = {'messages': selected[offset:offset + PAGE_SIZE]}
+        if offset + PAGE_SIZE < len(selected):
+            page['next'] = '%s?start-date=%s&end-date=%s&cursor=%d' % (
+                path, query['start-date'], query['end-date'], offset + PAGE_SIZE)
+        return 200, {}, json.dumps(page).encode('utf-8')
+
+
+class OSIOBackfillTests(unittest.TestCase):
+
+    def setUp(self):
+        self._handler = HistoryHandler()
+        self._server = MockServer(self._handler).__enter__()
+        self._api = OpenSensorsAPI('user', 'key', coalesce=False)
+        self._api.base_url = self._server.url
+
+    def tearDown(self):
+        self._api.close()
+        self._server.__exit__()
+
+    def test_planner_adapts_to_density(self):
+        planner = ShardPlanner(0, 10 * DAY, 3600, target_messages=100)
+        shards = iter(planner)
+        next(shards)
+        planner.observe(3600, 1)
+        self.assertEqual(next(shards)[1] - 3600, 100 * 3600)
+        planner.observe(100 * 3600, 0)
+        self.assertEqual(planner.seconds, 200 * 3600)
+        planner.observe(60, 60 * 1000)
+        self.assertEqual(planner.seconds, ShardPlanner.DEFAULT_MIN_SECONDS)
+
+    def test_ordered_without_duplicates(self):
+        messages = list(self._api.backfill_topic_msgs('t', 0, 2 * DAY, max_workers=4))
+        self.assertEqual(messages, MESSAGES)
+
+    def test_shards_follow_density(self):
+        messages = list(self._api.backfill_topic_msgs('t', 0, 2 * DAY, max_workers=2,
+                                                      shard_seconds=600, target_messages=1000))
+        self.assertEqual(len(messages), len(MESSAGES))
+        # 288 fixed ten minute shards; growing them across the sparse day
+        # needs a fraction of the requests.
+        self.assertTrue(self._handler.requests < 60)
+
+    def test_end_date_excluded(self):
+        messages = list(self._api.backfill_topic_msgs('t', DAY, DAY + 10, max_workers=2))
+        self.assertEqual(messages, MESSAGES[24:34])
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
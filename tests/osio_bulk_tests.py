@@ -0,0 +1,112 @@
+# coding=utf-8
+
+from benchmarks.mock_server import MockServer
+from pyosio.osio import OpenSensorsAPI
+from pyosio.errors import OSIOClientApiError
+from pyosio.bulk import ChunkPlanner, split_result
+from pyosio.query import MessageQuery
+import json
+import threading
+import unittest
+import logging
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+DATASETS = ['d%d' % i for i in range(1000)]
+
+
+def dataset_messages(dataset_id):
+    return [{'dataset-id': dataset_id, 'date': '2016-01-01T00:00:0%dZ' % i, 'payload': {'value': i}}
+            for i in range(3)]
+
+
+class BulkHandler(object):
+
+    def __init__(self, max_ids=None):
+        self.max_ids = max_ids
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def __call__(self, method, path, query, body, headers):
+        if method != 'POST' or path != '/v2/public/messages/dataset/bulk':
+            return 404, {}, b'{}'
+        data = json.loads(body.decode('utf-8'))
+        ids = data['dataset-ids']
+        with self._lock:
+            self.requests.append(data)
+        if self.max_ids is not None and len(ids) > self.max_ids:
+            return 413, {}, b'{}'
+        messages = [message for dataset_id in ids if dataset_id != 'empty'
+                    for message in dataset_messages(dataset_id)]
+        return 200, {}, json.dumps({'messages': messages}).encode('utf-8')
+
+
+class OSIOBulkTests(unittest.TestCase):
+
+    def setUp(self):
+        self._handler = BulkHandler()
+        self._server = MockServer(self._handler).__enter__()
+        self._api = OpenSensorsAPI('user', 'key', version='v2')
+        self._api.base_url = self._server.url
+
+    def tearDown(self):
+        self._api.close()
+        self._server.__exit__()
+
+    def test_endpoint(self):
+        result = self._api.get_bulk_pub_dataset_msgs({'dataset-ids': ['a', 'b']})
+        self.assertEqual(len(result['messages']), 6)
+
+    def test_split_result(self):
+        self.assertEqual(split_result({'a': {'messages': [1]}, 'b': [2]}, ['a', 'b', 'c']),
+                         [('a', [1]), ('b', [2]), ('c', [])])
+        self.assertEqual(split_result({'messages': dataset_messages('a')}, ['b', 'a']),
+                         [('b', []), ('a', dataset_messages('a'))])
+
+    def test_planner(self):
+        planner = ChunkPlanner(DATASETS + DATASETS[:10], chunk_size=100, workers=8)
+        self.assertEqual(len(planner.dataset_ids), 1000)
+        chunks = iter(planner)
+        self.assertEqual(len(next(chunks)), 100)
+        planner.observe(100, 100 * 16 * 1024)
+        self.assertEqual(len(next(chunks)), 256)
+        planner.reject(200)
+        self.assertEqual(len(next(chunks)), 100)
+        # Spread over the workers when there are few datasets.
+        self.assertEqual(ChunkPlanner(DATASETS[:40], chunk_size=100, workers=8).chunk_size, 5)
+
+    def test_fetches_every_dataset_in_chunks(self):
+        results = dict(self._api.iter_bulk_pub_dataset_msgs(DATASETS + ['empty'], start_date='2016-01-01',
+                                                             max_workers=4, chunk_size=100))
+        self.assertEqual(sorted(results), sorted(DATASETS + ['empty']))
+        self.assertEqual(results['d7'], dataset_messages('d7'))
+        self.assertEqual(results['empty'], [])
+        self.assertTrue(len(self._handler.requests) <= 11)
+        self.assertEqual(self._handler.requests[0]['start-date'], '2016-01-01')
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_query_filters(self):
+        query = MessageQuery(start_date='2016-01-01').where('value', '>=', 1)
+        results = dict(self._api.iter_bulk_pub_dataset_msgs(['a', 'b'], queryparams=query))
+        self.assertEqual(results['a'], [m for m in dataset_messages('a') if m['payload']['value'] >= 1])
+        self.assertEqual(self._handler.requests[0]['start-date'], '2016-01-01T00:00:00Z')
+
+    def test_splits_rejected_chunks(self):
+        self._handler.max_ids = 30
+        results = dict(self._api.iter_bulk_pub_dataset_msgs(DATASETS[:200], max_workers=2, chunk_size=100))
+        self.assertEqual(sorted(results), sorted(DATASETS[:200]))
+
+    def test_requires_v2(self):
+        self._api.version = 'v1'
+        with self.assertRaises(OSIOClientApiError):
+            list(self._api.iter_bulk_pub_dataset_msgs(DATASETS[:10]))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
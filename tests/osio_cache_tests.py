@@ -0,0 +1,102 @@
+# coding=utf-8
+
+from pyosio.cache import MetadataCache
+from tests.osio_endpoints_tests import RecordingAPI, make_response
+import time
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class OSIOMetadataCacheTests(unittest.TestCase):
+
+    def test_ttl_expiry(self):
+        cache = MetadataCache(default_ttl=0.01)
+        cache.put('get_org_meta', ('o',), {})
+        self.assertEqual(cache.get('get_org_meta', ('o',)), (True, {}))
+        time.sleep(0.02)
+        self.assertEqual(cache.get('get_org_meta', ('o',)), (False, None))
+        self.assertEqual(cache.stats.expirations, 1)
+
+    def test_lru_eviction(self):
+        cache = MetadataCache(max_entries=2)
+        cache.put('get_org_meta', ('a',), 1)
+        cache.put('get_org_meta', ('b',), 2)
+        cache.get('get_org_meta', ('a',))
+        cache.put('get_org_meta', ('c',), 3)
+        self.assertEqual(cache.get('get_org_meta', ('b',)), (False, None))
+        self.assertEqual(cache.get('get_org_meta', ('a',)), (True, 1))
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_zero_ttl_disables(self):
+        cache = MetadataCache(ttls={'get_org_devices': 0})
+        cache.put('get_org_devices', ('o',), [])
+        self.assertEqual(len(cache), 0)
+
+    def test_prefix_invalidation(self):
+        cache = MetadataCache()
+        cache.put('get_device_meta', ('u', 'd1', ()), 1)
+        cache.put('get_device_meta', ('u', 'd2', ()), 2)
+        cache.put('get_device_meta', ('x', 'd1', ()), 3)
+        cache.invalidate('get_device_meta', ('u',))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats.invalidations, 2)
+
+    def test_versions_kept_apart(self):
+        cache = MetadataCache()
+        cache.put('get_user_topics', ('u',), 1, 'v1')
+        self.assertEqual(cache.get('get_user_topics', ('u',), 'v2'), (False, None))
+        self.assertEqual(cache.get('get_user_topics', ('u',), 'v1'), (True, 1))
+
+    def test_endpoint_invalidation(self):
+        client = RecordingAPI('u', 'k', metadata_cache=MetadataCache())
+        first = client.get_device_meta('u', 'd')
+        self.assertTrue(client.get_device_meta('u', client_id='d') is first)
+        client.get_device_meta('u', 'other')
+        client.get_user_devices('u')
+        self.assertEqual(len(client.sent), 3)
+        # Drops the entries of this device and the device list, not other devices.
+        client.update_device_meta('u', 'd', {})
+        client.get_device_meta('u', 'd')
+        client.get_device_meta('u', 'other')
+        client.get_user_devices('u')
+        self.assertEqual([url for method, url, _ in client.sent[4:]],
+                         ['/v1/users/u/devices/d', '/v1/users/u/devices'])
+        self.assertEqual(client.cache_stats['invalidations'], 2)
+
+    def test_error_not_cached(self):
+        client = RecordingAPI('u', 'k', metadata_cache=MetadataCache())
+        responses = [make_response(500, b'{"error": "boom"}'), make_response(200, b'{"name": "d"}')]
+
+        def get(url, supported_versions, **queryparams):
+            client.sent.append(('GET', url, queryparams))
+            return responses.pop(0)
+
+        client._get = get
+        self.assertEqual(client.get_device_meta('u', 'd'), {'error': 'boom'})
+        self.assertEqual(client.get_device_meta('u', 'd'), {'name': 'd'})
+        self.assertEqual(len(client.sent), 2)
+        self.assertEqual(client.get_device_meta('u', 'd'), {'name': 'd'})
+        self.assertEqual(client.cache_stats['hits'], 1)
+
+    def test_org_writes_invalidate_schemas(self):
+        client = RecordingAPI('u', 'k', version='v2', metadata_cache=MetadataCache())
+        client._delete = client._put
+        for write in (lambda: client.update_org('o', {}), lambda: client.delete_org('o')):
+            client.get_schemas('o')
+            write()
+            client.get_schemas('o')
+        # Fetched again after each write, and served from the cache in between.
+        self.assertEqual([method for method, _, _ in client.sent], ['GET', 'PUT', 'GET', 'PUT', 'GET'])
+
+    def test_endpoints_without_cache(self):
+        client = RecordingAPI('u', 'k')
+        client.get_device_meta('u', 'd')
+        client.get_device_meta('u', 'd')
+        self.assertEqual(len(client.sent), 2)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,46 @@
+# coding=utf-8
+
+from pyosio import codec
+import requests
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+MESSAGE = {'device': 'd', 'topic': '/users/u/t', 'payload': {'text': u'21.5 °C'}}
+
+
+class OSIOCodecTests(unittest.TestCase):
+
+    def tearDown(self):
+        codec.set_codec(codec.available()[0])
+
+    def test_round_trip_every_codec(self):
+        for name in codec.available():
+            c = codec.get_codec(name)
+            data = c.dumps(MESSAGE)
+            self.assertTrue(isinstance(data, bytes), name)
+            self.assertEqual(c.loads(data), MESSAGE, name)
+            self.assertEqual(c.loads(data.decode('utf-8')), MESSAGE, name)
+
+    def test_non_standard_floats(self):
+        for name in codec.available():
+            self.assertEqual(codec.get_codec(name).loads(b'{"v": Infinity}'), {'v': float('inf')}, name)
+
+    def test_invalid_json(self):
+        self.assertRaises(ValueError, codec.loads, b'{"v": ')
+
+    def test_set_codec(self):
+        codec.set_codec('json')
+        self.assertEqual(codec.get_codec().name, 'json')
+        self.assertRaises(ValueError, codec.set_codec, 'no-such-codec')
+
+    def test_decode_response_once(self):
+        response = requests.Response()
+        response._content = b'{"messages": []}'
+        self.assertTrue(codec.decode_response(response) is codec.decode_response(response))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
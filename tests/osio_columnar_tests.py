@@ -0,0 +1,75 @@
+# coding=utf-8
+
+from benchmarks.mock_server import MockServer
+from pyosio.osio import OpenSensorsAPI
+from tests.osio_pagination_tests import PagesHandler
+import json
+import unittest
+import logging
+
+try:
+    import numpy
+    from pyosio.columnar import Decoder, decode, parse_dates
+except ImportError:
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+
+def message(i, **payload):
+    return {'date': '2016-01-01T00:00:%02d.250Z' % i, 'device': 'device-%d' % (i % 2),
+            'topic': '/users/u/t', 'payload': {'text': json.dumps(payload)}}
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class OSIOColumnarTests(unittest.TestCase):
+
+    def test_dates(self):
+        dates = parse_dates(['2016-01-01T00:00:00.5Z', '2016-01-01T01:00:00+01:00', None])
+        self.assertEqual(dates.dtype, numpy.dtype('datetime64[ms]'))
+        self.assertEqual(dates[0], numpy.datetime64('2016-01-01T00:00:00.500'))
+        self.assertEqual(dates[1], numpy.datetime64('2016-01-01T00:00:00'))
+        self.assertTrue(numpy.isnat(dates[2]))
+
+    def test_decode_page(self):
+        page = {'messages': [message(0, temperature=20.5, count=1, ok=True, name='a'),
+                             message(1, temperature=21, ok=False),
+                             {'date': None, 'payload': {'text': 'not json'}}]}
+        batch = decode(page)
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(list(batch.codes['device']), [0, 1, -1])
+        self.assertEqual(list(batch.labels('device')), ['device-0', 'device-1', None])
+        self.assertEqual(sorted(batch.fields), ['count', 'ok', 'temperature'])
+        self.assertEqual(batch['temperature'].values.dtype, numpy.float64)
+        self.assertEqual(batch['count'].values.dtype, numpy.int64)
+        self.assertEqual(batch['ok'].values.dtype, numpy.bool_)
+        self.assertEqual(list(batch['count'].mask), [False, True, True])
+        self.assertEqual(batch['temperature'].masked().mean(), 20.75)
+
+    def test_fixed_fields(self):
+        batch = decode([message(0, temperature=20, count=1)], fields={'temperature': 'f4'})
+        self.assertEqual(list(batch.fields), ['temperature'])
+        self.assertEqual(batch['temperature'].values.dtype, numpy.float32)
+
+    def test_codes_stable_across_batches(self):
+        decoder = Decoder(['temperature'])
+        first = decoder.decode([message(1), message(2)])
+        second = decoder.decode([message(3), message(4)])
+        self.assertEqual(list(first.codes['device']), [0, 1])
+        self.assertEqual(list(second.codes['device']), [0, 1])
+        self.assertEqual(decoder.categories['device'].values, ['device-1', 'device-0'])
+
+    def test_paginator_columns(self):
+        with MockServer(PagesHandler()) as server:
+            api = OpenSensorsAPI('user', 'key')
+            api.base_url = server.url
+            batches = list(api.iter_topic_msgs('t').columns())
+            api.close()
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        self.assertEqual(numpy.concatenate([batch.date for batch in batches])[-1],
+                         numpy.datetime64('2016-01-01T00:00:24'))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,51 @@
+# coding=utf-8
+
+from pyosio.deadline import Deadline, current_deadline
+from pyosio.errors import TimeoutError
+import threading
+import time
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class OSIODeadlineTests(unittest.TestCase):
+
+    def test_clamp(self):
+        deadline = Deadline(2)
+        self.assertTrue(deadline.clamp(10) <= 2)
+        self.assertEqual(deadline.clamp(1), 1)
+        connect, read = deadline.clamp((1, 10))
+        self.assertEqual(connect, 1)
+        self.assertTrue(read <= 2)
+
+    def test_check(self):
+        deadline = Deadline(0.01)
+        deadline.check()
+        time.sleep(0.02)
+        self.assertRaises(TimeoutError, deadline.check)
+
+    def test_nested_never_extends(self):
+        outer = Deadline(1)
+        with outer:
+            with Deadline(100):
+                self.assertTrue(current_deadline() is outer)
+            inner = Deadline(0.5)
+            with inner:
+                self.assertTrue(current_deadline() is inner)
+            self.assertTrue(current_deadline() is outer)
+        self.assertEqual(current_deadline(), None)
+
+    def test_wrap_carries_deadline_to_threads(self):
+        deadline = Deadline(1)
+        seen = []
+        thread = threading.Thread(target=deadline.wrap(lambda: seen.append(current_deadline())))
+        thread.start()
+        thread.join()
+        self.assertTrue(seen[0] is deadline)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,71 @@
+# coding=utf-8
+
+from pyosio.dedupe import BloomFilter, DedupeIndex, dedupe, message_key
+import time
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def message(i, **extra):
+    msg = {'topic': '/users/u/t', 'date': '2016-01-01T00:00:%02dZ' % (i % 60), 'payload': {'text': str(i)}}
+    msg.update(extra)
+    return msg
+
+
+class OSIODedupeTests(unittest.TestCase):
+
+    def test_message_key(self):
+        self.assertEqual(message_key(message(1)), message_key(message(1, owner=None)))
+        self.assertEqual(message_key({'id': 'a', 'date': 'x'}), message_key({'id': 'a', 'date': 'y'}))
+        self.assertNotEqual(message_key(message(1)), message_key(message(2)))
+        self.assertTrue(0 <= message_key(message(1)) < 2 ** 64)
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000, 0.01)
+        keys = [message_key(i) for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(message_key(i) in bloom for i in range(1000, 11000))
+        self.assertTrue(false_positives < 300)
+
+    def test_filters_messages_and_pages(self):
+        items = [message(1), message(2), message(1), {'messages': [message(2), message(3)], 'next': 'n'},
+                 [message(3), message(4)]]
+        self.assertEqual(list(dedupe(items)),
+                         [message(1), message(2), {'messages': [message(3)], 'next': 'n'}, [message(4)]])
+
+    def test_bloom_precheck(self):
+        index = DedupeIndex(bloom_capacity=1000)
+        messages = [message(i) for i in range(500)]
+        self.assertEqual(len(list(index.filter(messages + messages))), 500)
+        self.assertEqual(index.stats.duplicates, 500)
+        self.assertEqual(len(index), 500)
+
+    def test_keys_expire(self):
+        index = DedupeIndex(horizon=0.2, buckets=4, bloom_capacity=100)
+        self.assertTrue(index.add(message(1)))
+        self.assertFalse(index.add(message(1)))
+        time.sleep(0.25)
+        self.assertFalse(message(1) in index)
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.stats.expired, 1)
+        self.assertTrue(index.add(message(1)))
+
+    def test_memory_stays_flat(self):
+        index = DedupeIndex(horizon=0.1, buckets=5)
+        sizes = []
+        for i in range(6):
+            for j in range(200):
+                index.add(message(i * 200 + j))
+            sizes.append(len(index))
+            time.sleep(0.05)
+        self.assertTrue(max(sizes) <= 600)
+        self.assertEqual(index.stats.messages, 1200)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,75 @@
+# coding=utf-8
+
+from pyosio.endpoints import ENDPOINTS, REGISTRY, Endpoint
+from pyosio.osio import OpenSensorsAPI
+from pyosio.cache import MetadataCache
+import requests
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def make_response(status_code, content=b'{}'):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    return response
+
+
+class RecordingAPI(OpenSensorsAPI):
+
+    def __init__(self, *args, **kwargs):
+        OpenSensorsAPI.__init__(self, *args, **kwargs)
+        self.sent = []
+
+    def _get(self, url, supported_versions, **queryparams):
+        self.sent.append(('GET', url, queryparams))
+        return make_response(200, b'{"url": "%s"}' % url.encode('utf-8'))
+
+    def _put(self, url, supported_versions, data=None):
+        self.sent.append(('PUT', url, data))
+        return make_response(204, b'')
+
+
+class OSIOEndpointsTests(unittest.TestCase):
+
+    def test_registry(self):
+        self.assertEqual(len(REGISTRY), len(ENDPOINTS))
+        for endpoint in ENDPOINTS:
+            self.assertTrue(callable(getattr(OpenSensorsAPI, endpoint.name)), endpoint.name)
+            self.assertTrue(getattr(OpenSensorsAPI, endpoint.name).__doc__, endpoint.name)
+            for name, n in endpoint.invalidates:
+                self.assertTrue(REGISTRY[name].cache, name)
+                self.assertTrue(n <= len(REGISTRY[name].arguments), name)
+
+    def test_path_compiled(self):
+        endpoint = REGISTRY['get_filtered_org_devices']
+        self.assertEqual(endpoint.args, ('org_id', 'd_batch', 'd_type'))
+        self.assertEqual(endpoint.url('v2', ('o', 'b', 't')), '/v2/orgs/o/devices/b/t')
+        self.assertEqual(endpoint.handler, '_get')
+        self.assertEqual(REGISTRY['get_pub_user_meta'].handler, '_get_pub')
+        self.assertEqual(REGISTRY['get_topic_msgs'].handler, '_get_history')
+        self.assertRaises(ValueError, Endpoint, 'bad', 'GET', '/topics/{topic}', ('v1',))
+
+    def test_generated_methods(self):
+        client = RecordingAPI('u', 'k')
+        self.assertEqual(client.get_device_meta('u', 'd', {'a': 1}), {'url': '/v1/users/u/devices/d'})
+        self.assertTrue(client.update_device_meta('u', 'd', {'name': 'x'}))
+        self.assertEqual(client.sent, [('GET', '/v1/users/u/devices/d', {'a': 1}),
+                                       ('PUT', '/v1/users/u/devices/d', {'name': 'x'})])
+
+    def test_cache_and_invalidation(self):
+        client = RecordingAPI('u', 'k', metadata_cache=MetadataCache())
+        client.get_device_meta('u', 'd')
+        client.get_device_meta('u', client_id='d')
+        self.assertEqual(len(client.sent), 1)
+        client.update_device_meta('u', 'd', {})
+        client.get_device_meta('u', 'd')
+        self.assertEqual(len(client.sent), 3)
+        self.assertEqual(client.cache_stats['hits'], 1)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,119 @@
+# coding=utf-8
+
+from benchmarks.mock_server import MockServer
+from pyosio.osio import OpenSensorsAPI
+from pyosio.errors import OSIOClientApiError
+from tests.osio_backfill_tests import HistoryHandler, MESSAGES, TIMES, DAY
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+
+try:
+    import pyarrow.parquet
+    from pyosio.export import ParquetExporter, STATE_FILE
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+
+def read_dates(paths):
+    dates = []
+    for path in paths:
+        dates.extend(pyarrow.parquet.read_table(path).column('date').cast('int64').to_pylist())
+    return sorted(dates)
+
+
+EXPECTED = [t * 1000 for t in TIMES]
+
+
+@unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+class OSIOExportTests(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._handler = HistoryHandler()
+        self._server = MockServer(self._handler).__enter__()
+        self._api = OpenSensorsAPI('user', 'key')
+        self._api.base_url = self._server.url
+
+    def tearDown(self):
+        self._api.close()
+        self._server.__exit__()
+        shutil.rmtree(self._dir)
+
+    def files(self):
+        return sorted(os.path.join(root, name) for root, _, names in os.walk(self._dir)
+                      for name in names if name != STATE_FILE)
+
+    def test_partitioned_by_topic_and_day(self):
+        exporter = ParquetExporter(self._api, self._dir)
+        paths = exporter.export('topic', '/users/u/t', 0, 2 * DAY)
+        self.assertEqual(sorted(paths), self.files())
+        self.assertEqual([os.path.basename(os.path.dirname(path)) for path in sorted(paths)],
+                         ['date=1970-01-01', 'date=1970-01-02'])
+        self.assertTrue('topic=%2Fusers%2Fu%2Ft' in paths[0])
+        self.assertEqual(read_dates(paths), EXPECTED)
+        table = pyarrow.parquet.read_table(sorted(paths)[0])
+        self.assertEqual(str(table.schema.field('date').type), 'timestamp[ms, tz=UTC]')
+        self.assertEqual(sorted(table.column('payload').to_pylist()),
+                         sorted(m['payload']['text'] for m in MESSAGES[:24]))
+        self.assertEqual(exporter.stats.messages, len(MESSAGES))
+
+    def test_row_groups_sized_by_bytes(self):
+        exporter = ParquetExporter(self._api, self._dir, row_group_bytes=16 * 1024)
+        paths = exporter.export('topic', 't', DAY, 2 * DAY)
+        self.assertEqual(len(paths), 1)
+        self.assertTrue(pyarrow.parquet.ParquetFile(paths[0]).metadata.num_row_groups > 3)
+        self.assertEqual(len(read_dates(paths)), 3600)
+
+    def test_since_last_export(self):
+        exporter = ParquetExporter(self._api, self._dir)
+        first = exporter.export_since_last('topic', 't', start_date=0, end_date=DAY + 1800)
+        second = exporter.export_since_last('topic', 't', end_date=2 * DAY)
+        self.assertEqual(exporter.export_since_last('topic', 't', end_date=2 * DAY), [])
+        self.assertEqual(read_dates(first + second), EXPECTED)
+        with open(os.path.join(self._dir, STATE_FILE)) as f:
+            self.assertEqual(json.load(f), {'topic:t': '1970-01-03T00:00:00Z'})
+
+    def test_failed_run_leaves_nothing(self):
+        handler = self._handler
+
+        def failing(method, path, query, body, headers):
+            if 'cursor' in query:
+                return 404, {}, b'{}'
+            return handler(method, path, query, body, headers)
+
+        self._server.handler = failing
+        exporter = ParquetExporter(self._api, self._dir, row_group_bytes=1024)
+        with self.assertRaises(OSIOClientApiError):
+            exporter.export_since_last('topic', 't', start_date=0, end_date=2 * DAY)
+        self.assertEqual(self.files(), [])
+
+    def test_failed_rename_leaves_nothing(self):
+        rename = os.rename
+        renamed = []
+
+        def failing(source, target):
+            if renamed:
+                raise OSError('disk gone')
+            rename(source, target)
+            renamed.append(target)
+
+        os.rename = failing
+        try:
+            with self.assertRaises(OSError) as raised:
+                ParquetExporter(self._api, self._dir).export('topic', 't', 0, 2 * DAY)
+        finally:
+            os.rename = rename
+        self.assertEqual(str(raised.exception), 'disk gone')
+        self.assertEqual(len(renamed), 1)
+        self.assertEqual(self.files(), [])
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,49 @@
+# coding=utf-8
+
+from pyosio.fanout import fan_out
+import itertools
+import time
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _slow_square(x):
+    time.sleep(0.001 * (x % 5))
+    return x * x
+
+
+class OSIOFanOutTests(unittest.TestCase):
+
+    def test_ordered_results(self):
+        results = list(fan_out(_slow_square, range(50), max_workers=4, ordered=True))
+        self.assertEqual([r.index for r in results], list(range(50)))
+        self.assertEqual([r.result for r in results], [x * x for x in range(50)])
+
+    def test_unordered_results(self):
+        results = list(fan_out(_slow_square, range(50), max_workers=4))
+        self.assertEqual(sorted(r.result for r in results), [x * x for x in range(50)])
+
+    def test_argument_sets(self):
+        pow_ = lambda base, exp=1: base ** exp
+        results = list(fan_out(pow_, [(2, 3), {'base': 3, 'exp': 2}, 4], ordered=True))
+        self.assertEqual([r.result for r in results], [8, 9, 4])
+
+    def test_errors_are_captured(self):
+        results = list(fan_out(lambda x: 1 / x, [1, 0, 2], ordered=True))
+        self.assertEqual([r.ok for r in results], [True, False, True])
+        self.assertTrue(isinstance(results[1].error, ZeroDivisionError))
+
+    def test_input_consumed_lazily(self):
+        consumed = []
+        argsets = (consumed.append(x) or x for x in itertools.count())
+        results = fan_out(_slow_square, argsets, max_workers=2)
+        next(results)
+        results.close()
+        self.assertTrue(len(consumed) <= 5)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,86 @@
+# coding=utf-8
+
+from benchmarks.mock_server import MockServer
+from pyosio.osio import OpenSensorsAPI
+from tests.osio_pagination_tests import PagesHandler
+import json
+import unittest
+import logging
+
+try:
+    import pandas
+    from pyosio.frames import records_frame, to_dataframe
+except ImportError:
+    pandas = None
+
+logger = logging.getLogger(__name__)
+
+DEVICES = [{'client-id': 'device-%d' % i, 'device-type': 'sensor' if i % 2 else 'gateway',
+            'location': {'lat': 51.5 + i, 'lon': -0.1}, 'active': i != 3,
+            'count': i if i != 2 else None, 'tags': ['a']} for i in range(5)]
+DEVICES[4]['firmware'] = '1.0'
+
+
+def devices_handler(method, path, query, body, headers):
+    return 200, {}, json.dumps(DEVICES).encode('utf-8')
+
+
+@unittest.skipIf(pandas is None, 'pandas is not installed')
+class OSIOFramesTests(unittest.TestCase):
+
+    def test_records_frame(self):
+        frame = records_frame(DEVICES, chunk_size=2)
+        self.assertEqual(len(frame), 5)
+        self.assertEqual(str(frame['location.lat'].dtype), 'float64')
+        self.assertEqual(str(frame['count'].dtype), 'Int64')
+        self.assertTrue(frame['count'].isna()[2])
+        self.assertEqual(str(frame['active'].dtype), 'boolean')
+        self.assertEqual(str(frame['device-type'].dtype), 'category')
+        self.assertEqual(str(frame['client-id'].dtype), 'object')
+        self.assertEqual(list(frame['client-id']), ['device-%d' % i for i in range(5)])
+        self.assertEqual(frame['firmware'].isna().sum(), 4)
+        self.assertEqual(frame['tags'][0], ['a'])
+
+    def test_column_types_across_chunks(self):
+        frame = records_frame([{'a': None}, {'a': None}, {'a': 1}, {'a': 2.5}], chunk_size=1)
+        self.assertEqual(str(frame['a'].dtype), 'float64')
+        self.assertEqual(frame['a'].isna().sum(), 2)
+        frame = records_frame([{'a': 1}, {'a': 'x'}], chunk_size=1)
+        self.assertEqual(list(frame['a']), [1, 'x'])
+
+    def test_message_page(self):
+        page = {'messages': [{'date': '2016-01-01T00:00:00Z', 'device': 'd', 'topic': '/t',
+                              'payload': {'text': json.dumps({'temperature': 20})}}]}
+        frame = to_dataframe(page)
+        self.assertEqual(list(frame.columns), ['date', 'device', 'topic', 'owner', 'temperature'])
+        self.assertEqual(str(frame['date'].dtype).replace('ns', 'ms'), 'datetime64[ms, UTC]')
+        self.assertEqual(str(frame['device'].dtype), 'category')
+        self.assertEqual(str(frame['temperature'].dtype), 'Int64')
+
+    def test_message_history(self):
+        with MockServer(PagesHandler()) as server:
+            api = OpenSensorsAPI('user', 'key')
+            api.base_url = server.url
+            frame = api.iter_topic_msgs('t').to_dataframe()
+            chunks = list(api.iter_topic_msgs('t').dataframes(chunk_size=10))
+            empty = api.iter_topic_msgs('t', cursor={'url': None}).to_dataframe()
+            api.close()
+        self.assertEqual(len(frame), 25)
+        self.assertEqual(frame['date'].iloc[-1], pandas.Timestamp('2016-01-01T00:00:24Z'))
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        self.assertEqual(len(empty), 0)
+        self.assertTrue('date' in empty.columns)
+
+    def test_org_devices(self):
+        with MockServer(devices_handler) as server:
+            api = OpenSensorsAPI('user', 'key')
+            api.base_url = server.url
+            frame = api.get_org_devices_dataframe('org')
+            api.close()
+        self.assertEqual(len(frame), 5)
+        self.assertEqual(str(frame['device-type'].dtype), 'category')
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
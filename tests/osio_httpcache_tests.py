@@ -0,0 +1,59 @@
+# coding=utf-8
+
+from pyosio.httpcache import HTTPCache
+import requests
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def make_response(status_code, content=b'', headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers or {})
+    response.url = 'https://api.opensensors.io/v1/topics/t'
+    return response
+
+
+class OSIOHTTPCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self._cache = HTTPCache(max_bytes=10)
+        self._key = HTTPCache.key('https://api.opensensors.io/v1/topics/t', {}, {})
+
+    def test_validators(self):
+        self.assertEqual(self._cache.validators(self._key), {})
+        self._cache.update(self._key, make_response(200, b'{}', {'ETag': '"1"', 'Last-Modified': 'x'}))
+        self.assertEqual(self._cache.validators(self._key),
+                         {'If-None-Match': '"1"', 'If-Modified-Since': 'x'})
+
+    def test_not_modified_served_from_cache(self):
+        self._cache.update(self._key, make_response(200, b'{"a":1}', {'ETag': '"1"'}))
+        response = self._cache.update(self._key, make_response(304, headers={'ETag': '"1"'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"a": 1})
+        self.assertEqual(self._cache.stats.revalidated, 1)
+
+    def test_without_validators_not_stored(self):
+        self._cache.update(self._key, make_response(200, b'{}'))
+        self.assertEqual(len(self._cache), 0)
+
+    def test_lru_eviction_by_bytes(self):
+        keys = [HTTPCache.key('https://api.opensensors.io/v1/topics/%d' % i) for i in range(3)]
+        for key in keys:
+            self._cache.update(key, make_response(200, b'12345', {'ETag': '"1"'}))
+        self.assertEqual(self._cache.validators(keys[0]), {})
+        self.assertEqual(self._cache.size, 10)
+        self.assertEqual(self._cache.stats.evictions, 1)
+
+    def test_credentials_in_key(self):
+        url = 'https://api.opensensors.io/v1/topics/t'
+        self.assertNotEqual(HTTPCache.key(url, headers={'Authorization': 'api-key a'}),
+                            HTTPCache.key(url, headers={'Authorization': 'api-key b'}))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,52 @@
+# coding=utf-8
+
+import os
+import subprocess
+import sys
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time of pyosio.osio, in microseconds. Importing requests
+# alone takes longer than this on most machines.
+IMPORT_BUDGET_US = 150000
+
+LAZY_MODULES = ('requests', 'sseclient', 'getpass', 'inspect', 'aiohttp', 'orjson', 'ujson')
+
+
+def run(*args):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    process = subprocess.Popen((sys.executable,) + args, env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = process.communicate()
+    return out.decode('utf-8'), err.decode('utf-8')
+
+
+class OSIOImportTimeTests(unittest.TestCase):
+
+    def test_heavy_modules_not_imported(self):
+        out, _ = run('-c', 'import sys, pyosio.osio; print(" ".join(sorted(sys.modules)))')
+        loaded = set(out.split())
+        for name in LAZY_MODULES:
+            self.assertFalse(name in loaded, '%s imported with pyosio.osio' % name)
+
+    @unittest.skipIf(sys.version_info < (3, 7), '-X importtime needs Python 3.7')
+    def test_import_budget(self):
+        timings = []
+        for _ in range(3):
+            _, err = run('-X', 'importtime', '-c', 'import pyosio.osio')
+            for line in err.splitlines():
+                fields = [field.strip() for field in line.split('|')]
+                if len(fields) == 3 and fields[2] == 'pyosio.osio':
+                    timings.append(int(fields[1]))
+        self.assertTrue(timings)
+        self.assertTrue(min(timings) < IMPORT_BUDGET_US,
+                        'import pyosio.osio took %d us' % min(timings))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
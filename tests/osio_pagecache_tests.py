@@ -0,0 +1,77 @@
+# coding=utf-8
+
+from pyosio.pagecache import PageCache, parse_date
+import requests
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def make_response(status_code, content):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.url = 'https://api.opensensors.io/v1/messages/topic/t'
+    return response
+
+
+class OSIOPageCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._cache = PageCache(os.path.join(self._dir, 'pages.db'))
+
+    def tearDown(self):
+        self._cache.close()
+        shutil.rmtree(self._dir)
+
+    def test_parse_date(self):
+        self.assertEqual(parse_date('1970-01-02'), 86400)
+        self.assertEqual(parse_date('1970-01-01T01:00:00Z'), 3600)
+        self.assertEqual(parse_date('1970-01-01T01:00:00.5+01:00'), 0.5)
+        self.assertEqual(parse_date('yesterday'), None)
+        self.assertEqual(parse_date(None), None)
+
+    def test_cacheable(self):
+        self.assertTrue(self._cache.cacheable({'end-date': '2016-01-01T00:00:00Z'}))
+        self.assertFalse(self._cache.cacheable({'end-date': '2999-01-01T00:00:00Z'}))
+        self.assertFalse(self._cache.cacheable({'start-date': '2016-01-01T00:00:00Z'}))
+
+    def test_key_normalizes_params(self):
+        url = 'https://api.opensensors.io/v1/messages/topic/t'
+        self.assertEqual(PageCache.key(url, {'a': 1, 'b': 2}, 'u'), PageCache.key(url, {'b': 2, 'a': '1'}, 'u'))
+        self.assertNotEqual(PageCache.key(url, {'a': 1}, 'u'), PageCache.key(url, {'a': 1}, 'v'))
+
+    def test_round_trip(self):
+        self._cache.put('k', make_response(200, b'{"messages": []}'))
+        self._cache.put('e', make_response(500, b'{}'))
+        self.assertEqual(self._cache.get('k').json(), {'messages': []})
+        self.assertEqual(self._cache.get('e'), None)
+        self.assertEqual(self._cache.stats.hits, 1)
+
+    def test_persistent(self):
+        self._cache.put('k', make_response(200, b'{}'))
+        other = PageCache(self._cache.path)
+        self.assertEqual(other.get('k').content, b'{}')
+        other.close()
+
+    def test_lru_eviction(self):
+        content = os.urandom(100)
+        cache = PageCache(os.path.join(self._dir, 'small.db'), max_bytes=250)
+        for key in ('a', 'b'):
+            cache.put(key, make_response(200, content))
+        cache.get('a')
+        cache.put('c', make_response(200, content))
+        self.assertEqual(cache.get('b'), None)
+        self.assertNotEqual(cache.get('a'), None)
+        self.assertEqual(cache.stats.evictions, 1)
+        cache.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,124 @@
+# coding=utf-8
+
+from benchmarks.mock_server import MockServer
+from pyosio.osio import OpenSensorsAPI
+from pyosio.errors import OSIOClientApiError
+from pyosio.pagination import Cursor, format_date
+import datetime
+import json
+import time
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+MESSAGES = [{'date': '2016-01-01T00:00:%02dZ' % i, 'payload': {'text': str(i)}} for i in range(25)]
+PAGE_SIZE = 10
+
+
+class PagesHandler(object):
+
+    def __init__(self):
+        self.requests = []
+        self.delay = 0
+
+    def __call__(self, method, path, query, body, headers):
+        self.requests.append((path, query))
+        time.sleep(self.delay)
+        if path != '/v1/messages/topic/t':
+            return 404, {}, b'{}'
+        offset = int(query.get('cursor', 0))
+        page = {'messages': MESSAGES[offset:offset + PAGE_SIZE]}
+        if offset + PAGE_SIZE < len(MESSAGES):
+            page['next'] = '/v1/messages/topic/t?cursor=%d&end-date=%s' % (
+                offset + PAGE_SIZE, query.get('end-date', ''))
+        return 200, {}, json.dumps(page).encode('utf-8')
+
+
+class OSIOPaginationTests(unittest.TestCase):
+
+    def setUp(self):
+        self._handler = PagesHandler()
+        self._server = MockServer(self._handler).__enter__()
+        self._api = OpenSensorsAPI('user', 'key', coalesce=False)
+        self._api.base_url = self._server.url
+
+    def tearDown(self):
+        self._api.close()
+        self._server.__exit__()
+
+    def test_format_date(self):
+        self.assertEqual(format_date(datetime.datetime(2016, 1, 2, 3, 4, 5)), '2016-01-02T03:04:05Z')
+        self.assertEqual(format_date(datetime.date(2016, 1, 2)), '2016-01-02')
+        self.assertEqual(format_date(86400.5), '1970-01-02T00:00:00.500Z')
+        self.assertEqual(format_date('2016-01-02'), '2016-01-02')
+
+    def test_follows_next(self):
+        messages = self._api.iter_topic_msgs('t', start_date=datetime.date(2016, 1, 1),
+                                             end_date='2016-01-02')
+        self.assertEqual(list(messages), MESSAGES)
+        self.assertTrue(messages.cursor.done)
+        self.assertEqual(len(self._handler.requests), 3)
+        self.assertEqual(self._handler.requests[0][1], {'start-date': '2016-01-01', 'end-date': '2016-01-02'})
+        self.assertEqual(self._handler.requests[2][1], {'cursor': '20', 'end-date': '2016-01-02'})
+
+    def test_pages(self):
+        pages = list(self._api.iter_topic_msgs('t', pages=True))
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+
+    def test_resume(self):
+        messages = self._api.iter_topic_msgs('t')
+        seen = []
+        for message in messages:
+            seen.append(message)
+            if len(seen) == 13:
+                break
+        cursor = json.loads(json.dumps(messages.cursor.as_dict()))
+        self.assertEqual(Cursor.from_dict(cursor).offset, 3)
+        seen.extend(self._api.iter_topic_msgs('t', cursor=cursor))
+        self.assertEqual(seen, MESSAGES)
+
+    def test_error_raises(self):
+        with self.assertRaises(OSIOClientApiError):
+            list(self._api.iter_device_msgs('missing'))
+
+    def test_prefetch(self):
+        messages = self._api.iter_topic_msgs('t', prefetch=2)
+        seen = []
+        for message in messages:
+            seen.append(message)
+            if len(seen) == 13:
+                break
+        seen.extend(self._api.iter_topic_msgs('t', cursor=messages.cursor, prefetch=2))
+        self.assertEqual(seen, MESSAGES)
+
+    def test_prefetch_overlaps_processing(self):
+        self._handler.delay = 0.1
+
+        def consume(pages):
+            for page in pages:
+                time.sleep(0.1)
+
+        start = time.time()
+        consume(self._api.iter_topic_msgs('t', pages=True))
+        sequential = time.time() - start
+        start = time.time()
+        consume(self._api.iter_topic_msgs('t', pages=True, prefetch=2))
+        self.assertTrue(time.time() - start < 0.85 * sequential)
+
+    def test_prefetch_budget(self):
+        pages = iter(self._api.iter_topic_msgs('t', pages=True, prefetch=5, prefetch_bytes=1))
+        next(pages)
+        time.sleep(0.2)
+        # The page handed out and the single one the budget allows ahead.
+        self.assertEqual(len(self._handler.requests), 2)
+        pages.close()
+
+    def test_prefetch_error_raises(self):
+        with self.assertRaises(OSIOClientApiError):
+            list(self._api.iter_device_msgs('missing', prefetch=2))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,116 @@
+# coding=utf-8
+
+from benchmarks.mock_server import MockServer
+from pyosio.osio import OpenSensorsAPI
+from pyosio.errors import OSIOClientError
+from pyosio.query import MessageQuery, normalise
+from tests.osio_pagination_tests import PagesHandler
+import datetime
+import json
+import unittest
+import logging
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+MESSAGES = [{'device': 'dev%d' % (i % 2), 'date': '2016-01-01T00:00:%02dZ' % i,
+             'payload': {'text': json.dumps({'temperature': i})}} for i in range(25)]
+
+
+def handler(method, path, query, body, headers):
+    offset = int(query.get('cursor', 0))
+    page = {'messages': MESSAGES[offset:offset + 10]}
+    if offset + 10 < len(MESSAGES):
+        page['next'] = '%s?cursor=%d' % (path, offset + 10)
+    return 200, {}, json.dumps(page).encode('utf-8')
+
+
+class OSIOQueryTests(unittest.TestCase):
+
+    def test_normalise(self):
+        self.assertEqual(normalise({'start_date': datetime.date(2016, 1, 1), 'tags': 'b, a,b',
+                                    'lat': '51.5', 'lon': -0.1, 'radius': 1000.0, 'postcode': ' ec1v  9ax'}),
+                         {'start-date': '2016-01-01T00:00:00Z', 'tags': 'a,b', 'lat': 51.5, 'lon': -0.1,
+                          'radius': 1000, 'postcode': 'EC1V 9AX'})
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError) as raised:
+            MessageQuery(raduis=10)
+        self.assertTrue("did you mean 'radius'" in str(raised.exception))
+        for params in ({'lat': 91, 'lon': 0}, {'lat': 1}, {'radius': 5}, {'dur': -1}, {'zip': ''},
+                       {'start-date': 'yesterday'}, {'start-date': '2016-01-02', 'end-date': '2016-01-01'}):
+            with self.assertRaises(ValueError):
+                MessageQuery(params)
+        with self.assertRaises(ValueError):
+            MessageQuery().where('temperature', '=>', 1)
+
+    def test_cache_key(self):
+        first = MessageQuery(start_date=datetime.datetime(2016, 1, 1), tags=['b', 'a'])
+        second = MessageQuery({'start-date': '2016-01-01', 'tags': 'a,b'})
+        self.assertEqual(first.cache_key(), second.cache_key())
+        self.assertEqual(first, second)
+        self.assertEqual(len(set([first, second])), 1)
+        self.assertEqual(first.where('t', '>', 1).where('h', '<', 2), second.where('h', '<', 2).where('t', '>', 1))
+        self.assertNotEqual(first, first.where('t', '>', 1))
+        self.assertEqual(dict(first), {'start-date': '2016-01-01T00:00:00Z', 'tags': 'a,b'})
+
+    def test_pushdown(self):
+        pages = PagesHandler()
+        with MockServer(pages) as server:
+            api = OpenSensorsAPI('user', 'key', coalesce=False)
+            api.base_url = server.url
+            query = MessageQuery(end_date='2016-01-02').near(51.5, -0.1, 500)
+            self.assertEqual(len(list(api.iter_topic_msgs('t', queryparams=query))), 25)
+            api.close()
+        self.assertEqual(pages.requests[0][1], {'end-date': '2016-01-02T00:00:00Z', 'lat': '51.5',
+                                                'lon': '-0.1', 'radius': '500'})
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_client_side_filters(self):
+        with MockServer(handler) as server:
+            api = OpenSensorsAPI('user', 'key', coalesce=False)
+            api.base_url = server.url
+            query = MessageQuery().where('temperature', 'between', (5, 20)).from_devices('dev1')
+            messages = api.iter_topic_msgs('t', queryparams=query)
+            seen = []
+            for message in messages:
+                seen.append(message)
+                if len(seen) == 4:
+                    break
+            seen.extend(api.iter_topic_msgs('t', queryparams=query, cursor=messages.cursor))
+            pages = list(api.iter_topic_msgs('t', queryparams=query.where('temperature', '!=', 7), pages=True))
+            api.close()
+        self.assertEqual(seen, [m for m in MESSAGES[5:21] if m['device'] == 'dev1'])
+        self.assertEqual([len(page) for page in pages], [2, 5])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_plain_endpoints(self):
+        with MockServer(handler) as server:
+            api = OpenSensorsAPI('user', 'key', coalesce=False)
+            api.base_url = server.url
+            page = api.get_topic_msgs('t', queryparams=MessageQuery().where('temperature', '>', 100))
+            self.assertEqual(page['messages'], [])
+            page = api.get_topic_msgs('t', queryparams=MessageQuery().from_devices('dev1'))
+            self.assertEqual(page['messages'], [m for m in MESSAGES[:10] if m['device'] == 'dev1'])
+            self.assertTrue('next' in page)
+            with self.assertRaises(OSIOClientError):
+                api.get_device_meta('u', 'd', MessageQuery().where('temperature', '>', 100))
+            api.close()
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_filter_stream(self):
+        query = MessageQuery(start_date='2016-01-01T00:00:10Z', end_date='2016-01-01T00:00:12Z')
+        self.assertEqual(list(query.filter(iter(MESSAGES))), MESSAGES[10:13])
+        self.assertEqual(list(query.where('temperature', 'in', [11, 30]).filter([{'messages': MESSAGES}])),
+                         [{'messages': MESSAGES[11:12]}])
+        with self.assertRaises(OSIOClientError):
+            list(query.tagged('a').filter(MESSAGES))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
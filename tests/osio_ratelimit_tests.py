@@ -0,0 +1,71 @@
+# coding=utf-8
+
+from pyosio.deadline import Deadline
+from pyosio.errors import TimeoutError
+from pyosio.ratelimit import TokenBucket, FileTokenBucket, RateLimiter
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class OSIORateLimitTests(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_burst_then_wait(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, places=2)
+        self.assertAlmostEqual(bucket.reserve(), 0.2, places=2)
+
+    def test_file_bucket_is_shared(self):
+        path = os.path.join(self._dir, 'api.bucket')
+        first = FileTokenBucket(path, rate=10, capacity=1)
+        second = FileTokenBucket(path, rate=10, capacity=1)
+        self.assertEqual(first.reserve(), 0)
+        self.assertTrue(second.reserve() > 0)
+
+    def test_family(self):
+        self.assertEqual(RateLimiter.family('/v1/messages/topic/x'), 'messages')
+        self.assertEqual(RateLimiter.family('/v1/public/topics/x'), 'topics')
+        self.assertEqual(RateLimiter.family('/v2/public/events/datasets/x'), 'datasets')
+
+    def test_family_budget(self):
+        limiter = RateLimiter(rate=1000, families={'messages': 1})
+        self.assertEqual(limiter.reserve('https://api.opensensors.io/v1/messages/topic/x'), 0)
+        self.assertTrue(limiter.reserve('https://api.opensensors.io/v1/messages/topic/x') > 0.9)
+        self.assertEqual(limiter.reserve('https://api.opensensors.io/v1/orgs/o'), 0)
+        self.assertEqual(limiter.stats.waits, 1)
+
+    def test_shared_dir(self):
+        url = 'https://api.opensensors.io/v1/orgs/o'
+        first = RateLimiter(rate=1, shared_dir=self._dir)
+        second = RateLimiter(rate=1, shared_dir=self._dir)
+        self.assertEqual(first.reserve(url), 0)
+        self.assertTrue(second.reserve(url) > 0.9)
+
+    def test_timeout_refunds_reservation(self):
+        url = 'https://api.opensensors.io/v1/messages/topic/x'
+        for limiter in (RateLimiter(rate=1, families={'messages': 1}),
+                        RateLimiter(rate=1, shared_dir=self._dir)):
+            self.assertEqual(limiter.reserve(url), 0)
+            with Deadline(0.5):
+                for _ in range(3):
+                    self.assertRaises(TimeoutError, limiter.acquire, url)
+            # The timed out callers did not push the next one back.
+            self.assertTrue(0.9 < limiter.reserve(url) <= 1)
+            self.assertEqual(limiter.stats.requests, 2)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
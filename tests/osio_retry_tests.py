@@ -0,0 +1,83 @@
+# coding=utf-8
+
+from pyosio.retry import RetryPolicy
+import requests
+import socket
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FakeResponse(object):
+
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def close(self):
+        pass
+
+
+def sequence(*outcomes):
+    outcomes = list(outcomes)
+
+    def send():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return send
+
+
+class OSIORetryTests(unittest.TestCase):
+
+    def setUp(self):
+        self._policy = RetryPolicy(max_attempts=3, backoff_base=0, backoff_max=0)
+
+    def test_retries_transient_status(self):
+        send = sequence(FakeResponse(502), FakeResponse(429), FakeResponse(200))
+        self.assertEqual(self._policy.execute('GET', send).status_code, 200)
+        self.assertEqual(self._policy.stats.retries, 2)
+        self.assertEqual(self._policy.stats.attempts, 3)
+
+    def test_gives_up_after_max_attempts(self):
+        send = sequence(FakeResponse(503), FakeResponse(503), FakeResponse(503))
+        self.assertEqual(self._policy.execute('GET', send).status_code, 503)
+        self.assertEqual(self._policy.stats.gave_up, 1)
+
+    def test_post_not_retried_on_status(self):
+        send = sequence(FakeResponse(503), FakeResponse(200))
+        self.assertEqual(self._policy.execute('POST', send).status_code, 503)
+
+    def test_post_retried_on_connect_timeout(self):
+        send = sequence(requests.exceptions.ConnectTimeout(), FakeResponse(201))
+        self.assertEqual(self._policy.execute('POST', send).status_code, 201)
+
+    def test_post_not_retried_on_read_error(self):
+        send = sequence(requests.exceptions.ReadTimeout(), FakeResponse(201))
+        self.assertRaises(requests.exceptions.ReadTimeout, self._policy.execute, 'POST', send)
+
+    def test_post_retried_on_refused_connection(self):
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        url = 'http://127.0.0.1:%d/' % listener.getsockname()[1]
+        listener.close()
+        self.assertRaises(requests.exceptions.ConnectionError, self._policy.execute, 'POST',
+                          lambda: requests.post(url, data='{}', timeout=1))
+        self.assertEqual(self._policy.stats.attempts, 3)
+        self.assertEqual(self._policy.stats.gave_up, 1)
+
+    def test_retry_after_header(self):
+        self.assertEqual(self._policy.delay('GET', 1, 429, {'Retry-After': '7'}), 7.0)
+        self.assertEqual(self._policy.delay('GET', 1, 200, {'Retry-After': '7'}), None)
+
+    def test_full_jitter_bounds(self):
+        policy = RetryPolicy(backoff_base=1, backoff_max=4)
+        for attempt in range(1, 10):
+            self.assertTrue(0 <= policy.backoff(attempt) <= min(4, 2 ** (attempt - 1)))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,139 @@
+# coding=utf-8
+
+from pyosio.errors import OSIOClientError
+from pyosio.pagination import format_date
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import logging
+
+try:
+    import numpy
+    from pyosio import ringstore
+    from pyosio.ringstore import RingFile, RingStore
+except ImportError:
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+START = 1451606400
+
+
+def messages(first, count, topic='/users/u/t'):
+    return [{'topic': topic, 'device': 'dev%d' % (i % 3), 'date': format_date(START + i),
+             'payload': {'text': json.dumps({'temperature': float(i), 'humidity': 0.5})}}
+            for i in range(first, first + count)]
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class OSIORingStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._store = RingStore(self._dir, ['temperature', 'humidity'], capacity=100)
+
+    def tearDown(self):
+        self._store.close()
+        shutil.rmtree(self._dir)
+
+    def test_range_lookup(self):
+        self.assertEqual(self._store.append('/users/u/t', messages(0, 50)), 50)
+        rows = self._store.read('/users/u/t', START + 10, START + 20)
+        self.assertEqual(list(rows['temperature']), [float(i) for i in range(10, 20)])
+        self.assertEqual(str(self._store.file('/users/u/t').dates(rows)[0]), '2016-01-01T00:00:10.000')
+        self.assertTrue(numpy.shares_memory(rows, self._store.file('/users/u/t').records))
+        self.assertEqual(len(self._store.read('/users/u/t', START + 100)), 0)
+        self.assertEqual(self._store.devices('/users/u/t'), ['dev0', 'dev1', 'dev2'])
+        self.assertEqual(list(rows['device'][:3]), [1, 2, 0])
+
+    def test_ring_wraps(self):
+        ring = self._store.file('t')
+        for first in range(0, 250, 50):
+            self._store.append('t', messages(first, 50))
+        self.assertEqual(ring.written, 250)
+        self.assertEqual(len(ring), 100)
+        rows = self._store.read('t')
+        self.assertEqual(list(rows['temperature']), [float(i) for i in range(150, 250)])
+        self.assertEqual(len(ring.segments(START + 190, START + 210)), 2)
+        self.assertEqual(list(ring.read(START + 195, START + 205, copy=True)['temperature']),
+                         [float(i) for i in range(195, 205)])
+        self.assertEqual(ring.search(START, START + 160), (150, 160))
+
+    def test_out_of_order_merged(self):
+        self._store.append('t', list(reversed(messages(10, 10))))
+        self.assertEqual(self._store.append('t', messages(15, 10)), 10)
+        self.assertEqual(self._store.append('t', messages(0, 5)), 5)
+        ring = self._store.file('t')
+        self.assertEqual(ring.late, 0)
+        self.assertEqual(list(ring.read()['temperature']),
+                         sorted(float(i) for i in list(range(0, 5)) + list(range(10, 20)) + list(range(15, 25))))
+
+    def test_full_ring_keeps_newest(self):
+        ring = self._store.file('t')
+        self._store.append('t', messages(100, 100))
+        # Older than all the full ring holds.
+        self.assertEqual(self._store.append('t', messages(0, 10)), 0)
+        self.assertEqual(ring.late, 10)
+        # Merged in, pushing out the oldest records.
+        self.assertEqual(self._store.append('t', messages(150, 5)), 5)
+        rows = ring.read(copy=True)
+        self.assertEqual(len(rows), 100)
+        self.assertEqual(list(rows['temperature'][:3]), [105.0, 106.0, 107.0])
+        self.assertTrue(numpy.all(numpy.diff(rows['date']) >= 0))
+        self.assertEqual(ring.written, 105)
+        self.assertEqual(ring.search(START + 150, START + 151), (50, 52))
+
+    def test_feed_newest_first_pages(self):
+        pages = [{'messages': list(reversed(messages(first, 30)))} for first in range(270, -1, -30)]
+        self.assertEqual(self._store.feed(iter(pages), topic='t', batch_size=50), 100)
+        ring = self._store.file('t')
+        self.assertEqual(ring.late, 200)
+        self.assertEqual(list(ring.read()['temperature']), [float(i) for i in range(200, 300)])
+
+    def test_feed_flush_interval(self):
+        seen = []
+
+        def stream():
+            for message in messages(0, 3, topic='t'):
+                yield message
+                seen.append(len(self._store.file('t')))
+
+        self._store.feed(stream(), batch_size=1000, flush_interval=0)
+        self.assertEqual(seen, [1, 2, 3])
+
+    def test_feed_groups_by_topic(self):
+        stream = iter(messages(0, 30) + messages(0, 20, topic='other'))
+        self.assertEqual(self._store.feed(stream, batch_size=7), 50)
+        self.assertEqual(len(self._store.read('other')), 20)
+        self.assertEqual(self._store.stats.records, 50)
+
+    def test_readers(self):
+        self._store.append('t', messages(0, 10))
+        reader = RingStore(self._dir, ['temperature', 'humidity'], writable=False)
+        self.assertEqual(len(reader.read('t')), 10)
+        self._store.append('t', messages(10, 10))
+        self.assertEqual(len(reader.read('t')), 20)
+        with self.assertRaises(OSIOClientError):
+            reader.file('missing')
+        with self.assertRaises(OSIOClientError):
+            RingFile(self._store.path('t'), ['pressure'])
+        reader.close()
+        script = ('from pyosio.ringstore import RingFile; import sys; '
+                  'print(len(RingFile(sys.argv[1]).read(%d)))' % (START + 15))
+        output = subprocess.check_output([sys.executable, '-c', script, self._store.path('t')])
+        self.assertEqual(output.strip(), b'5')
+
+    def test_single_writer(self):
+        self._store.append('t', messages(0, 1))
+        if ringstore.fcntl is None:
+            self.skipTest('fcntl is not available')
+        with self.assertRaises(OSIOClientError):
+            RingFile(self._store.path('t'), writable=True)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
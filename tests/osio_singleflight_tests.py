@@ -0,0 +1,81 @@
+# coding=utf-8
+
+from pyosio import codec
+from pyosio.singleflight import SingleFlight, share_json
+from pyosio.errors import OSIOClientApiError
+import requests
+import threading
+import time
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class OSIOSingleFlightTests(unittest.TestCase):
+
+    def setUp(self):
+        self._flight = SingleFlight()
+        self._release = threading.Event()
+        self._calls = []
+
+    def slow(self, value):
+        def fn():
+            self._calls.append(value)
+            self._release.wait(5)
+            if isinstance(value, Exception):
+                raise value
+            return value
+        return fn
+
+    def run_concurrently(self, key, value, n=5, share=None):
+        results = []
+
+        def worker():
+            try:
+                results.append(self._flight.do(key, self.slow(value), share))
+            except Exception as e:
+                results.append(e)
+        threads = [threading.Thread(target=worker) for i in range(n)]
+        for thread in threads:
+            thread.start()
+        while self._flight.stats.calls + self._flight.stats.collapsed < n:
+            time.sleep(0.001)
+        self._release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_identical_calls_collapse(self):
+        results = self.run_concurrently('k', 'meta')
+        self.assertEqual(results, ['meta'] * 5)
+        self.assertEqual(len(self._calls), 1)
+        self.assertEqual(self._flight.stats.as_dict(), {'calls': 1, 'collapsed': 4})
+
+    def test_error_shared(self):
+        error = OSIOClientApiError('boom')
+        results = self.run_concurrently('k', error, n=3)
+        self.assertTrue(all(result is error for result in results))
+
+    def test_nothing_remembered(self):
+        self._release.set()
+        self._flight.do('k', self.slow(1))
+        self._flight.do('k', self.slow(2))
+        self.assertEqual(self._calls, [1, 2])
+
+    def test_share_json(self):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"devices": []}'
+        results = self.run_concurrently('k', response, n=3, share=share_json)
+        self.assertEqual(len(self._calls), 1)
+        self.assertEqual([result.status_code for result in results], [200] * 3)
+        # A caller changing its result does not change the others'.
+        decoded = [codec.decode_response(result) for result in results]
+        decoded[0]['devices'].append('changed')
+        self.assertEqual(decoded[1:], [{'devices': []}] * 2)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,134 @@
+# coding=utf-8
+
+from benchmarks.mock_server import MockServer
+from pyosio.osio import OpenSensorsAPI
+from pyosio.errors import OSIOClientError
+from pyosio.pagination import format_date, parse_date
+from pyosio.sync import IncrementalSync, StateFile, message_id
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+START = 1451606400
+PAGE_SIZE = 100
+
+
+class StoreHandler(object):
+
+    """
+        A topic whose messages can be added between runs, served newest first
+        with both ends of the date range included.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.served = 0
+
+    def add(self, seconds, text):
+        self.messages.append({'id': text, 'date': format_date(seconds), 'payload': {'text': text}})
+
+    def __call__(self, method, path, query, body, headers):
+        start, end = parse_date(query['start-date']), parse_date(query['end-date'])
+        selected = [m for m in reversed(self.messages) if start <= parse_date(m['date']) <= end]
+        offset = int(query.get('cursor', 0))
+        page = {'messages': selected[offset:offset + PAGE_SIZE]}
+        self.served += len(page['messages'])
+        if offset + PAGE_SIZE < len(selected):
+            page['next'] = '%s?start-date=%s&end-date=%s&cursor=%d' % (
+                path, query['start-date'], query['end-date'], offset + PAGE_SIZE)
+        return 200, {}, json.dumps(page).encode('utf-8')
+
+
+class OSIOSyncTests(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._dir, 'state.json')
+        self._handler = StoreHandler()
+        for i in range(1000):
+            self._handler.add(START + i * 10, 'm%d' % i)
+        self._server = MockServer(self._handler).__enter__()
+        self._api = OpenSensorsAPI('user', 'key', coalesce=False)
+        self._api.base_url = self._server.url
+        self._sync = IncrementalSync(self._api, self._path, window_seconds=1000, target_messages=100)
+
+    def tearDown(self):
+        self._api.close()
+        self._server.__exit__()
+        shutil.rmtree(self._dir)
+
+    def texts(self, messages):
+        return [m['payload']['text'] for m in messages]
+
+    def test_message_id(self):
+        self.assertEqual(message_id({'id': 'a', 'date': 'x'}), 'a')
+        self.assertEqual(message_id({'date': 'x', 'payload': 1}), message_id({'payload': 1, 'date': 'x'}))
+        self.assertNotEqual(message_id({'date': 'x'}), message_id({'date': 'y'}))
+
+    def test_state_file(self):
+        state = StateFile(os.path.join(self._dir, 'sub', 'state.json'))
+        self.assertEqual(state.load(), {})
+        state.update('a', 1)
+        state.update('b', 2)
+        state.update('a', None)
+        self.assertEqual(StateFile(state.path).load(), {'b': 2})
+        self.assertEqual(os.listdir(os.path.dirname(state.path)), ['state.json'])
+
+    def test_needs_start_date(self):
+        with self.assertRaises(OSIOClientError):
+            list(self._sync.batches('topic', 't'))
+        with self.assertRaises(ValueError):
+            list(self._sync.batches('dataset', 't', START))
+
+    def test_only_new_messages(self):
+        end = START + 5000
+        first = list(self._sync.messages('topic', 't', START, end))
+        self.assertEqual(self.texts(first), ['m%d' % i for i in range(501)])
+        self.assertEqual(self._sync.watermark('topic', 't').as_dict(),
+                         {'date': format_date(end), 'ids': ['m500']})
+        served = self._handler.served
+        self.assertEqual(list(self._sync.messages('topic', 't', end_date=end)), [])
+        # Only the message at the watermark is fetched again.
+        self.assertEqual(self._handler.served - served, 1)
+        second = list(self._sync.messages('topic', 't', end_date=START + 20000))
+        self.assertEqual(self.texts(second), ['m%d' % i for i in range(501, 1000)])
+
+    def test_same_date_arriving_later(self):
+        end = START + 100
+        self.assertEqual(len(list(self._sync.messages('topic', 't', START, end))), 11)
+        self._handler.add(end, 'late')
+        self._handler.add(end + 1, 'next')
+        self.assertEqual(self.texts(self._sync.messages('topic', 't', end_date=end + 1)), ['late', 'next'])
+        self.assertEqual(self._sync.watermark('topic', 't').ids, ('next',))
+
+    def test_resumes_after_crash(self):
+        end = START + 10000
+        seen = []
+        with self.assertRaises(RuntimeError):
+            for batch in self._sync.batches('topic', 't', START, end):
+                if len(seen) > 300:
+                    raise RuntimeError('crash')
+                seen.extend(batch)
+        self.assertEqual(self._sync.watermark('topic', 't').ids, (seen[-1]['id'],))
+        served = self._handler.served
+        rest = list(self._sync.messages('topic', 't', end_date=end))
+        self.assertEqual(self.texts(seen + rest), ['m%d' % i for i in range(1000)])
+        # Besides the rest, only the message at the watermark and those on a
+        # window boundary, served by both windows, are fetched.
+        self.assertTrue(self._handler.served - served < len(rest) + 10)
+
+    def test_reset(self):
+        list(self._sync.batches('topic', 't', START, START + 100))
+        self._sync.reset('topic', 't')
+        self.assertEqual(self._sync.watermark('topic', 't'), None)
+        self.assertEqual(len(list(self._sync.messages('topic', 't', START, START + 100))), 11)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
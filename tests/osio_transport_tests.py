@@ -0,0 +1,59 @@
+# coding=utf-8
+
+from benchmarks.mock_server import MockServer
+from pyosio.transport import Transport, gzip_compress
+import json
+import zlib
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD = json.dumps({'devices': [{'id': i, 'name': 'device'} for i in range(1000)]}).encode('utf-8')
+
+
+def gzip_handler(method, path, query, body, headers):
+    if headers.get('Content-Encoding') == 'gzip':
+        body = zlib.decompress(body, 31)
+    payload = json.dumps({'accept': headers.get('Accept-Encoding'), 'received': len(body)}).encode('utf-8')
+    if method == 'GET':
+        return 200, {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}, gzip_compress(PAYLOAD)
+    return 200, {'Content-Type': 'application/json'}, payload
+
+
+class OSIOTransportTests(unittest.TestCase):
+
+    def setUp(self):
+        self._server = MockServer(gzip_handler).__enter__()
+
+    def tearDown(self):
+        self._server.__exit__()
+
+    def test_gzip_round_trip(self):
+        self.assertEqual(zlib.decompress(gzip_compress(PAYLOAD), 31), PAYLOAD)
+
+    def test_compressed_response_counted(self):
+        transport = Transport()
+        response = transport.request('GET', self._server.url + 'v1/orgs/o/devices')
+        self.assertEqual(len(response.json()['devices']), 1000)
+        stats = transport.stats.as_dict()
+        self.assertEqual(stats['decoded_bytes'], len(PAYLOAD))
+        self.assertTrue(stats['wire_bytes'] < len(PAYLOAD) / 4)
+
+    def test_request_body_compressed_above_threshold(self):
+        transport = Transport(compress_min_bytes=100)
+        data = [{'name': 'device %d' % i} for i in range(100)]
+        response = transport.request('POST', self._server.url + 'v1/users/u/devices/bulk', json=data)
+        self.assertTrue('gzip' in response.json()['accept'])
+        self.assertEqual(response.json()['received'], transport.stats.sent_bytes)
+        self.assertTrue(transport.stats.sent_wire_bytes < transport.stats.sent_bytes)
+
+    def test_small_body_not_compressed(self):
+        transport = Transport(compress_min_bytes=100)
+        transport.request('POST', self._server.url + 'v1/users/u/devices/bulk', json={'a': 1})
+        self.assertEqual(transport.stats.sent_wire_bytes, transport.stats.sent_bytes)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()